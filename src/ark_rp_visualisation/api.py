@@ -0,0 +1,118 @@
+import json
+import os
+from typing import Any, Callable
+
+import plotly.io as pio
+from flask import Flask, Response, abort, jsonify, request
+from werkzeug.exceptions import ServiceUnavailable
+
+from ark_rp_visualisation.core.admission import BuildRejected, build_queue
+from ark_rp_visualisation.core.data_loader import DATASETS, DEFAULT_DATASET, DataLoader
+from ark_rp_visualisation.core.figure_cache import CachedFigure, figure_cache
+from ark_rp_visualisation.core.graph_state import validate_state
+from ark_rp_visualisation.utils.serialisation import decode_state
+from ark_rp_visualisation.utils.state_store import state_store
+from ark_rp_visualisation.warmer import warmer
+
+FIGURE_PATH = "/api/figure"
+EMBED_PATH = "/embed"
+BUILD_METRICS_PATH = "/api/metrics/builds"
+WARMER_METRICS_PATH = "/api/metrics/warmer"
+# Seconds browsers and CDNs may reuse a figure before revalidating its ETag
+FIGURE_MAX_AGE = int(os.getenv("FIGURE_MAX_AGE", 300))
+# Seconds clients are asked to wait before retrying a rejected build
+RETRY_AFTER = 5
+
+
+def resolve_state(state_id: str | None) -> dict[str, Any]:
+    """
+    Return the graph state of a stored state ID, or of the encoded `state` query
+    parameter if there is no ID. Aborts if there is no such valid state.
+    """
+    if state_id is not None:
+        state = state_store.load(state_id) if state_store else None
+    elif "state" in request.args:
+        state = decode_state(request.args["state"])
+    else:
+        state = None
+    if not state:
+        abort(404, "Graph not found")
+
+    try:
+        validate_state(state)
+    except ValueError as e:
+        abort(400, str(e))
+    if state.get("dataset", DEFAULT_DATASET) not in DATASETS:
+        abort(404, "Unknown dataset")
+    return state
+
+
+def figure_response(
+    state_id: str | None,
+    render: Callable[[CachedFigure], str],
+    mimetype: str,
+    suffix: str = "",
+) -> Response:
+    """
+    Respond with a rendered figure, or 304 if the client's copy is current.
+    `suffix` distinguishes the ETags of different renderings of the same figure.
+    """
+    state = resolve_state(state_id)
+
+    # Read once, so the ETag checked and the figure built are of the same version
+    snapshot = DataLoader().get_state_snapshot(state)
+    # Checked before building, so revalidating a current figure costs no build
+    etag = f"{figure_cache.etag(state, snapshot)}{suffix}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        try:
+            figure = figure_cache.get(state, snapshot)
+        except BuildRejected as e:
+            raise ServiceUnavailable(str(e), retry_after=RETRY_AFTER)
+        response = Response(render(figure), mimetype=mimetype)
+
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = FIGURE_MAX_AGE
+    return response
+
+
+def render_embed(figure: CachedFigure) -> str:
+    return pio.to_html(
+        json.loads(figure.json),
+        validate=False,
+        include_plotlyjs="cdn",
+        full_html=True,
+        default_height="100vh",
+        config={"responsive": True},
+    )
+
+
+def register_api_routes(server: Flask):
+    @server.get(FIGURE_PATH, defaults={"state_id": None})
+    @server.get(f"{FIGURE_PATH}/<state_id>")
+    def figure_json(state_id: str | None):
+        response = figure_response(
+            state_id, lambda figure: figure.json, "application/json"
+        )
+        # So pages elsewhere, e.g. the campaign wiki, can fetch figures
+        response.access_control_allow_origin = "*"
+        return response
+
+    @server.get(EMBED_PATH, defaults={"state_id": None})
+    @server.get(f"{EMBED_PATH}/<state_id>")
+    def figure_embed(state_id: str | None):
+        return figure_response(state_id, render_embed, "text/html", suffix="-html")
+
+    @server.get(BUILD_METRICS_PATH)
+    def build_metrics():
+        if build_queue is None:
+            abort(404, "Build queue disabled")
+        return jsonify(build_queue.metrics())
+
+    @server.get(WARMER_METRICS_PATH)
+    def warmer_metrics():
+        if warmer.last_report is None:
+            abort(404, "No warming run yet")
+        return jsonify(warmer.last_report)
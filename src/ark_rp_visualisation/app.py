@@ -7,23 +7,48 @@ PORT = os.getenv("PORT", 8050)
 import dash_mantine_components as dmc
 from dash import Dash, _dash_renderer
 
+from ark_rp_visualisation.api import register_api_routes
+from ark_rp_visualisation.core import DataLoader
+from ark_rp_visualisation.core.admission import build_queue
+from ark_rp_visualisation.core.data_loader import RELOAD_INTERVAL
 from ark_rp_visualisation.core.enums import Text
 from ark_rp_visualisation.layout import layout
 from ark_rp_visualisation.pages.dashboard import register_dashboard_callbacks
+from ark_rp_visualisation.pages.fullscreen import register_fullscreen_callbacks
 from ark_rp_visualisation.router import register_router_callbacks
+from ark_rp_visualisation.warmer import WARM_CPU_BUDGET_S, warmer
 
 # Required for DMC
 _dash_renderer._set_react_version("18.2.0")
 
-app = Dash(external_stylesheets=dmc.styles.ALL, prevent_initial_callbacks=True)  # type: ignore
+app = Dash(
+    external_stylesheets=dmc.styles.ALL,
+    prevent_initial_callbacks=True,
+)  # type: ignore
 app.title = Text.TITLE
 app.layout = layout
 
 # Expose Flask server to Gunicorn
 server = app.server
 
+register_api_routes(server)
+
 register_router_callbacks(app)
 register_dashboard_callbacks(app)
+register_fullscreen_callbacks(app)
+
+# Free the slots of builds left in the queue by the last run of the server
+if build_queue is not None:
+    build_queue.clear_stale()
+
+# Pick up new exports without a restart
+if RELOAD_INTERVAL:
+    DataLoader().watch(RELOAD_INTERVAL)
+
+# Build the likeliest graphs before the first users ask for them
+if WARM_CPU_BUDGET_S:
+    warmer.attach(server)
+    warmer.start()
 
 def main():
     app.run(debug=True, port=PORT)
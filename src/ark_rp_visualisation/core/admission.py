@@ -0,0 +1,290 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Mapping
+
+import psutil
+
+from .enums import Text
+
+# If empty (the default), builds are neither queued nor limited
+BUILD_QUEUE_PATH = os.getenv("BUILD_QUEUE_PATH", "")
+# Maximum number of graphs built at once, across every process sharing the queue
+BUILD_SLOTS = int(os.getenv("BUILD_SLOTS", 2))
+# Builds waiting or running before further builds are rejected
+BUILD_QUEUE_LIMIT = int(os.getenv("BUILD_QUEUE_LIMIT", 32))
+# Builds one client may have waiting or running at once, 0 for no limit
+CLIENT_BUILD_LIMIT = int(os.getenv("CLIENT_BUILD_LIMIT", 2))
+# Degradable builds admitted behind this many others use a sample of the rows,
+# 0 disables degraded builds
+DEGRADE_QUEUE_LENGTH = int(os.getenv("DEGRADE_QUEUE_LENGTH", 0))
+# Fraction of the rows used by degraded builds
+DEGRADED_SAMPLE_FRACTION = float(os.getenv("DEGRADED_SAMPLE_FRACTION", 0.1))
+# Seconds between checks for a free slot while waiting
+QUEUE_POLL_INTERVAL = 0.02
+# Seconds of admissions summarised by `BuildQueue.metrics`
+METRICS_WINDOW = 300
+
+
+class BuildRejected(RuntimeError):
+    """Raised when a build isn't admitted, because the queue is full."""
+
+
+@dataclass(frozen=True)
+class Ticket:
+    # Milliseconds spent waiting for a slot
+    queue_ms: float
+    # Fraction of the rows to build from, or None to use every row
+    sample_fraction: float | None = None
+
+
+def client_address(headers: Mapping[str, str], remote: str | None) -> str:
+    """
+    Return the address of the client making a request.
+    Behind a proxy (e.g. Fly's), it's the last address in X-Forwarded-For, which
+    the proxy appended. Earlier ones are sent by the client, so can be spoofed.
+    """
+    forwarded = headers.get("X-Forwarded-For", "")
+    return forwarded.split(",")[-1].strip() or remote or ""
+
+
+def _started_at(pid: int) -> float | None:
+    """Return when a running process started, or None if it isn't running."""
+    try:
+        process = psutil.Process(pid)
+        if process.status() == psutil.STATUS_ZOMBIE:
+            return None
+        return process.create_time()
+    except psutil.NoSuchProcess:
+        return None
+
+
+def _alive(pid: int, started_at: float | None) -> bool:
+    """
+    Return whether the process which took a ticket is still running. The start
+    time tells it apart from a later process given the same PID, as a restarted
+    container's server usually is.
+    """
+    current = _started_at(pid)
+    return current is not None and current == started_at
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    """Return the nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(q / 100 * len(values)))], 1)
+
+
+class BuildQueue:
+    """
+    Bounded FIFO queue of graph builds, shared through SQLite by every process
+    using the same database (e.g. gunicorn workers).
+    At most `slots` builds run at once, and builds beyond `limit`, or a client's
+    `client_limit`, are rejected rather than left to slow every other request.
+    Builds of processes which died (e.g. a killed worker, or a previous
+    run of the server) are removed from the queue, so they don't hold
+    their slots forever.
+    """
+
+    def __init__(
+        self,
+        path: str = BUILD_QUEUE_PATH,
+        slots: int = BUILD_SLOTS,
+        limit: int = BUILD_QUEUE_LIMIT,
+        client_limit: int = CLIENT_BUILD_LIMIT,
+        degrade_length: int = DEGRADE_QUEUE_LENGTH,
+        sample_fraction: float = DEGRADED_SAMPLE_FRACTION,
+    ):
+        self.path = path
+        self.slots = slots
+        self.limit = limit
+        self.client_limit = client_limit
+        self.degrade_length = degrade_length
+        self.sample_fraction = sample_fraction
+        self._local = threading.local()
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # As in `StateStore`, connections are per thread and per process
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit, with transactions begun explicitly
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS tickets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    client TEXT,
+                    pid INTEGER,
+                    pid_started_at REAL,
+                    queued_at REAL,
+                    started_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS admissions (
+                    at REAL,
+                    outcome TEXT,
+                    queue_ms REAL
+                );
+                """
+            )
+            columns = {
+                row[1] for row in connection.execute("PRAGMA table_info(tickets)")
+            }
+            if "pid_started_at" not in columns:
+                # Queues made before start times were recorded. Their tickets have
+                # none, so are pruned as stale
+                try:
+                    connection.execute(
+                        "ALTER TABLE tickets ADD COLUMN pid_started_at REAL"
+                    )
+                except sqlite3.OperationalError:
+                    # Added by another process meanwhile
+                    pass
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection
+        # Taking the write lock up front, so counts can't change before the insert
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+
+    def _prune(self, connection: sqlite3.Connection):
+        processes = connection.execute(
+            "SELECT DISTINCT pid, pid_started_at FROM tickets"
+        ).fetchall()
+        connection.executemany(
+            "DELETE FROM tickets WHERE pid = ? AND pid_started_at IS ?",
+            [process for process in processes if not _alive(*process)],
+        )
+
+    def clear_stale(self):
+        """
+        Remove the tickets of processes no longer running, e.g. those left by the
+        last run of the server. Called on startup, so they're gone before the
+        first build. Tickets of other running workers are kept.
+        """
+        with self._transaction() as connection:
+            self._prune(connection)
+
+    def _record(self, connection: sqlite3.Connection, outcome: str, queue_ms=None):
+        connection.execute(
+            "INSERT INTO admissions VALUES (?, ?, ?)", (time.time(), outcome, queue_ms)
+        )
+
+    def _enqueue(self, client: str | None) -> tuple[int, int]:
+        """Add a ticket, and return its ID and the number of tickets ahead of it."""
+        rejection = None
+        with self._transaction() as connection:
+            self._prune(connection)
+            connection.execute(
+                "DELETE FROM admissions WHERE at < ?", (time.time() - METRICS_WINDOW,)
+            )
+            (ahead,) = connection.execute("SELECT COUNT(*) FROM tickets").fetchone()
+            if ahead >= self.limit:
+                rejection = Text.QUEUE_FULL
+            elif client is not None and self.client_limit:
+                (client_builds,) = connection.execute(
+                    "SELECT COUNT(*) FROM tickets WHERE client = ?", (client,)
+                ).fetchone()
+                if client_builds >= self.client_limit:
+                    rejection = Text.CLIENT_QUEUE_FULL
+
+            if rejection:
+                self._record(connection, "rejected")
+            else:
+                pid = os.getpid()
+                ticket_id = connection.execute(
+                    "INSERT INTO tickets (client, pid, pid_started_at, queued_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (client, pid, _started_at(pid), time.time()),
+                ).lastrowid
+
+        # Raised after committing, so the rejection is recorded
+        if rejection:
+            raise BuildRejected(rejection)
+        return ticket_id, ahead
+
+    def _start(self, ticket_id: int) -> bool:
+        """Take a slot if the ticket is next and one is free."""
+        with self._transaction() as connection:
+            self._prune(connection)
+            cursor = connection.execute(
+                """
+                UPDATE tickets SET started_at = ?
+                WHERE id = ?
+                    AND id = (SELECT MIN(id) FROM tickets WHERE started_at IS NULL)
+                    AND (SELECT COUNT(*) FROM tickets WHERE started_at IS NOT NULL) < ?
+                """,
+                (time.time(), ticket_id, self.slots),
+            )
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def admit(
+        self, client: str | None = None, degradable: bool = False
+    ) -> Iterator[Ticket]:
+        """
+        Wait for a build slot, which is held until the context exits.
+        Raises `BuildRejected` if the queue, or the client's share of it, is full.
+        Builds with no client (e.g. of shared fullscreen links) have no client limit.
+        If `degradable` and the queue is long, the ticket asks for a sampled build.
+        """
+        start = time.perf_counter()
+        ticket_id, ahead = self._enqueue(client)
+        try:
+            while not self._start(ticket_id):
+                time.sleep(QUEUE_POLL_INTERVAL)
+            queue_ms = (time.perf_counter() - start) * 1000
+
+            degraded = degradable and 0 < self.degrade_length <= ahead
+            self._record(
+                self._connection, "degraded" if degraded else "admitted", queue_ms
+            )
+            yield Ticket(queue_ms, self.sample_fraction if degraded else None)
+        finally:
+            self._connection.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+
+    def metrics(self) -> dict:
+        """Return the queue's length, and a summary of recent admissions."""
+        with self._transaction() as connection:
+            self._prune(connection)
+            (running, waiting) = connection.execute(
+                "SELECT COUNT(started_at), COUNT(*) - COUNT(started_at) FROM tickets"
+            ).fetchone()
+            admissions = connection.execute(
+                "SELECT outcome, queue_ms FROM admissions WHERE at >= ?",
+                (time.time() - METRICS_WINDOW,),
+            ).fetchall()
+
+        queue_ms = sorted(ms for _, ms in admissions if ms is not None)
+        outcomes = [outcome for outcome, _ in admissions]
+        return {
+            "running": running,
+            "waiting": waiting,
+            "window_s": METRICS_WINDOW,
+            "admitted": outcomes.count("admitted"),
+            "degraded": outcomes.count("degraded"),
+            "rejected": outcomes.count("rejected"),
+            "queue_p50_ms": _percentile(queue_ms, 50),
+            "queue_p95_ms": _percentile(queue_ms, 95),
+            "queue_max_ms": _percentile(queue_ms, 100),
+        }
+
+
+build_queue = BuildQueue() if BUILD_QUEUE_PATH else None
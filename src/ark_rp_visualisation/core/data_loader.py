@@ -1,46 +1,129 @@
 import glob
 import os
+import posixpath
 import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
 
-import numpy as np
+import boto3
 import pandas as pd
 
 from ark_rp_visualisation.utils.logging_setup import get_logger
+from ark_rp_visualisation.utils.profiling import stage
 
+from . import synthetic
 from .enums import Field
+from .metadata import DatasetMetadata
+from .snapshot import DatasetSnapshot
 
 logger = get_logger(__name__)
 
 ENV = os.getenv("ENV", "development")
-DATA_PATH = "data/16-2-2025"
-CACHE_PATH = ".cache/16-2-2025.parquet"
+DATA_DIR = "data"
+CACHE_DIR = ".cache"
+
+# Comma-separated ids of the datasets which can be served, the first is the default
+DATASET_IDS = [
+    dataset_id.strip()
+    for dataset_id in os.getenv("DATASETS", "16-2-2025").split(",")
+    if dataset_id.strip()
+]
+DEFAULT_DATASET = DATASET_IDS[0]
+DATA_PATH = os.path.join(DATA_DIR, DEFAULT_DATASET)
+CACHE_PATH = os.path.join(CACHE_DIR, f"{DEFAULT_DATASET}.parquet")
 
 S3_BUCKET = os.getenv("S3_BUCKET")
 S3_KEY = os.getenv("S3_KEY")
 S3_URL = f"s3://{S3_BUCKET}/{S3_KEY}"
 
+# Seconds between checks for a new dataset, 0 to never reload
+RELOAD_INTERVAL = float(os.getenv("DATA_RELOAD_INTERVAL", 0))
+# Least recently used datasets are evicted once loaded datasets and their metadata
+# use more than this, a quarter of the production VM
+MEMORY_BUDGET_MB = float(os.getenv("DATASET_MEMORY_BUDGET_MB", 256))
+
 DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
 TIME_ZONE = "Australia/Sydney"
 CHANNEL_NAME_REGEX = r".+ - (.+) \["
 REACTIONS_REGEX = r"(\w+)\s*\((\d+)\)"
 SCENE_END_REGEX = r"\/\s*(?:end\sscene)|(?:scene\send)|(?:SCENESHIFT)"
 
+# Columns removed by DataLoader.clean()
+SENSITIVE_FIELDS = [Field.AUTHOR_ID, Field.CONTENT, Field.ATTACHMENTS]
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """Where the export of one campaign is stored."""
+
+    id: str
+    data_path: str
+    cache_path: str
+    # The default dataset is at S3_KEY, the others are stored next to it
+    s3_key: str | None
+
+    @classmethod
+    def from_id(cls, dataset_id: str):
+        return cls(
+            id=dataset_id,
+            data_path=os.path.join(DATA_DIR, dataset_id),
+            cache_path=os.path.join(CACHE_DIR, f"{dataset_id}.parquet"),
+            s3_key=(
+                S3_KEY
+                if dataset_id == DEFAULT_DATASET
+                else posixpath.join(
+                    posixpath.dirname(S3_KEY or ""), f"{dataset_id}.parquet"
+                )
+            ),
+        )
+
+    @property
+    def s3_url(self) -> str:
+        return f"s3://{S3_BUCKET}/{self.s3_key}"
+
+
+DATASETS = {dataset_id: Dataset.from_id(dataset_id) for dataset_id in DATASET_IDS}
+
 
 class DataLoader:
-    """DataLoader singleton for loading the dataset."""
+    """DataLoader singleton for loading datasets."""
 
     _instance = None
-    _df: pd.DataFrame | None
+    _instance_lock = threading.Lock()
+    # Loaded datasets, from least to most recently used
+    _snapshots: OrderedDict[str, DatasetSnapshot]
+    # Signature of the source each snapshot was read from
+    _sources: dict[str, str | None]
+    _lock: threading.Lock
+    _load_lock: threading.Lock
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
-            cls._instance = super().__new__(cls, *args, **kwargs)
-            cls._instance._df = None
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls, *args, **kwargs)
+                    instance._snapshots = OrderedDict()
+                    instance._sources = {}
+                    instance._lock = threading.Lock()
+                    instance._load_lock = threading.Lock()
+                    # Only published once initialised, for threads skipping the lock
+                    cls._instance = instance
         return cls._instance
 
     @staticmethod
-    def get_csv_paths():
-        return glob.glob(os.path.join(DATA_PATH, "*.csv"))
+    def get_dataset(dataset_id: str) -> Dataset:
+        """Return a dataset of the registry by its id."""
+        try:
+            return DATASETS[dataset_id]
+        except KeyError:
+            raise ValueError(f"Unknown dataset: {dataset_id}") from None
+
+    @staticmethod
+    def get_csv_paths(data_path: str = DATA_PATH):
+        return glob.glob(os.path.join(data_path, "*.csv"))
 
     @staticmethod
     def _rename_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -132,140 +215,301 @@ class DataLoader:
         """
         Read a CSV file, return a processed DataFrame.
         """
-        df = pd.read_csv(path)
-        df = cls._rename_columns(df)
-        df = cls._add_word_count(df)
-        df = cls._add_channel_name(df, path)
-        df = cls._process_reactions(df)
-        df = cls._process_datetime(df)
-        df = cls._add_scene_end(df)
+        with stage("read"):
+            df = pd.read_csv(path)
+        with stage("rename"):
+            df = cls._rename_columns(df)
+        with stage("word_count"):
+            df = cls._add_word_count(df)
+        with stage("channel_name"):
+            df = cls._add_channel_name(df, path)
+        with stage("reactions"):
+            df = cls._process_reactions(df)
+        with stage("datetime"):
+            df = cls._process_datetime(df)
+        with stage("scene_end"):
+            df = cls._add_scene_end(df)
         return df
 
     @classmethod
-    def _read_csvs(cls) -> pd.DataFrame:
+    def _read_csvs(cls, data_path: str = DATA_PATH) -> pd.DataFrame:
         # Read and combine CSVs
-        dfs = [cls._read_csv(path) for path in cls.get_csv_paths()]
-        df = pd.concat(dfs, ignore_index=True)
-
-        # https://stackoverflow.com/questions/45639350/retaining-categorical-dtype-upon-dataframe-concatenation
-        df[Field.CHANNEL_NAME] = df[Field.CHANNEL_NAME].astype("category")
-        df[Field.AUTHOR_ID] = df[Field.AUTHOR_ID].astype("category")
-        df[Field.AUTHOR] = df[Field.AUTHOR].astype("category")
+        dfs = [cls._read_csv(path) for path in cls.get_csv_paths(data_path)]
+        with stage("concat"):
+            df = pd.concat(dfs, ignore_index=True)
+            del dfs
+
+            # https://stackoverflow.com/questions/45639350/retaining-categorical-dtype-upon-dataframe-concatenation
+            df[Field.CHANNEL_NAME] = df[Field.CHANNEL_NAME].astype("category")
+            df[Field.AUTHOR_ID] = df[Field.AUTHOR_ID].astype("category")
+            df[Field.AUTHOR] = df[Field.AUTHOR].astype("category")
         return df
 
     @staticmethod
-    def _write_cache(df: pd.DataFrame):
-        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
-        df.to_parquet(CACHE_PATH)
+    def _write_cache(df: pd.DataFrame, cache_path: str = CACHE_PATH):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        df.to_parquet(cache_path)
 
     @classmethod
-    def _generate_dummy_data(cls) -> pd.DataFrame:
-        num_rows = 500
-        authors = ["Aria", "Lyra", "Kaelen", "Solas", "Luna"]
-        channels = ["general", "rp-main", "dice-rolls", "lore"]
-
-        # Generate random dates over the last 30 days
-        start_date = pd.Timestamp.now(tz=TIME_ZONE) - pd.Timedelta(days=30)
-        dates = [
-            start_date + pd.Timedelta(seconds=np.random.randint(0, 30 * 24 * 3600))
-            for _ in range(num_rows)
-        ]
-
-        data = {
-            Field.AUTHOR: np.random.choice(authors, num_rows),
-            Field.AUTHOR_ID: np.random.choice(
-                ["101", "102", "103", "104", "105"], num_rows
-            ),
-            Field.DATETIME: dates,
-            Field.CHANNEL_NAME: np.random.choice(channels, num_rows),
-            Field.WORD_COUNT: np.random.randint(5, 200, num_rows),
-            Field.REACTION_COUNT: np.random.randint(0, 10, num_rows),
-            Field.SCENE_END: np.random.choice([True, False], num_rows, p=[0.05, 0.95]),
-            Field.CONTENT: "Dummy message content",
-            Field.ATTACHMENTS: "",
-        }
+    def _generate_dummy_data(cls, num_rows: int = 500) -> pd.DataFrame:
+        # Seeded over whole days, so every process generates the same dataset
+        return synthetic.generate(
+            num_rows,
+            num_authors=5,
+            num_channels=4,
+            start=pd.Timestamp.now(tz=TIME_ZONE).normalize() - pd.Timedelta(days=30),
+            seed=0,
+        )
 
-        df = pd.DataFrame(data)
+    @classmethod
+    def _read_cache(
+        cls, force: bool = False, dataset_id: str = DEFAULT_DATASET
+    ) -> pd.DataFrame:
+        dataset = cls.get_dataset(dataset_id)
+        if not force and os.path.exists(dataset.cache_path):
+            logger.info(f"Cache found: Loading from {dataset.cache_path}")
+            return pd.read_parquet(dataset.cache_path)
+
+        if not cls.get_csv_paths(dataset.data_path):
+            logger.warning(
+                f"No CSV files found in {dataset.data_path}. Generating dummy data."
+            )
+            return cls._generate_dummy_data()
 
-        # Ensure data types match expected schema
-        df[Field.CHANNEL_NAME] = df[Field.CHANNEL_NAME].astype("category")
-        df[Field.AUTHOR_ID] = df[Field.AUTHOR_ID].astype("category")
-        df[Field.AUTHOR] = df[Field.AUTHOR].astype("category")
+        df = cls._read_csvs(dataset.data_path)
+        cls._write_cache(df, dataset.cache_path)
+        logger.info(f"Cache written: {dataset.cache_path}")
         return df
 
-    def load_cache(self, force: bool = False):
+    @classmethod
+    def _read_s3(cls, dataset_id: str = DEFAULT_DATASET) -> pd.DataFrame:
+        s3_url = cls.get_dataset(dataset_id).s3_url
+        logger.info(f"S3 found: Loading from {s3_url}")
+        return pd.read_parquet(s3_url)
+
+    def _read(self, dataset_id: str, force: bool = False) -> pd.DataFrame:
+        """Read a dataset from the source for the environment."""
+        if ENV == "development":
+            return self._read_cache(force=force, dataset_id=dataset_id)
+        elif ENV == "production":
+            return self._read_s3(dataset_id)
+        raise ValueError(
+            f"Invalid ENV value: {ENV}. Choose 'development' or 'production'."
+        )
+
+    @staticmethod
+    def remove_sensitive_fields(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return a DataFrame without the potentially sensitive fields.
+        """
+        with stage("clean"):
+            return df.drop(columns=SENSITIVE_FIELDS)
+
+    @classmethod
+    def read_path(cls, data_path: str, clean: bool = True) -> pd.DataFrame:
+        """
+        Read and process the CSVs in a directory, without loading them as a dataset.
+        """
+        df = cls._read_csvs(data_path)
+        return cls.remove_sensitive_fields(df) if clean else df
+
+    @classmethod
+    def _source_signature(cls, dataset_id: str = DEFAULT_DATASET) -> str | None:
         """
-        Load the dataset from a cache.
+        Return a signature which changes whenever the dataset source is replaced:
+        the modification time of the cache, or the ETag of the S3 object.
+        """
+        dataset = cls.get_dataset(dataset_id)
+        if ENV == "production":
+            response = boto3.client("s3").head_object(
+                Bucket=S3_BUCKET, Key=dataset.s3_key
+            )
+            return response["ETag"]
+
+        try:
+            info = os.stat(dataset.cache_path)
+        except OSError:
+            return None
+        return f"{info.st_mtime_ns}-{info.st_size}"
+
+    def _publish(
+        self, df: pd.DataFrame, dataset_id: str = DEFAULT_DATASET
+    ) -> DatasetSnapshot:
+        # Metadata is computed before publishing, rather than on the first request,
+        # and so it's counted when evicting
+        snapshot = DatasetSnapshot(df).warm()
+        # A single assignment, so readers see either the old or the new snapshot
+        with self._lock:
+            self._snapshots[dataset_id] = snapshot
+            self._snapshots.move_to_end(dataset_id)
+            self._evict()
+        return snapshot
+
+    def _evict(self):
+        """
+        Drop the least recently used datasets until the rest, with their metadata,
+        fit in the memory budget. The most recently used dataset is always kept.
+        """
+        budget = MEMORY_BUDGET_MB * 2**20
+        while len(self._snapshots) > 1 and (
+            sum(snapshot.nbytes for snapshot in self._snapshots.values()) > budget
+        ):
+            dataset_id, _ = self._snapshots.popitem(last=False)
+            self._sources.pop(dataset_id, None)
+            logger.info(f"Dataset evicted: {dataset_id}")
+
+    def load_cache(self, force: bool = False, dataset_id: str = DEFAULT_DATASET):
+        """
+        Load a dataset from a cache.
         If no cache exists, process raw CSVs and cache the result.
         If no CSVs exist, load a dummy dataset.
         """
-        if not force and os.path.exists(CACHE_PATH):
-            logger.info(f"Cache found: Loading from {CACHE_PATH}")
-            self._df = pd.read_parquet(CACHE_PATH)
-            return self
+        self._publish(self._read_cache(force=force, dataset_id=dataset_id), dataset_id)
+        return self
+
+    def load_s3(self, dataset_id: str = DEFAULT_DATASET):
+        """
+        Load a dataset from Amazon S3.
+        """
+        self._publish(self._read_s3(dataset_id), dataset_id)
+        return self
 
-        if not self.get_csv_paths():
-            logger.warning(f"No CSV files found in {DATA_PATH}. Generating dummy data.")
-            self._df = self._generate_dummy_data()
+    def clean(self, dataset_id: str = DEFAULT_DATASET):
+        """
+        Remove potentially sensitive data from a dataset.
+        """
+        snapshot = self._snapshots.get(dataset_id)
+        if snapshot is None:
             return self
 
-        self._df = self._read_csvs()
-        self._write_cache(self._df)
-        logger.info(f"Cache written: {CACHE_PATH}")
+        self._publish(self.remove_sensitive_fields(snapshot.df), dataset_id)
         return self
 
-    def load_s3(self):
+    def load_data(
+        self, force: bool = False, clean: bool = True, dataset_id: str = DEFAULT_DATASET
+    ):
         """
-        Load the dataset from Amazon S3.
+        Load a dataset based on the environment.
         """
-        logger.info(f"S3 found: Loading from {S3_URL}")
-        self._df = pd.read_parquet(S3_URL)
+        self._sources[dataset_id] = self._source_signature(dataset_id)
+        df = self._read(dataset_id, force=force)
+        # Cleaned before publishing, so sensitive data is never served
+        self._publish(self.remove_sensitive_fields(df) if clean else df, dataset_id)
         return self
 
-    def clean(self):
+    def reload(self) -> bool:
         """
-        Remove potentially sensitive data from the dataset.
+        Load each loaded dataset again if its source has changed.
+        New snapshots are fully built before they are swapped in, so requests are
+        served from the old snapshots in the meantime.
+        Return whether any new snapshot was swapped in.
         """
-        if self._df is None:
-            return self
-
-        self._df = self._df.drop(
-            columns=[Field.AUTHOR_ID, Field.CONTENT, Field.ATTACHMENTS]
+        reloaded = False
+        with self._load_lock:
+            for dataset_id in list(self._snapshots):
+                source = self._source_signature(dataset_id)
+                if source is None or source == self._sources.get(dataset_id):
+                    continue
+
+                snapshot = DatasetSnapshot(
+                    self.remove_sensitive_fields(self._read(dataset_id))
+                )
+                self._sources[dataset_id] = source
+                # Identical data keeps the current snapshot, and everything cached on it
+                current = self._snapshots.get(dataset_id)
+                if current is not None and snapshot.version == current.version:
+                    continue
+
+                snapshot.warm()
+                with self._lock:
+                    self._snapshots[dataset_id] = snapshot
+                    # Just replaced, so not the next to be evicted
+                    self._snapshots.move_to_end(dataset_id)
+                    self._evict()
+                logger.info(
+                    f"Dataset reloaded: {dataset_id} version {snapshot.version}"
+                )
+                reloaded = True
+        return reloaded
+
+    def _watch(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.reload()
+            except Exception:
+                # Keep serving the current snapshots until the sources can be read
+                logger.exception("Failed to reload datasets")
+
+    def watch(self, interval: float = RELOAD_INTERVAL) -> threading.Thread:
+        """Reload datasets in a background thread whenever their sources change."""
+        thread = threading.Thread(
+            target=self._watch, args=(interval,), name="dataset-reload", daemon=True
         )
-        return self
+        thread.start()
+        return thread
 
-    def load_data(self, force: bool = False, clean: bool = True):
+    def get_snapshot(self, dataset_id: str = DEFAULT_DATASET) -> DatasetSnapshot:
         """
-        Load data based on the environment.
+        Return the current snapshot of a dataset, loading it on first use.
+        Read it once per request, so the request isn't affected by a reload.
         """
-        if ENV == "development":
-            self.load_cache(force=force)
-        elif ENV == "production":
-            self.load_s3()
-        else:
-            raise ValueError(
-                f"Invalid ENV value: {ENV}. Choose 'development' or 'production'."
-            )
+        self.get_dataset(dataset_id)
+        with self._lock:
+            snapshot = self._snapshots.get(dataset_id)
+            if snapshot is not None:
+                self._snapshots.move_to_end(dataset_id)
+                return snapshot
+
+        # Other datasets are still served while this one loads
+        with self._load_lock:
+            snapshot = self._snapshots.get(dataset_id)
+            if snapshot is None:
+                self.load_data(dataset_id=dataset_id)
+                snapshot = self._snapshots.get(dataset_id)
+
+        if snapshot is None:
+            raise RuntimeError(f"Failed to load dataset {dataset_id}")
+
+        return snapshot
+
+    def get_state_snapshot(self, state: dict[str, Any]) -> DatasetSnapshot:
+        """Return the current snapshot of the dataset a graph state is of."""
+        # States from before datasets were selectable are of the default dataset
+        return self.get_snapshot(state.get("dataset", DEFAULT_DATASET))
 
-        if clean:
-            self.clean()
-        return self
+    @property
+    def snapshot(self) -> DatasetSnapshot:
+        """
+        Return the current snapshot of the default dataset.
+        """
+        return self.get_snapshot()
 
     @property
     def df(self) -> pd.DataFrame:
         """
-        Return the current DataFrame.
+        Return the current DataFrame of the default dataset.
         """
-        if self._df is None:
-            self.load_data()
+        return self.snapshot.df
 
-        if self._df is None:
-            raise RuntimeError("Failed to load data")
+    @property
+    def version(self) -> str:
+        """
+        Return the version of the default dataset.
+        """
+        return self.snapshot.version
 
-        return self._df
+    @property
+    def metadata(self) -> DatasetMetadata:
+        """
+        Return the filter options and value ranges of the default dataset.
+        """
+        return self.snapshot.metadata
 
     def reset(self):
         """Reset the singleton instance."""
+        self._snapshots.clear()
+        self._sources.clear()
         DataLoader._instance = None
 
 
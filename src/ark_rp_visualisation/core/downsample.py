@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Line plots with more points than this are downsampled to it
+LINE_POINT_BUDGET = int(os.getenv("LINE_POINT_BUDGET", 2000))
+
+
+def as_numbers(values) -> np.ndarray:
+    """Return numbers, or dates and times as nanoseconds, as floats."""
+    values = np.asarray(values)
+    if values.dtype.kind in "biuf":
+        return values.astype(float)
+    return pd.to_datetime(values).as_unit("ns").asi8.astype(float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Return the indices of `threshold` points of a line sorted by x, chosen by
+    largest-triangle-three-buckets downsampling. The first and last points are
+    kept, and of each bucket in between, the point forming the largest triangle
+    with the point kept before it and the average of the next bucket. This keeps
+    peaks and troughs, which averaging or taking every nth point would flatten.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Relative to the first point, so large timestamps don't lose precision
+    x = x - x[0]
+    y = np.nan_to_num(y)
+    bucket_size = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    kept = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+
+        areas = np.abs(
+            (x[kept] - next_x) * (y[start:end] - y[kept])
+            - (x[kept] - x[start:end]) * (next_y - y[kept])
+        )
+        kept = start + int(areas.argmax())
+        indices[bucket + 1] = kept
+    return indices
+
+
+def downsample_indices(
+    times: np.ndarray,
+    values: np.ndarray,
+    budget: int,
+    time_range: tuple[float, float] | None = None,
+) -> np.ndarray:
+    """
+    Return the indices of at most `budget` points of a line, in their original
+    order. If `time_range` is given, only points in it are kept, plus the points
+    either side, so the line runs to the edges of the range.
+    """
+    order = np.argsort(times, kind="stable")
+    times, values = times[order], values[order]
+
+    start, stop = 0, len(times)
+    if time_range is not None:
+        start = max(int(np.searchsorted(times, time_range[0])) - 1, 0)
+        stop = min(int(np.searchsorted(times, time_range[1], side="right")) + 1, stop)
+
+    kept = lttb_indices(times[start:stop], values[start:stop], budget) + start
+    return np.sort(order[kept])
@@ -330,6 +330,7 @@ class Filter(StrEnum):
                     clearable=True,
                     placeholder="Enter date...",
                 ),
+                "range_kwargs": ("minDate", "maxDate"),
                 "post_processing": lambda value: pd.to_datetime(value).date(),
             },
             "AUTHOR": {
@@ -370,6 +371,7 @@ class Filter(StrEnum):
                     allowDecimal=False,
                     placeholder="Enter number...",
                 ),
+                "range_kwargs": ("min", "max"),
             },
         }.get(self.name, {})
 
@@ -393,6 +395,11 @@ class Filter(StrEnum):
     def select_kwargs(self):
         return self._metadata.get("select_kwargs", {})
 
+    @property
+    def range_kwargs(self) -> tuple[str, str] | None:
+        # Input props limited to the range of values in the dataset
+        return self._metadata.get("range_kwargs")
+
     @property
     def post_processing(self):
         # Default is to return value unchanged
@@ -410,16 +417,34 @@ class Text(StrEnum):
     ASCENDING = "ascending"
     DESCENDING = "descending"
     UPDATE_GRAPH_LABEL = "This is how I like it!"
+    APPROXIMATE = "approximate"
+    FULL_RESOLUTION = "Full resolution when zoomed in"
+    QUEUE_FULL = "Too many graphs are being built right now, try again in a moment"
+    CLIENT_QUEUE_FULL = (
+        "Your other graphs are still being built, try again once they're done"
+    )
 
 
 class Page(StrEnum):
     URL = "url"
     CONTENT = "content"
+    DATASET = "dataset"
+    SESSION_ID = "session-id"
+
+    TABS = "tabs"
+    TAB_PANEL = "tab-panel"
+    RENDERED_TABS = "rendered-tabs"
 
     GRAPH = "graph"
+    GRAPH_PROGRESS = "graph-progress"
+    DOWNSAMPLED_STATE = "downsampled-state"
+    FULL_RESOLUTION_SWITCH = "full-resolution-switch"
     UPDATE_GRAPH_BUTTON = "update-graph-btn"
     FULLSCREEN_BUTTON = "full-screen-btn"
     FULLSCREEN_BUTTON_ICON = "full-screen-btn-icon"
+    FULLSCREEN_GRAPH = "full-screen-graph"
+    FULLSCREEN_FIGURE_URL = "full-screen-figure-url"
+    FULLSCREEN_LOADER = "full-screen-loader"
 
     FIELD_CONTAINER = "field-container"
     FIELD_DROPDOWN = "field-dropdown"
@@ -439,6 +464,7 @@ class Page(StrEnum):
     FILTER_OPERATOR = "filter-operator"
     FILTER_VALUE_CONTAINER = "filter-value-container"
     FILTER_VALUE_INPUT = "filter-value-input"
+    FILTER_TEMPLATES = "filter-templates"
 
     RESET_CUSTOMISATION_BUTTON = "reset-customisation-btn"
     TITLE_INPUT = "title-input"
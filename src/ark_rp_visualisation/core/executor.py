@@ -0,0 +1,89 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import plotly.graph_objects as go
+
+from .admission import build_queue
+from .plot_builder import PlotBuilder
+
+# Maximum number of graphs built at once in each worker process
+BUILD_THREADS = int(os.getenv("BUILD_THREADS", "2"))
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+# CPU seconds used on the executor by builds of the current context, see `thread_time`
+_build_cpu_s = contextvars.ContextVar("build_cpu_s", default=0.0)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the executor for graph builds of this process.
+    Created on first use, so gunicorn workers don't share a forked executor.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=BUILD_THREADS, thread_name_prefix="build"
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor, _lock
+    _executor = None
+    _lock = threading.Lock()
+
+
+# Threads don't survive a fork, e.g. when gunicorn preloads the app
+os.register_at_fork(after_in_child=_reset_executor)
+
+
+def _run(builder: PlotBuilder, progress: Callable[[float], None] | None) -> go.Figure:
+    def timed_build() -> tuple[go.Figure, float]:
+        start = time.thread_time()
+        return builder.build(progress), time.thread_time() - start
+
+    context = contextvars.copy_context()
+    fig, cpu_s = get_executor().submit(context.run, timed_build).result()
+    _build_cpu_s.set(_build_cpu_s.get() + cpu_s)
+    return fig
+
+
+def thread_time() -> float:
+    """
+    Return the CPU time of the current thread like `time.thread_time`, plus that
+    of the builds it waited for on the executor.
+    """
+    return time.thread_time() + _build_cpu_s.get()
+
+
+def build(
+    builder: PlotBuilder,
+    progress: Callable[[float], None] | None = None,
+    client: str | None = None,
+    degradable: bool = False,
+) -> go.Figure:
+    """
+    Build a figure on the executor, waiting if every build thread is busy.
+    The pandas and NumPy work of concurrent builds overlaps wherever it releases
+    the GIL, while the number of builds in memory at once stays bounded.
+    `progress` is called in the caller's context (e.g. for Dash's `set_props`).
+
+    Builds are first admitted by the build queue, which may raise `BuildRejected`
+    (see `BuildQueue.admit`). The time spent queued is added to the builder's
+    timings, and a degraded build uses a sample of the rows.
+    """
+    if build_queue is None:
+        return _run(builder, progress)
+
+    with build_queue.admit(client, degradable) as ticket:
+        if ticket.sample_fraction:
+            builder.sample_fraction = ticket.sample_fraction
+        fig = _run(builder, progress)
+    builder.timings["queue"] = ticket.queue_ms
+    return fig
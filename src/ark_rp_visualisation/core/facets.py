@@ -0,0 +1,96 @@
+from functools import lru_cache
+from typing import Any
+
+import pandas as pd
+
+from .enums import Field, Filter, FilterOption, Operator
+from .models import FilterConfig, FilterGroup, _add_derived_field
+
+# Number of filter states whose counts are kept per FacetIndex
+FACET_CACHE_SIZE = 256
+
+# Filters with few enough values to roll messages up by
+ROLLUP_FILTERS = [
+    filter
+    for filter in Filter
+    if filter.select_kwargs.get("data") == FilterOption.FIELD_UNIQUE
+]
+
+# A hashable filter state: (field, operator, value) for each active filter
+FilterKey = tuple[tuple[str, str, Any], ...]
+
+
+def make_filter_key(filter_config: FilterConfig) -> FilterKey:
+    """Return a hashable key for a FilterConfig, independent of filter order."""
+    return tuple(
+        sorted(
+            (
+                f.field.value,
+                f.operator.value,
+                tuple(f.value) if isinstance(f.value, list) else f.value,
+            )
+            for f in filter_config.filters
+        )
+    )
+
+
+class FacetIndex:
+    """
+    Message counts by filterable field, for computing faceted filter options.
+
+    Messages are rolled up by author and channel once, so a filter state on only
+    those needs to filter the (much smaller) rollup instead of the whole dataset.
+    Dates, hours and reaction counts have so many combinations that a rollup by
+    them would be nearly as long as the dataset, so filter states using them
+    filter the dataset's columns instead.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        # Selected columns share their data with the dataset rather than copying it
+        self.df = df[[Field.DATETIME, *(f for f in Filter if f in df.columns)]]
+
+        fields = [Field(filter) for filter in ROLLUP_FILTERS]
+        self.rollup = (
+            self.df.groupby(fields, observed=True, dropna=False)
+            .size()
+            .rename(Field.COUNT)
+            .reset_index()
+        )
+        self.counts = lru_cache(maxsize=FACET_CACHE_SIZE)(self._counts)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the rollup, which isn't shared with the dataset."""
+        return int(self.rollup.memory_usage(deep=True).sum())
+
+    def column(self, field: Field) -> pd.Series:
+        """Return the values of a filterable field, from the rollup if rolled up."""
+        if field in self.rollup.columns:
+            return self.rollup[field]
+        return _add_derived_field(self.df.copy(deep=False), field)[field]
+
+    def _counts(self, field: Field, key: FilterKey) -> pd.Series:
+        filter_config = FilterConfig(
+            [
+                FilterGroup(
+                    Field(f),
+                    Operator(operator),
+                    list(value) if isinstance(value, tuple) else value,
+                )
+                for f, operator, value in key
+            ]
+        )
+        fields = {field, *(f.field for f in filter_config.filters)}
+        if fields <= set(self.rollup.columns):
+            filtered = filter_config.apply(self.rollup)
+            counts = filtered.groupby(field, observed=True)[Field.COUNT].sum()
+        else:
+            df = self.df.copy(deep=False)
+            for f in fields:
+                df = _add_derived_field(df, f)
+            counts = filter_config.apply(df)[field].value_counts()
+        return counts[counts > 0]
+
+    def get_counts(self, field: Field, filter_config: FilterConfig) -> pd.Series:
+        """Return the number of messages for each value of `field` under the filters."""
+        return self.counts(field, make_filter_key(filter_config))
@@ -0,0 +1,115 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from ark_rp_visualisation.utils.serialisation import state_key
+from ark_rp_visualisation.utils.single_flight import FileSingleFlight, SingleFlight
+
+from . import executor
+from .data_loader import DataLoader
+from .plot_builder import PlotBuilder
+from .snapshot import DatasetSnapshot
+
+# Number of figures kept in memory by each worker
+FIGURE_CACHE_SIZE = int(os.getenv("FIGURE_CACHE_SIZE", 64))
+# Shared by every gunicorn worker if set, otherwise builds are coalesced per worker
+SINGLE_FLIGHT_DIR = os.getenv("SINGLE_FLIGHT_DIR")
+
+
+@dataclass(frozen=True)
+class CachedFigure:
+    # Hash of the graph state and dataset version, which changes with the figure
+    etag: str
+    json: str
+
+
+class FigureCache:
+    """
+    LRU cache of figure JSON, keyed by graph state and dataset version.
+    A reload of the dataset changes the key, so stale figures are never served.
+    """
+
+    def __init__(self, size: int = FIGURE_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._figures: OrderedDict[str, str] = OrderedDict()
+        # Shared graph links are often opened by many users at once
+        self._builds: SingleFlight[str] = (
+            FileSingleFlight(SINGLE_FLIGHT_DIR, str, str)
+            if SINGLE_FLIGHT_DIR
+            else SingleFlight()
+        )
+
+    def etag(
+        self, state: dict[str, Any], snapshot: DatasetSnapshot | None = None
+    ) -> str:
+        """
+        Return the ETag of a graph state's figure, without building it.
+        The figure is of `snapshot` if given, otherwise of the current snapshot.
+        """
+        snapshot = snapshot or DataLoader().get_state_snapshot(state)
+        return state_key(state, snapshot.version)
+
+    def peek(
+        self, state: dict[str, Any], snapshot: DatasetSnapshot | None = None
+    ) -> CachedFigure | None:
+        """Return the figure of a graph state if it's cached, without building it."""
+        etag = self.etag(state, snapshot)
+        with self._lock:
+            figure = self._figures.get(etag)
+            if figure is None:
+                return None
+            self._figures.move_to_end(etag)
+            return CachedFigure(etag, figure)
+
+    def get(
+        self, state: dict[str, Any], snapshot: DatasetSnapshot | None = None
+    ) -> CachedFigure:
+        """
+        Return the figure of a graph state, building it on a miss.
+        The figure is of `snapshot` if given, otherwise of the current snapshot.
+        Identical concurrent builds are shared (see `SingleFlight`).
+        """
+        # Read once, so the figure and its ETag are of the same dataset version
+        snapshot = snapshot or DataLoader().get_state_snapshot(state)
+        etag = state_key(state, snapshot.version)
+
+        with self._lock:
+            figure = self._figures.get(etag)
+            if figure is not None:
+                self._figures.move_to_end(etag)
+                return CachedFigure(etag, figure)
+
+        figure = self._builds.do(
+            etag,
+            lambda: pio.to_json(
+                executor.build(PlotBuilder.from_state(state, df=snapshot.df))
+            ),
+        )
+        return self._store(etag, figure)
+
+    def put(
+        self, state: dict[str, Any], snapshot: DatasetSnapshot, figure: go.Figure
+    ) -> CachedFigure:
+        """Cache a figure of a graph state built elsewhere, e.g. on the dashboard."""
+        return self._store(state_key(state, snapshot.version), pio.to_json(figure))
+
+    def _store(self, etag: str, figure: str) -> CachedFigure:
+        with self._lock:
+            self._figures[etag] = figure
+            self._figures.move_to_end(etag)
+            while len(self._figures) > self.size:
+                self._figures.popitem(last=False)
+        return CachedFigure(etag, figure)
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+figure_cache = FigureCache()
@@ -0,0 +1,434 @@
+"""
+Validation and compact binary packing of graph states (see `render_graph`).
+
+A packed state replaces enum values with their index in the enum, dates with
+day offsets, and strings (e.g. authors and channels) with indexes into a table
+of the distinct strings in the state. New enum members must be appended, or
+`FORMAT_VERSION` bumped, so that older links keep decoding to the same state.
+"""
+
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, TypeVar
+
+from .enums import Field, Filter, GroupBy, Operator, Tab, Text
+
+FORMAT_VERSION = 2
+# Versions which still decode. Version 1 packed unset checkboxes as unchecked
+FORMAT_VERSIONS = {1, 2}
+# Dates are packed as days since this
+DATE_EPOCH = date(2024, 1, 1)
+
+AXES = [[Text.Y_AXIS, Text.X_AXIS], [Text.X_AXIS, Text.Y_AXIS]]
+SORT_ORDERS = [Text.ASCENDING, Text.DESCENDING]
+SORT_AXES = [Text.X_AXIS, Text.Y_AXIS]
+LABEL_KEYS = ("title", "x_label", "y_label")
+CUSTOM_KEYS = {
+    *LABEL_KEYS,
+    "x_log",
+    "y_log",
+    "moving_averages",
+    "sort_order",
+    "sort_axis",
+}
+STATE_KEYS = {"tab", "fields", "axes", "aggs", "filters", "custom"}
+
+E = TypeVar("E", bound=Enum)
+
+# Enum metadata is rebuilt on every access, so the parts checked are kept here
+ALLOWED_FIELDS = {tab: [set(spec["allowed"]) for spec in tab.fields] for tab in Tab}
+ALLOWED_OPERATORS = {filter: set(filter.operators) for filter in Filter}
+MEMBERS = {enum: list(enum) for enum in (Field, Filter, GroupBy, Operator, Tab)}
+# Values of optional codes, where 0 is None
+OPTIONAL_VALUES = {
+    enum: [None, *(member.value for member in members)]
+    for enum, members in MEMBERS.items()
+}
+# Checkboxes which were never checked are None, so are packed as one of three
+CHECKBOX_STATES = [None, False, True]
+CODES = {
+    enum: {member: index for index, member in enumerate(members)}
+    for enum, members in MEMBERS.items()
+}
+
+
+def _member(enum: type[E], value: Any, name: str) -> E:
+    try:
+        return enum(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value!r}") from None
+
+
+def _check(condition: bool, message: str):
+    if not condition:
+        raise ValueError(message)
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.fromisoformat(value).date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date: {value!r}") from None
+
+
+def _validate_filter_value(filter: Filter, value: Any):
+    if value is None or value == "":
+        return
+    if filter is Filter.DATE:
+        _parse_date(value)
+    elif filter in {Filter.AUTHOR, Filter.CHANNEL_NAME}:
+        _check(
+            isinstance(value, list) and all(isinstance(v, str) for v in value),
+            f"Invalid {filter} filter value",
+        )
+    elif filter is Filter.HOUR:
+        _check(
+            isinstance(value, (str, int)) and str(value) in map(str, range(24)),
+            f"Invalid hour: {value!r}",
+        )
+    elif filter is Filter.REACTION_COUNT:
+        _check(type(value) is int and value >= 0, f"Invalid reaction count: {value!r}")
+
+
+def validate_state(state: Any):
+    """Raise a ValueError if a graph state can't be built into a graph."""
+    _check(isinstance(state, dict), "Graph state must be an object")
+    _check(
+        STATE_KEYS <= state.keys() <= STATE_KEYS | {"dataset"},
+        "Invalid graph state keys",
+    )
+    _check(isinstance(state.get("dataset", ""), str), "Dataset must be a string")
+
+    tab = _member(Tab, state["tab"], "tab")
+    fields = state["fields"]
+    _check(
+        isinstance(fields, list) and len(fields) == len(ALLOWED_FIELDS[tab]),
+        f"The {tab} tab has {len(ALLOWED_FIELDS[tab])} fields",
+    )
+    for field, allowed in zip(fields, ALLOWED_FIELDS[tab]):
+        _check(
+            _member(Field, field, "field") in allowed,
+            f"Field {field!r} is not allowed here",
+        )
+
+    _check(state["axes"] in AXES, "Invalid axes")
+
+    aggs = state["aggs"]
+    _check(isinstance(aggs, list) and len(aggs) <= len(fields), "Invalid aggs")
+    for agg in aggs:
+        if agg is not None:
+            _member(GroupBy, agg, "aggregation")
+
+    filters = state["filters"]
+    _check(
+        isinstance(filters, list)
+        and len(filters) == 3
+        and all(isinstance(column, list) for column in filters)
+        and len({len(column) for column in filters}) == 1,
+        "Invalid filters",
+    )
+    for filter_type, operator, value in zip(*filters):
+        if filter_type is None or operator is None:
+            _check(value in (None, ""), "Incomplete filter has a value")
+            continue
+        filter = _member(Filter, filter_type, "filter")
+        _check(
+            _member(Operator, operator, "operator") in ALLOWED_OPERATORS[filter],
+            f"Invalid operator for the {filter} filter: {operator!r}",
+        )
+        _validate_filter_value(filter, value)
+
+    custom = state["custom"]
+    _check(
+        isinstance(custom, dict) and custom.keys() == CUSTOM_KEYS,
+        "Invalid customisation",
+    )
+    for key in LABEL_KEYS:
+        _check(isinstance(custom[key], str | None), f"Invalid {key}")
+    # Checkboxes which were never checked are None
+    for key in ("x_log", "y_log"):
+        _check(custom[key] in (None, True, False), f"Invalid {key}")
+    _check(custom["sort_order"] in [None, *SORT_ORDERS], "Invalid sort order")
+    _check(custom["sort_axis"] in [None, *SORT_AXES], "Invalid sort axis")
+    moving_averages = custom["moving_averages"]
+    _check(
+        isinstance(moving_averages, dict)
+        and all(
+            str(window).isdigit() and enabled in (None, True, False)
+            for window, enabled in moving_averages.items()
+        ),
+        "Invalid moving averages",
+    )
+
+
+def default_state(tab: Tab, dataset_id: str) -> dict[str, Any]:
+    """
+    Return the state of a Tab's graph as the dashboard first sends it, with each
+    field left empty set to the first allowed field that doesn't repeat another
+    or add a second temporal field (as the field dropdowns enforce).
+    """
+    fields = []
+    for spec in tab.fields:
+        field = spec.get("default") or next(
+            field
+            for field in spec["allowed"]
+            if field not in fields
+            and not (field.temporal and any(f.temporal for f in fields))
+        )
+        fields.append(field)
+
+    # The last field is grouped by, the others use their first aggregation
+    *aggregated, _ = fields
+    return {
+        "dataset": dataset_id,
+        "tab": tab.value,
+        "fields": [field.value for field in fields],
+        "axes": [Text.Y_AXIS.value, Text.X_AXIS.value],
+        "aggs": [field.aggregations[0].value for field in aggregated],
+        "filters": [
+            [filter.value for filter in Filter],
+            [filter.default_operator.value for filter in Filter],
+            [None for _ in Filter],
+        ],
+        "custom": {
+            **{key: None for key in CUSTOM_KEYS},
+            "moving_averages": {"7": None, "30": None},
+        },
+    }
+
+
+class _Writer:
+    def __init__(self):
+        self.data = bytearray()
+        self.strings: dict[str, int] = {}
+
+    def uint(self, value: int):
+        # LEB128 varint: 7 bits per byte, with the high bit set on all but the last
+        while value >= 0x80:
+            self.data.append(value & 0x7F | 0x80)
+            value >>= 7
+        self.data.append(value)
+
+    def code(self, enum: type[Enum], value: Any):
+        self.uint(CODES[enum][enum(value)])
+
+    def optional_code(self, enum: type[Enum], value: Any):
+        self.uint(0 if value is None else CODES[enum][enum(value)] + 1)
+
+    def optional_string(self, value: str | None):
+        self.uint(
+            0
+            if value is None
+            else self.strings.setdefault(value, len(self.strings)) + 1
+        )
+
+    def finish(self) -> bytes:
+        table = _Writer()
+        table.uint(len(self.strings))
+        for string in self.strings:
+            encoded = string.encode("utf-8")
+            table.uint(len(encoded))
+            table.data += encoded
+        return bytes(table.data + self.data)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+        self.strings = [self._raw_string() for _ in range(self.uint())]
+
+    def uint(self) -> int:
+        # LEB128 varint, read with locals as it's called for nearly every byte
+        data, position = self.data, self.position
+        value = shift = 0
+        while True:
+            if position >= len(data):
+                raise ValueError("Truncated graph state")
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.position = position
+                return value
+            shift += 7
+            _check(shift < 64, "Varint too long")
+
+    def _raw_string(self) -> str:
+        length = self.uint()
+        _check(self.position + length <= len(self.data), "Truncated graph state")
+        raw = self.data[self.position : self.position + length]
+        self.position += length
+        return raw.decode("utf-8")
+
+    def code(self, enum: type[E]) -> E:
+        members = MEMBERS[enum]
+        index = self.uint()
+        _check(index < len(members), f"Invalid {enum.__name__} code: {index}")
+        return members[index]
+
+    def optional_value(self, enum: type[Enum]) -> Any:
+        """Read an optional code, and return the value of its member or None."""
+        values = OPTIONAL_VALUES[enum]
+        index = self.uint()
+        if index >= len(values):
+            raise ValueError(f"Invalid {enum.__name__} code: {index}")
+        return values[index]
+
+    def optional_string(self) -> str | None:
+        index = self.uint()
+        _check(index <= len(self.strings), f"Invalid string index: {index}")
+        return self.strings[index - 1] if index else None
+
+
+def _pack_filter_value(writer: _Writer, filter: Filter, value: Any):
+    # 0 is an empty value, so present values are offset by one
+    if value is None or value == "":
+        writer.uint(0)
+    elif filter is Filter.DATE:
+        days = (_parse_date(value) - DATE_EPOCH).days
+        # Zigzag encoded, so dates before the epoch stay small too
+        writer.uint((days << 1 ^ days >> 63) + 1)
+    elif filter in {Filter.AUTHOR, Filter.CHANNEL_NAME}:
+        writer.uint(len(value) + 1)
+        for string in value:
+            writer.optional_string(string)
+    else:
+        writer.uint(int(value) + 1)
+
+
+def _unpack_filter_value(reader: _Reader, filter: Filter | str) -> Any:
+    packed = reader.uint()
+    if not packed:
+        return None
+    packed -= 1
+    if filter == Filter.DATE:
+        days = packed >> 1 ^ -(packed & 1)
+        return date.fromordinal(DATE_EPOCH.toordinal() + days).isoformat()
+    if filter in {Filter.AUTHOR, Filter.CHANNEL_NAME}:
+        values = [reader.optional_string() for _ in range(packed)]
+        _check(None not in values, f"Invalid {filter} filter value")
+        return values
+    if filter == Filter.HOUR:
+        _check(packed < 24, f"Invalid hour: {packed}")
+        # Hours are selected as strings
+        return str(packed)
+    return packed
+
+
+def pack_state(state: dict[str, Any]) -> bytes:
+    """Validate a graph state, and pack it into bytes (without the format version)."""
+    validate_state(state)
+    writer = _Writer()
+
+    writer.optional_string(state.get("dataset"))
+    writer.code(Tab, state["tab"])
+    # The number of fields is fixed by the tab
+    for field in state["fields"]:
+        writer.code(Field, field)
+    writer.uint(AXES.index(state["axes"]))
+    writer.uint(len(state["aggs"]))
+    for agg in state["aggs"]:
+        writer.optional_code(GroupBy, agg)
+
+    filter_types, operators, values = state["filters"]
+    writer.uint(len(filter_types))
+    for filter_type, operator, value in zip(filter_types, operators, values):
+        writer.optional_code(Filter, filter_type)
+        writer.optional_code(Operator, operator)
+        if filter_type is not None and operator is not None:
+            _pack_filter_value(writer, Filter(filter_type), value)
+
+    custom = state["custom"]
+    for key in LABEL_KEYS:
+        writer.optional_string(custom[key])
+    writer.uint(
+        CHECKBOX_STATES.index(custom["x_log"])
+        + CHECKBOX_STATES.index(custom["y_log"]) * len(CHECKBOX_STATES)
+    )
+    writer.uint(
+        0
+        if custom["sort_order"] is None
+        else SORT_ORDERS.index(custom["sort_order"]) + 1
+    )
+    writer.uint(
+        0 if custom["sort_axis"] is None else SORT_AXES.index(custom["sort_axis"]) + 1
+    )
+    writer.uint(len(custom["moving_averages"]))
+    for window, enabled in custom["moving_averages"].items():
+        writer.uint(int(window) * len(CHECKBOX_STATES) + CHECKBOX_STATES.index(enabled))
+
+    return writer.finish()
+
+
+def unpack_state(data: bytes, version: int = FORMAT_VERSION) -> dict[str, Any]:
+    """
+    Unpack a graph state packed by `pack_state` (or by an older format `version`),
+    raising a ValueError if it's invalid.
+
+    Packing leaves no way to encode most invalid states (e.g. unknown enum values
+    or customisation keys), so only what it can't rule out is checked here,
+    rather than validating the whole state again.
+    """
+    try:
+        reader = _Reader(data)
+
+        state = {}
+        dataset = reader.optional_string()
+        if dataset is not None:
+            state["dataset"] = dataset
+        tab = reader.code(Tab)
+        state["tab"] = tab.value
+        fields = []
+        for allowed in ALLOWED_FIELDS[tab]:
+            field = reader.code(Field)
+            if field not in allowed:
+                raise ValueError(f"Field {field.value!r} is not allowed here")
+            fields.append(field.value)
+        state["fields"] = fields
+        axes = reader.uint()
+        _check(axes < len(AXES), "Invalid axes")
+        state["axes"] = [axis.value for axis in AXES[axes]]
+        num_aggs = reader.uint()
+        _check(num_aggs <= len(fields), "Invalid aggs")
+        state["aggs"] = [reader.optional_value(GroupBy) for _ in range(num_aggs)]
+
+        filters = [[], [], []]
+        for _ in range(reader.uint()):
+            filter_type = reader.optional_value(Filter)
+            operator = reader.optional_value(Operator)
+            value = None
+            if filter_type is not None and operator is not None:
+                # Members are compared and hashed as their string values
+                if operator not in ALLOWED_OPERATORS[filter_type]:
+                    raise ValueError(
+                        f"Invalid operator for the {filter_type} filter: {operator!r}"
+                    )
+                value = _unpack_filter_value(reader, filter_type)
+            filters[0].append(filter_type)
+            filters[1].append(operator)
+            filters[2].append(value)
+        state["filters"] = filters
+
+        custom = {key: reader.optional_string() for key in LABEL_KEYS}
+        # Version 1 packed checkboxes as bits, so unset ones decode as unchecked
+        states = CHECKBOX_STATES if version > 1 else [False, True]
+        flags = reader.uint()
+        _check(flags < len(states) ** 2, "Invalid flags")
+        custom["x_log"] = states[flags % len(states)]
+        custom["y_log"] = states[flags // len(states)]
+        sort_order, sort_axis = reader.uint(), reader.uint()
+        _check(sort_order <= len(SORT_ORDERS), "Invalid sort order")
+        _check(sort_axis <= len(SORT_AXES), "Invalid sort axis")
+        custom["sort_order"] = SORT_ORDERS[sort_order - 1].value if sort_order else None
+        custom["sort_axis"] = SORT_AXES[sort_axis - 1].value if sort_axis else None
+        custom["moving_averages"] = {}
+        for _ in range(reader.uint()):
+            window, enabled = divmod(reader.uint(), len(states))
+            custom["moving_averages"][str(window)] = states[enabled]
+        state["custom"] = custom
+
+        _check(reader.position == len(data), "Trailing bytes after graph state")
+    except UnicodeDecodeError:
+        raise ValueError("Invalid string in graph state") from None
+    return state
@@ -0,0 +1,41 @@
+from typing import Any
+
+import pandas as pd
+
+from .enums import Field, Filter, FilterOption
+from .facets import FacetIndex
+from .option_index import OptionIndex
+
+
+class DatasetMetadata:
+    """
+    Filter options and value ranges of one version of the dataset.
+
+    Options are read from the FacetIndex rollup, so the dataset itself is only
+    scanned for them once, when the rollup is built.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: str):
+        self.version = version
+        self.facets = FacetIndex(df)
+
+        self.option_indexes: dict[Filter, OptionIndex] = {}
+        self.ranges: dict[Filter, tuple[Any, Any]] = {}
+        for filter in Filter:
+            column = self.facets.column(Field(filter)).dropna()
+            if filter.select_kwargs.get("data") == FilterOption.FIELD_UNIQUE:
+                self.option_indexes[filter] = OptionIndex(column.unique())
+            elif len(column):
+                low, high = column.agg(["min", "max"]).tolist()
+                self.ranges[filter] = (low, high)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the approximate memory used by the facets and option indexes."""
+        return self.facets.nbytes + sum(
+            index.nbytes for index in self.option_indexes.values()
+        )
+
+    def get_range(self, filter: Filter) -> tuple[Any, Any] | None:
+        """Return the smallest and largest value of a filter, if it has any."""
+        return self.ranges.get(filter)
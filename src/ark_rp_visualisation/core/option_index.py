@@ -0,0 +1,84 @@
+import sys
+from collections import defaultdict
+from itertools import islice
+from typing import Callable, Iterable
+
+TRIGRAM_LENGTH = 3
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + TRIGRAM_LENGTH] for i in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+class OptionIndex:
+    """
+    Case-insensitive substring search over the values of a categorical field.
+
+    Queries of at least three characters only check values sharing all of the
+    query's trigrams. Matches at the start of a value rank first, then matches at
+    the start of a word, then any other matches, each in sorted order.
+    """
+
+    def __init__(self, values: Iterable[str]):
+        self.values = sorted(set(values))
+        self._folded = [value.casefold() for value in self.values]
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        for i, text in enumerate(self._folded):
+            for trigram in _trigrams(text):
+                self._postings[trigram].add(i)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the approximate memory used by the values and trigram postings."""
+        return sum(map(sys.getsizeof, self.values + self._folded)) + sum(
+            sys.getsizeof(trigram) + sys.getsizeof(postings)
+            for trigram, postings in self._postings.items()
+        )
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        if len(query) < TRIGRAM_LENGTH:
+            return range(len(self.values))
+
+        postings = sorted(
+            (self._postings.get(trigram, set()) for trigram in _trigrams(query)),
+            key=len,
+        )
+        return sorted(set.intersection(*postings))
+
+    def search(
+        self,
+        query: str | None,
+        limit: int,
+        predicate: Callable[[str], bool] | None = None,
+    ) -> list[str]:
+        """
+        Return up to `limit` values containing `query`, best matches first.
+        If given, only values for which `predicate` is true are returned.
+        """
+        query = (query or "").strip().casefold()
+        if not query:
+            if predicate is None:
+                return self.values[:limit]
+            return list(islice(filter(predicate, self.values), limit))
+
+        prefix, word, other = [], [], []
+        for i in self._candidates(query):
+            text = self._folded[i]
+            position = text.find(query)
+            if position == -1:
+                continue
+            if predicate is not None and not predicate(self.values[i]):
+                continue
+            if position == 0:
+                prefix.append(self.values[i])
+                # Nothing can rank higher than the first `limit` prefix matches
+                if len(prefix) == limit:
+                    break
+            elif not text[position - 1].isalnum():
+                word.append(self.values[i])
+            else:
+                other.append(self.values[i])
+        return (prefix + word + other)[:limit]
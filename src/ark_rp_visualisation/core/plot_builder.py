@@ -5,18 +5,26 @@ Graph = The Dash component/UI (e.g. dcc.Graph, match_graph, register_graph_callb
 Plot = The type or logic (e.g. PlotBuilder, PlotType.LINE, plot_type)
 """
 
-from typing import Optional
+import os
+from typing import Any, Callable, Optional
 
+import numpy as np
 import pandas as pd
 
 from ark_rp_visualisation.utils.logging_setup import get_logger
+from ark_rp_visualisation.utils.profiling import stage
 
 from . import DataLoader
-from .enums import Field, PlotType, Text
+from .downsample import LINE_POINT_BUDGET, as_numbers, downsample_indices
+from .enums import Field, GroupBy, PlotType, Tab, Text
+from .figure_factory import make_figure
 from .models import AxisConfig, FigureConfig, FilterConfig
 
 logger = get_logger(__name__)
 
+# Scatter and line plots with more points than this are drawn with WebGL
+WEBGL_POINT_THRESHOLD = int(os.getenv("WEBGL_POINT_THRESHOLD", 1000))
+
 
 class PlotBuilder:
     def __init__(
@@ -25,21 +33,64 @@ class PlotBuilder:
         axis_config: AxisConfig,
         filter_config: FilterConfig,
         figure_config: FigureConfig,
+        df: Optional[pd.DataFrame] = None,
     ):
-        self._df = DataLoader().df.copy()
+        # Default to the loaded dataset. With Copy-on-Write, a shallow copy is enough
+        # to add columns without changing the dataset shared with other requests
+        self._df = (DataLoader().df if df is None else df).copy(deep=False)
         self._fig = None
+        # Milliseconds spent in each stage of the last build
+        self.timings: dict[str, float] = {}
+        # If set, the figure is built from this fraction of the rows, and marked
+        # as approximate
+        self.sample_fraction: Optional[float] = None
+        # Line plots are downsampled to this many points. If `time_range` is set
+        # (e.g. when zoomed in), only points in it are plotted
+        self.point_budget = LINE_POINT_BUDGET
+        self.time_range: Optional[tuple[Any, Any]] = None
+        # Build the figure with plotly express rather than `make_figure`, which
+        # makes the same figure faster. Kept to compare against (see perf.benchmark)
+        self.express = False
 
         self.plot_type = plot_type
         self.axis_config = axis_config
         self.filter_config = filter_config
         self.figure_config = figure_config
 
+    @classmethod
+    def from_state(cls, state: dict[str, Any], df: Optional[pd.DataFrame] = None):
+        """Create a PlotBuilder from a graph state (see `encode_state`)."""
+        active_tab = Tab(state["tab"])
+        if df is None:
+            df = DataLoader().get_state_snapshot(state).df
+        return cls(
+            plot_type=PlotType(active_tab.plot_type),
+            axis_config=AxisConfig.from_raw(
+                selected_fields=state["fields"],
+                selected_axes=state["axes"],
+                selected_aggregations=state["aggs"],
+            ),
+            filter_config=FilterConfig.from_raw(*state["filters"]),
+            figure_config=FigureConfig.from_raw(**state["custom"]),
+            df=df,
+        )
+
     def groupby(self):
         """Aggregate and group the current DataFrame."""
         *rest, grouping_field = self.axis_config.fields
         grouped = self._df.groupby(grouping_field, observed=False)[rest]
         self._df = grouped.agg(self.axis_config.aggregations).reset_index()
 
+        if self.sample_fraction:
+            # Scale totals of the sample up to estimate those of every row.
+            # Means need no scaling, while distinct counts stay underestimates
+            totals = [
+                field
+                for field, agg in self.axis_config.aggregations.items()
+                if agg == GroupBy.SUM
+            ]
+            self._df[totals] = (self._df[totals] / self.sample_fraction).round()
+
     def apply_sort(self):
         sort = self.figure_config.sort
 
@@ -67,13 +118,14 @@ class PlotBuilder:
             " by "
             f"{self.axis_config.get_label(secondary_field, self.figure_config, 'title')}"
         )
+        if self.sample_fraction:
+            title = f"{title} ({Text.APPROXIMATE})"
         labels = {
             field: self.axis_config.get_label(field, self.figure_config, "axis")
             for field in self.axis_config.fields
         }
 
-        self._fig = self.plot_type(
-            self._df,
+        kwargs = dict(
             x=self.axis_config.x_axis,
             y=self.axis_config.y_axis,
             title=title,
@@ -82,6 +134,15 @@ class PlotBuilder:
             log_y=self.figure_config.y_log,
             text=tertiary_field[0] if tertiary_field else None,
         )
+        if self.express:
+            # Bars have no WebGL version
+            if self.plot_type != PlotType.BAR:
+                kwargs["render_mode"] = "webgl" if self.webgl else "svg"
+            self._fig = self.plot_type(self._df, **kwargs)
+        else:
+            self._fig = make_figure(
+                self.plot_type, self._df, **kwargs, webgl=self.webgl
+            )
 
     def add_moving_average_line(self, window: int, label: Optional[str] = None):
         """
@@ -106,8 +167,13 @@ class PlotBuilder:
         # Add a new trace for the moving average
         self._fig.add_trace(
             dict(
+                # Drawn with WebGL if the points it averages are
+                type="scattergl"
+                if self._fig.data[0].type == "scattergl"
+                else "scatter",
                 x=x_values,
-                y=ma_values,
+                # As an array, so it's sent base64-encoded like the other traces
+                y=ma_values.to_numpy(),
                 mode="lines",
                 name=label,
                 line=dict(dash="dot"),
@@ -151,18 +217,96 @@ class PlotBuilder:
         for window in self.figure_config.moving_averages:
             self.add_moving_average_line(window)
 
-    def build(self):
-        # 1. Prepare data (add derived columns needed by axes and filters)
+    @property
+    def time_axis(self) -> str:
+        """Return the axis ("x" or "y") of the grouped by field, e.g. dates."""
+        *_, grouping_field = self.axis_config.fields
+        return "x" if self.axis_config.x_axis == grouping_field else "y"
+
+    @property
+    def webgl(self) -> bool:
+        """
+        Return whether to draw points with WebGL, which renders many points much
+        faster than SVG. Line plots count the points left after downsampling.
+        """
+        points = len(self._df)
+        if self.plot_type == PlotType.LINE:
+            points = min(points, self.point_budget)
+        return points > WEBGL_POINT_THRESHOLD
+
+    def downsample(self):
+        """
+        Downsample line plots to at most `point_budget` points (see `lttb_indices`).
+        The points are chosen from the first trace, and the same points are kept of
+        the moving averages, so they stay aligned with it.
+        """
+        if self.plot_type != PlotType.LINE or not self._fig.data:
+            return
+
+        time_axis = self.time_axis
+        value_axis = "y" if time_axis == "x" else "x"
+        times = as_numbers(self._fig.data[0][time_axis])
+        time_range = None
+        if self.time_range is not None:
+            time_range = tuple(
+                pd.Timestamp(bound).as_unit("ns").value for bound in self.time_range
+            )
+            # Keep the view, rather than zooming out to the points kept
+            self._fig.update_layout({f"{time_axis}axis": {"range": self.time_range}})
+
+        kept = downsample_indices(
+            times,
+            as_numbers(self._fig.data[0][value_axis]),
+            self.point_budget,
+            time_range,
+        )
+        if len(kept) == len(times):
+            return
+
+        for trace in self._fig.data:
+            trace.update(x=np.asarray(trace.x)[kept], y=np.asarray(trace.y)[kept])
+        if len(kept) == self.point_budget:
+            # Cut down to the budget, rather than just to the time range. Tells the
+            # dashboard to fetch the points hidden here when zoomed in
+            self._fig.update_layout(meta={"downsampled_from": len(times)})
+
+    def apply_sample(self):
+        """Keep a random sample of the rows, for a faster but approximate figure."""
+        # Seeded, so the same graph is approximated the same way each time
+        self._df = self._df.sample(frac=self.sample_fraction, random_state=0)
+
+    def prepare(self):
+        """Add the derived columns needed by axes and filters."""
         self._df = self.axis_config.prepare_dataframe(self._df)
         self._df = self.filter_config.prepare_dataframe(self._df)
 
-        # 2. Filter data
+    def apply_filters(self):
         self._df = self.filter_config.apply(self._df)
 
-        # 3. Process and plot
-        self.groupby()
-        self.apply_sort()
-        self.make_figure()
-        self.format_figure()
+    def build(self, progress: Optional[Callable[[float], None]] = None):
+        """
+        Build the figure.
+        If given, `progress` is called with the fraction of stages done after each one.
+        """
+        self.timings = {}
+        stages = [
+            # 1. Prepare data
+            *([("sample", self.apply_sample)] if self.sample_fraction else []),
+            ("prepare", self.prepare),
+            # 2. Filter data
+            ("filter", self.apply_filters),
+            # 3. Process and plot
+            ("groupby", self.groupby),
+            ("sort", self.apply_sort),
+            ("make_figure", self.make_figure),
+            ("format_figure", self.format_figure),
+            ("downsample", self.downsample),
+        ]
+
+        for done, (name, run) in enumerate(stages, start=1):
+            with stage(name, self.timings):
+                run()
+            if progress:
+                progress(done / len(stages))
 
         return self._fig
@@ -0,0 +1,47 @@
+import hashlib
+from functools import cached_property
+
+import pandas as pd
+
+from ark_rp_visualisation.utils.profiling import stage
+
+from .metadata import DatasetMetadata
+
+
+class DatasetSnapshot:
+    """
+    One loaded version of the dataset, which must not be modified once published.
+
+    A request reads the snapshot once and uses it throughout,
+    so a reload swapping in a new snapshot never changes data under a request.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    @cached_property
+    def version(self) -> str:
+        """
+        Return a short fingerprint of the DataFrame's contents.
+        Identical datasets have the same version across processes and restarts.
+        """
+        hashes = pd.util.hash_pandas_object(self.df, index=False)
+        return hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()[:12]
+
+    @cached_property
+    def nbytes(self) -> int:
+        """Return the memory used by the DataFrame and its metadata."""
+        return int(self.df.memory_usage(deep=True).sum()) + self.metadata.nbytes
+
+    @cached_property
+    def metadata(self) -> DatasetMetadata:
+        """Return the filter options and value ranges of the DataFrame."""
+        with stage("metadata"):
+            return DatasetMetadata(self.df, self.version)
+
+    def warm(self) -> "DatasetSnapshot":
+        """
+        Compute the version and metadata now, rather than on the first request.
+        """
+        _ = self.metadata
+        return self
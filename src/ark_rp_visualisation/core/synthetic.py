@@ -0,0 +1,237 @@
+"""
+Vectorised synthetic dataset generator for load and benchmark testing.
+
+Generated DataFrames have the columns of `DataLoader.read_path(path, clean=False)`,
+though CONTENT and ATTACHMENTS are categorical rather than strings, so millions of
+messages cost little more than their codes. Both are sensitive fields, dropped
+before any graph is built. DataFrames can be written out as raw CSVs in the
+DiscordChatExporter layout to exercise ingestion:
+    python -m ark_rp_visualisation.core.synthetic --rows 1000000 --csv-dir data/synthetic
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .enums import Field
+
+TIME_ZONE = "Australia/Sydney"
+# DiscordChatExporter's date format, readable with DATE_FORMAT
+CSV_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+AUTHOR_NAMES = ["Aria", "Lyra", "Kaelen", "Solas", "Luna", "Thorne", "Mira", "Orin"]
+CHANNEL_NAMES = ["general", "rp-main", "dice-rolls", "lore", "tavern", "downtime"]
+REACTION_NAMES = ["thumbsup", "heart", "joy", "fire", "eyes", "skull", "sparkles"]
+SCENE_END_MARKER = "/end scene"
+WORDS = (
+    "the party pressed on through the ruins while torchlight flickered across "
+    "ancient stone and somewhere below something old began to stir"
+).split()
+
+# Relative posting activity for each local hour of the day (quiet mornings, busy evenings)
+DIURNAL_WEIGHTS = 1.2 + np.cos((np.arange(24) - 21) * 2 * np.pi / 24)
+
+
+def _names(base: list[str], count: int) -> list[str]:
+    """Return `count` unique names, numbering repeats of the base names."""
+    return [
+        base[i % len(base)] + (f" {i // len(base) + 1}" if i >= len(base) else "")
+        for i in range(count)
+    ]
+
+
+def _zipf_weights(count: int, skew: float) -> np.ndarray:
+    """Return Zipf-like probabilities, where rank k has weight 1 / k^skew."""
+    weights = 1 / np.arange(1, count + 1) ** skew
+    return weights / weights.sum()
+
+
+def _message_texts(max_words: int) -> list[str]:
+    """
+    Return every possible message text: plain messages with 0 to max_words words,
+    followed by the same messages ending a scene.
+    """
+    words = np.resize(WORDS, max_words)
+    plain = [" ".join(words[:count]) for count in range(max_words + 1)]
+    scene_ends = [f"{text} {SCENE_END_MARKER}".lstrip() for text in plain]
+    return plain + scene_ends
+
+
+def generate(
+    num_rows: int,
+    num_authors: int = 50,
+    num_channels: int = 10,
+    days: int = 30,
+    start: pd.Timestamp | None = None,
+    author_skew: float = 1.1,
+    channel_skew: float = 0.8,
+    scene_end_rate: float = 0.01,
+    reaction_rate: float = 0.2,
+    max_words: int = 500,
+    seed: int | None = None,
+) -> pd.DataFrame:
+    """
+    Generate `num_rows` synthetic messages.
+
+    Parameters:
+    - num_authors, num_channels: Cardinality of the author and channel columns.
+    - days, start: Messages are spread over `days` days from `start` (defaults to `days` days ago).
+    - author_skew, channel_skew: Zipf exponents for activity, higher is more skewed.
+    - scene_end_rate, reaction_rate: Fraction of messages ending a scene or with reactions.
+    - max_words: Maximum words per message.
+    - seed: Seed for reproducible datasets.
+    """
+    rng = np.random.default_rng(seed)
+
+    if start is None:
+        start = pd.Timestamp.now(tz=TIME_ZONE).normalize() - pd.Timedelta(days=days)
+    start = start.tz_localize(None) if start.tzinfo else start
+
+    # Authors and channels, skewed towards the first few
+    author_codes = rng.choice(
+        num_authors, num_rows, p=_zipf_weights(num_authors, author_skew)
+    )
+    channel_codes = rng.choice(
+        num_channels, num_rows, p=_zipf_weights(num_channels, channel_skew)
+    )
+    author_ids = 10**17 + np.arange(num_authors, dtype=np.int64)
+
+    # Local posting times follow a daily cycle
+    day_offsets = rng.integers(0, days, num_rows)
+    hours = rng.choice(24, num_rows, p=DIURNAL_WEIGHTS / DIURNAL_WEIGHTS.sum())
+    seconds = rng.integers(0, 3600, num_rows)
+    offsets = (day_offsets * 86400 + hours * 3600 + seconds) * np.int64(10**9)
+    local_datetimes = pd.DatetimeIndex(np.datetime64(start, "ns") + offsets)
+    datetimes = local_datetimes.tz_localize(
+        TIME_ZONE, ambiguous=np.zeros(num_rows, dtype=bool), nonexistent="shift_forward"
+    )
+
+    # Message lengths are long-tailed
+    words = np.clip(rng.lognormal(3.5, 1.0, num_rows), 1, max_words).astype(np.int16)
+    scene_end = rng.random(num_rows) < scene_end_rate
+    word_count = words + scene_end * len(SCENE_END_MARKER.split())
+
+    # Reaction count is the count of the most popular reaction
+    has_reaction = rng.random(num_rows) < reaction_rate
+    reaction_count = np.where(has_reaction, rng.geometric(0.5, num_rows), 0)
+
+    # Messages are categorical, so generating them costs no more than their codes
+    content_codes = words.astype(np.int32) + scene_end * (max_words + 1)
+
+    return pd.DataFrame(
+        {
+            Field.AUTHOR_ID: pd.Categorical.from_codes(
+                author_codes, categories=author_ids
+            ),
+            Field.AUTHOR: pd.Categorical.from_codes(
+                author_codes, categories=_names(AUTHOR_NAMES, num_authors)
+            ),
+            Field.DATETIME: datetimes,
+            Field.CONTENT: pd.Categorical.from_codes(
+                content_codes, categories=_message_texts(max_words)
+            ),
+            Field.ATTACHMENTS: pd.Categorical.from_codes(
+                np.zeros(num_rows, dtype=np.int8), categories=[""]
+            ),
+            Field.WORD_COUNT: pd.to_numeric(word_count, downcast="integer"),
+            Field.CHANNEL_NAME: pd.Categorical.from_codes(
+                channel_codes, categories=_names(CHANNEL_NAMES, num_channels)
+            ),
+            Field.REACTION_COUNT: pd.to_numeric(reaction_count, downcast="integer"),
+            Field.SCENE_END: scene_end,
+        }
+    )
+
+
+def _reactions(reaction_count: pd.Series, rng: np.random.Generator) -> pd.Series:
+    """
+    Format reaction counts like DiscordChatExporter, e.g. "heart (3),fire (1)".
+    Some messages get a second, less popular reaction.
+    """
+    names = np.array(REACTION_NAMES)
+    first = rng.integers(0, len(names), len(reaction_count))
+    second = (first + 1) % len(names)
+    second_count = rng.integers(0, reaction_count.to_numpy() + 1)
+
+    def format_reaction(name_indexes, counts):
+        return (
+            pd.Series(names[name_indexes], index=reaction_count.index)
+            + " ("
+            + pd.Series(counts, index=reaction_count.index).astype(str)
+            + ")"
+        )
+
+    reactions = format_reaction(first, reaction_count.to_numpy())
+    with_second = reactions + "," + format_reaction(second, second_count)
+    reactions = reactions.where(second_count == 0, with_second)
+    return reactions.where(reaction_count > 0, "")
+
+
+def write_csvs(df: pd.DataFrame, directory: str, seed: int | None = None) -> list[str]:
+    """
+    Write a generated DataFrame as one DiscordChatExporter CSV per channel.
+    Return the paths written.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for i, (channel, channel_df) in enumerate(
+        df.groupby(Field.CHANNEL_NAME, observed=True)
+    ):
+        channel_df = channel_df.sort_values(Field.DATETIME, kind="stable")
+        raw = pd.DataFrame(
+            {
+                "AuthorID": channel_df[Field.AUTHOR_ID].astype(np.int64),
+                "Author": channel_df[Field.AUTHOR],
+                "Date": channel_df[Field.DATETIME].dt.strftime(CSV_DATE_FORMAT),
+                "Content": channel_df[Field.CONTENT],
+                "Attachments": channel_df[Field.ATTACHMENTS],
+                "Reactions": _reactions(channel_df[Field.REACTION_COUNT], rng),
+            }
+        )
+
+        # Matches CHANNEL_NAME_REGEX
+        path = os.path.join(
+            directory, f"Synthetic - Text Channels - {channel} [{i}].csv"
+        )
+        raw.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--authors", type=int, default=50)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv-dir", help="write DiscordChatExporter CSVs here")
+    parser.add_argument("--parquet", help="write the DataFrame as a parquet cache here")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = generate(
+        args.rows,
+        num_authors=args.authors,
+        num_channels=args.channels,
+        days=args.days,
+        seed=args.seed,
+    )
+    print(f"Generated {len(df):,} rows in {time.perf_counter() - start:.2f}s")
+
+    if args.csv_dir:
+        start = time.perf_counter()
+        paths = write_csvs(df, args.csv_dir, seed=args.seed)
+        print(f"Wrote {len(paths)} CSVs in {time.perf_counter() - start:.2f}s")
+    if args.parquet:
+        df.to_parquet(args.parquet)
+        print(f"Wrote {args.parquet}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 from .customisation import register_customisation_callbacks
+from .datasets import register_dataset_callbacks
 from .fields import register_field_callbacks
 from .filters import register_filter_callbacks
 from .graph_ui import register_graph_callbacks
+from .tabs import register_tab_callbacks
 
 
 def register_dashboard_callbacks(app):
+    register_dataset_callbacks(app)
+    register_tab_callbacks(app)
     register_field_callbacks(app)
     register_graph_callbacks(app)
     register_filter_callbacks(app)
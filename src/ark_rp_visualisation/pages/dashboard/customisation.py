@@ -1,6 +1,5 @@
 import dash_mantine_components as dmc
 from dash import Input, Output
-from dash.exceptions import PreventUpdate
 
 from ark_rp_visualisation.pages.dashboard.patterns import (
     match_mavg_7,
@@ -129,39 +128,28 @@ def make_customisation_controls(tab: Tab):
     )
 
 
-def register_customisation_callbacks(app):
-    def reset_customisation(n_clicks):
-        if n_clicks is None:
-            raise PreventUpdate
-
-        # Set all options to empty
-        return dict(
-            title="",
-            x_label="",
-            y_label="",
-            moving_averages={
-                7: False,
-                30: False,
-            },
-            sort_order=None,
-            sort_axis=None,
-            x_log="",
-            y_log="",
-        )
+# Set all options to empty, only when the button is clicked rather than rendered
+RESET_CUSTOMISATION_JS = """
+function (nClicks) {
+    if (!nClicks) {
+        return window.dash_clientside.no_update;
+    }
+    return ["", "", "", false, false, null, null, false, false];
+}
+"""
+
 
-    app.callback(
-        output=dict(
-            title=Output(match_title_input, "value"),
-            x_label=Output(match_x_label, "value"),
-            y_label=Output(match_y_label, "value"),
-            moving_averages={
-                7: Output(match_mavg_7, "checked"),
-                30: Output(match_mavg_30, "checked"),
-            },
-            sort_order=Output(match_sort_order, "value"),
-            sort_axis=Output(match_sort_axis, "value"),
-            x_log=Output(match_x_log, "checked"),
-            y_log=Output(match_y_log, "checked"),
-        ),
-        inputs=Input(match_reset_customisation, "n_clicks"),
-    )(reset_customisation)
+def register_customisation_callbacks(app):
+    app.clientside_callback(
+        RESET_CUSTOMISATION_JS,
+        Output(match_title_input, "value"),
+        Output(match_x_label, "value"),
+        Output(match_y_label, "value"),
+        Output(match_mavg_7, "checked"),
+        Output(match_mavg_30, "checked"),
+        Output(match_sort_order, "value"),
+        Output(match_sort_axis, "value"),
+        Output(match_x_log, "checked"),
+        Output(match_y_log, "checked"),
+        Input(match_reset_customisation, "n_clicks"),
+    )
@@ -0,0 +1,32 @@
+import dash_mantine_components as dmc
+from dash import Input, Output
+
+from ark_rp_visualisation.core.data_loader import DATASET_IDS
+from ark_rp_visualisation.core.enums import Page
+
+
+def make_dataset_select(dataset_id: str):
+    return dmc.Select(
+        id=Page.DATASET,
+        data=DATASET_IDS,
+        value=dataset_id,
+        allowDeselect=False,
+        maw=200,
+        # Only shown when there is more than one dataset to choose from
+        display=None if len(DATASET_IDS) > 1 else "none",
+    )
+
+
+def register_dataset_callbacks(app):
+    # Navigate to the dashboard of the selected dataset, which the router renders
+    app.clientside_callback(
+        """
+        function (datasetId) {
+            const url = new URL(window.location.href);
+            url.searchParams.set("dataset", datasetId);
+            return url.href;
+        }
+        """,
+        Output(Page.URL, "href"),
+        Input(Page.DATASET, "value"),
+    )
@@ -1,7 +1,9 @@
-from typing import Any, cast
+import json
+from string import Template
+from typing import Any
 
 import dash_mantine_components as dmc
-from dash import Input, Output, Patch, State, ctx
+from dash import Input, Output, State
 from dash_iconify import DashIconify
 
 from ark_rp_visualisation.pages.dashboard.patterns import (
@@ -172,148 +174,117 @@ def make_field_controls(tab: Tab):
     )
 
 
-def register_field_callbacks(app):
-    def update_dropdown(selected_fields, current_options):
-        c = cast(dict[str, Any], ctx.outputs_grouping)
-
-        def process_field_options():
-            # Check if any temporal field is already selected
-            has_selected_temporal = any(
-                [Field(field).temporal if field else None for field in selected_fields]
-            )
-
-            # Process each dropdown's options
-            def process_field(selected_field, options):
-                def process_option(opt):
-                    """
-                    Rules for dropdown options:
-                    1. No duplicate options.
-                    2. No more than one temporal field.
-                    """
-                    field = Field(opt["value"])
-
-                    # Check if field is already selected in another dropdown
-                    is_duplicate = field in selected_fields and field != selected_field
-                    # Check if this dropdown has selected a temporal field
-                    selected_temporal = (
-                        Field(selected_field).temporal if selected_field else False
-                    )
-                    is_invalid_temporal = (
-                        field.temporal
-                        and has_selected_temporal
-                        and not selected_temporal
-                    )
-                    return is_duplicate or is_invalid_temporal
-
-                patched_options = Patch()
-                for i, opt in enumerate(options):
-                    patched_options[i]["disabled"] = process_option(opt)
-                return patched_options
-
-            # Create a patch for each field dropdown
-            return [
-                process_field(selected_field, options)
-                for selected_field, options in zip(selected_fields, current_options)
-            ]
-
-        def process_aggregates() -> dict:
-            # Get the list of aggregate outputs
-            aggs = c["aggregates"]["value"]
-            # Generate an empty patch for every agg output
-            patched_aggregates: dict = dict(
-                display=[Patch() for _ in aggs],
-                spacing_display=[Patch() for _ in aggs],
-                option=[Patch() for _ in aggs],
-                value=[Patch() for _ in aggs],
-            )
-
-            if ctx.triggered_id:
-                triggered_index = ctx.triggered_id["index"]
-                # Update the agg of the changed dropdown if it has one
-                if triggered_index < len(aggs):
-                    field = selected_fields[triggered_index]
-                    agg_info = get_aggregation_info(field)
-                    patched_aggregates["display"][triggered_index] = agg_info["display"]
-                    patched_aggregates["spacing_display"][triggered_index] = agg_info[
-                        "display"
-                    ]
-                    patched_aggregates["option"][triggered_index] = agg_info["data"]
-                    patched_aggregates["value"][triggered_index] = agg_info["value"]
-
-            return patched_aggregates
-
-        def process_spans():
-            patched_spans = dict(
-                field=[Patch() for _ in c["spans"]["field"]],
-                spacing=[Patch() for _ in c["spans"]["spacing"]],
-            )
-
-            # Skip if not 3 variables
-            if len(selected_fields) != 3:
-                return patched_spans
-
-            # Check if there is at least one aggregate displayed
-            num_aggs = sum(
-                [
-                    get_aggregation_info(field)["display"] == "block"
-                    for field in selected_fields[:2]
-                ]
-            )
+def make_field_metadata() -> dict[str, dict[str, Any]]:
+    """Return the field metadata needed by the clientside dropdown rules."""
+    return {
+        field: {
+            "temporal": field.temporal,
+            "aggregations": get_aggregation_info(field)["data"],
+        }
+        for field in Field
+    }
+
+
+# Rules for the field dropdowns, run in the browser as they don't need the dataset:
+# 1. No duplicate fields.
+# 2. No more than one temporal field.
+# 3. Changing a grouped by field resets its aggregation dropdown.
+# 4. With 3 fields, shrink the dropdowns if any aggregation dropdown is displayed.
+UPDATE_DROPDOWN_JS = Template("""
+function (selectedFields, currentOptions) {
+    const fields = $field_metadata;
+    const noUpdate = window.dash_clientside.no_update;
+    const triggeredId = window.dash_clientside.callback_context.triggered_id;
+
+    const isTemporal = (field) => Boolean(field && fields[field].temporal);
+    const getAggregationInfo = (field) => {
+        const data = field ? fields[field].aggregations : [];
+        return {
+            data: data,
+            value: data.length ? data[0].value : null,
+            display: data.length > 1 ? "block" : "none",
+        };
+    };
+
+    const hasSelectedTemporal = selectedFields.some(isTemporal);
+    const fieldOptions = selectedFields.map((selectedField, i) =>
+        currentOptions[i].map((opt) => {
+            const isDuplicate =
+                selectedFields.includes(opt.value) && opt.value !== selectedField;
+            const isInvalidTemporal =
+                isTemporal(opt.value) && hasSelectedTemporal && !isTemporal(selectedField);
+            return {...opt, disabled: isDuplicate || isInvalidTemporal};
+        })
+    );
+
+    // Every field except the last one is grouped by, and has an aggregation
+    const numAggs = selectedFields.length - 1;
+    const aggregates = {
+        display: Array(numAggs).fill(noUpdate),
+        data: Array(numAggs).fill(noUpdate),
+        value: Array(numAggs).fill(noUpdate),
+    };
+    const triggeredIndex = triggeredId ? triggeredId.index : null;
+    if (triggeredIndex !== null && triggeredIndex < numAggs) {
+        const info = getAggregationInfo(selectedFields[triggeredIndex]);
+        aggregates.display[triggeredIndex] = info.display;
+        aggregates.data[triggeredIndex] = info.data;
+        aggregates.value[triggeredIndex] = info.value;
+    }
+
+    let spans = Array(selectedFields.length).fill(noUpdate);
+    if (selectedFields.length === 3) {
+        const hasAggs = selectedFields
+            .slice(0, 2)
+            .some((field) => getAggregationInfo(field).display === "block");
+        spans = spans.map(() => (hasAggs ? $small_field_span : $field_span));
+    }
+
+    return [
+        fieldOptions,
+        aggregates.display,
+        aggregates.display,
+        aggregates.data,
+        aggregates.value,
+        spans,
+        spans,
+    ];
+}
+""").substitute(
+    field_metadata=json.dumps(make_field_metadata()),
+    field_span=FIELD_SPAN,
+    small_field_span=SMALL_FIELD_SPAN,
+)
 
-            # Adjust spans to prevent overflow from aggregation dropdowns
-            field_span = FIELD_SPAN if num_aggs == 0 else SMALL_FIELD_SPAN
-            return dict(
-                field=[field_span for _ in c["spans"]["field"]],
-                spacing=[field_span for _ in c["spans"]["spacing"]],
-            )
+# Not swapped when the button is first rendered, only when it's clicked
+SWAP_AXES_JS = """
+function (nClicks, axes) {
+    if (!nClicks) {
+        return window.dash_clientside.no_update;
+    }
+    const [left, right] = axes;
+    return [right, left];
+}
+"""
 
-        return dict(
-            field_options=process_field_options(),
-            aggregates=process_aggregates(),
-            spans=process_spans(),
-        )
-
-    app.callback(
-        output=dict(
-            field_options=Output(match_fields, "data"),
-            aggregates=dict(
-                display=Output(
-                    match_agg_containers,
-                    "display",
-                ),
-                spacing_display=Output(
-                    match_agg_spacings,
-                    "display",
-                ),
-                option=Output(
-                    match_agg_dropdowns,
-                    "data",
-                ),
-                value=Output(
-                    match_agg_dropdowns,
-                    "value",
-                ),
-            ),
-            spans=dict(
-                field=Output(match_field_containers, "span"),
-                spacing=Output(match_field_spacings, "span"),
-            ),
-        ),
-        inputs=[
-            Input(match_fields, "value"),
-            State(match_fields, "data"),
-        ],
-    )(update_dropdown)
 
-    def swap_axes(n_clicks, axes):
-        if n_clicks is None:
-            return axes
-
-        left, right = axes
-        return [right, left]
+def register_field_callbacks(app):
+    app.clientside_callback(
+        UPDATE_DROPDOWN_JS,
+        Output(match_fields, "data"),
+        Output(match_agg_containers, "display"),
+        Output(match_agg_spacings, "display"),
+        Output(match_agg_dropdowns, "data"),
+        Output(match_agg_dropdowns, "value"),
+        Output(match_field_containers, "span"),
+        Output(match_field_spacings, "span"),
+        Input(match_fields, "value"),
+        State(match_fields, "data"),
+    )
 
-    app.callback(
+    app.clientside_callback(
+        SWAP_AXES_JS,
         Output(match_axes, "children"),
         Input(match_swap_axes, "n_clicks"),
         State(match_axes, "children"),
-    )(swap_axes)
+    )
@@ -1,36 +1,72 @@
-from functools import lru_cache
+import json
+from string import Template
+from typing import Any
 from uuid import uuid4
 
 import dash_mantine_components as dmc
-from dash import Input, Output, Patch, State, ctx
+from dash import Input, Output, State, ctx, dcc, no_update
 from dash.exceptions import PreventUpdate
 from dash_iconify import DashIconify
+from plotly.io.json import to_json_plotly
 
 from ark_rp_visualisation.pages.dashboard.patterns import (
     match_add_filter,
     match_delete_filter,
     match_filter_container,
     match_filter_operator,
+    match_filter_operators,
     match_filter_type,
+    match_filter_types,
     match_filter_value_container,
+    match_filter_value_inputs,
     match_reset_filter,
 )
 from ark_rp_visualisation.core import DataLoader
-from ark_rp_visualisation.core.enums import Filter, FilterOption, Page, Tab
-
-df = DataLoader().df
-
-
-@lru_cache()
-def get_unique(field):
-    return sorted(df[field].unique())
+from ark_rp_visualisation.core.data_loader import DEFAULT_DATASET
+from ark_rp_visualisation.core.enums import Field, Filter, FilterOption, Page, Tab
+from ark_rp_visualisation.core.models import FilterConfig
+
+# Maximum number of options sent for a searchable filter
+FILTER_OPTION_LIMIT = 50
+
+
+def get_filter_options(
+    filter: Filter,
+    search_value=None,
+    selected=None,
+    filter_config: FilterConfig | None = None,
+    dataset_id: str = DEFAULT_DATASET,
+) -> list[dict[str, str]]:
+    """
+    Return the top options matching a search which have messages under the other
+    filters, labelled with their message counts.
+    Selected values are always included, so that the MultiSelect does not drop them.
+    """
+    metadata = DataLoader().get_snapshot(dataset_id).metadata
+    counts = metadata.facets.get_counts(
+        Field(filter), filter_config or FilterConfig([])
+    )
+    matches = metadata.option_indexes[filter].search(
+        search_value, FILTER_OPTION_LIMIT, counts.index.__contains__
+    )
+    matches += [value for value in selected or [] if value not in matches]
+    return [
+        {"value": value, "label": f"{value} ({counts.get(value, 0):,})"}
+        for value in matches
+    ]
 
 
-def make_filter_value_input(filter: Filter, tab: Tab, index):
+def make_filter_value_input(
+    filter: Filter, tab: Tab, index, dataset_id: str = DEFAULT_DATASET
+):
     select_kwargs = filter.select_kwargs.copy()
     # Check if options need to be loaded dynamically
     if select_kwargs.get("data") == FilterOption.FIELD_UNIQUE:
-        select_kwargs["data"] = get_unique(filter)
+        select_kwargs["data"] = get_filter_options(filter, dataset_id=dataset_id)
+
+    value_range = DataLoader().get_snapshot(dataset_id).metadata.get_range(filter)
+    if filter.range_kwargs and value_range:
+        select_kwargs.update(zip(filter.range_kwargs, value_range))
 
     return filter.select_input(
         id={
@@ -42,7 +78,7 @@ def make_filter_value_input(filter: Filter, tab: Tab, index):
     )
 
 
-def make_filter_group(tab: Tab, filter: Filter):
+def make_filter_group(tab: Tab, filter: Filter, dataset_id: str = DEFAULT_DATASET):
     # Use random index since filters can be created dynamically
     index = str(uuid4())
 
@@ -90,7 +126,7 @@ def make_filter_group(tab: Tab, filter: Filter):
                 span="content",
             ),
             dmc.GridCol(
-                make_filter_value_input(filter, tab, index),
+                make_filter_value_input(filter, tab, index, dataset_id),
                 id={"type": Page.FILTER_VALUE_CONTAINER, "tab": tab, "index": index},
                 span="auto",
             ),
@@ -100,12 +136,32 @@ def make_filter_group(tab: Tab, filter: Filter):
     )
 
 
-def make_default_filters(tab):
+def make_default_filters(tab, dataset_id: str = DEFAULT_DATASET):
     # Create one of every possible filter
-    return [make_filter_group(tab, filter) for filter in Filter]
+    return [make_filter_group(tab, filter, dataset_id) for filter in Filter]
+
+
+def make_filter_templates(dataset_id: str = DEFAULT_DATASET) -> dict[str, Any]:
+    """
+    Serialise a filter group for every Filter,
+    which the clientside callbacks copy to add and reset filters in any tab.
+    """
+    return {
+        filter: json.loads(
+            to_json_plotly(make_filter_group(Tab.LINE, filter, dataset_id))
+        )
+        for filter in Filter
+    }
+
+
+def make_filter_templates_store(dataset_id: str = DEFAULT_DATASET):
+    # Shared by every tab, so that option lists are only sent once
+    return dcc.Store(  # pyright: ignore[reportPrivateImportUsage]
+        id=Page.FILTER_TEMPLATES, data=make_filter_templates(dataset_id)
+    )
 
 
-def make_filter_controls(tab: Tab):
+def make_filter_controls(tab: Tab, dataset_id: str = DEFAULT_DATASET):
     header = dmc.Group(
         [
             dmc.Text("Filters", size="lg"),
@@ -120,7 +176,7 @@ def make_filter_controls(tab: Tab):
         align="center",
     )
     filter_groups = dmc.Stack(
-        make_default_filters(tab),
+        make_default_filters(tab, dataset_id),
         id={"type": Page.FILTER_CONTAINER, "tab": tab},
         gap=5,
     )
@@ -135,41 +191,85 @@ def make_filter_controls(tab: Tab):
     )
 
     return dmc.Stack(
-        [header, dmc.Space(h=10), filter_groups, dmc.Space(h=15), footer], gap=0
+        [
+            header,
+            dmc.Space(h=10),
+            filter_groups,
+            dmc.Space(h=15),
+            footer,
+        ],
+        gap=0,
     )
 
 
-def register_filter_callbacks(app):
-    # Callback to reset filters
-    def reset_filters(n_clicks):
-        if n_clicks is None or not ctx.triggered_id:
-            raise PreventUpdate
-
-        tab = Tab(ctx.triggered_id["tab"])
-        return make_default_filters(tab)
-
-    app.callback(
-        Output(match_filter_container, "children", allow_duplicate=True),
-        Input(match_reset_filter, "n_clicks"),
-    )(reset_filters)
-
-    # Callback to add a new filter
-    def add_filter(n_clicks):
-        if n_clicks is None or not ctx.triggered_id:
-            raise PreventUpdate
+# Filter added by the "+ Add Filter" button
+NEW_FILTER = Filter.DATE
+
+# Adds, deletes and resets filter groups in the browser, by copying a filter group
+# template serialised by make_filter_templates with a new tab and index
+UPDATE_FILTER_GROUPS_JS = Template("""
+function (addClicks, resetClicks, deleteClicks, templates, children) {
+    const dc = window.dash_clientside;
+    const triggered = dc.callback_context.triggered;
+    const triggeredId = dc.callback_context.triggered_id;
+    // New delete buttons also trigger this callback, without any clicks
+    if (!triggeredId || !triggered.length || !triggered[0].value) {
+        return dc.no_update;
+    }
+
+    const copyTemplate = (filter) => {
+        const template = templates[filter];
+        const {tab: oldTab, index: oldIndex} = template.props.id;
+        const newIndex = crypto.randomUUID
+            ? crypto.randomUUID()
+            : `$${Date.now()}-$${Math.random().toString(16).slice(2)}`;
+        return JSON.parse(JSON.stringify(template), (key, value) => {
+            if (key === "tab" && value === oldTab) {
+                return triggeredId.tab;
+            }
+            return key === "index" && value === oldIndex ? newIndex : value;
+        });
+    };
+
+    switch (triggeredId.type) {
+        case "$add_filter":
+            return new dc.Patch().append([], copyTemplate("$new_filter")).build();
+        case "$reset_filter":
+            return $default_filters.map(copyTemplate);
+        case "$delete_filter": {
+            const position = children.findIndex(
+                (child) => child.props.id.index === triggeredId.index
+            );
+            if (position === -1) {
+                return dc.no_update;
+            }
+            return new dc.Patch().delete([position]).build();
+        }
+    }
+    return dc.no_update;
+}
+""").substitute(
+    add_filter=Page.ADD_FILTER_BUTTON,
+    reset_filter=Page.RESET_FILTER_BUTTON,
+    delete_filter=Page.DELETE_FILTER_BUTTON,
+    new_filter=NEW_FILTER,
+    default_filters=json.dumps(list(Filter)),
+)
 
-        tab = Tab(ctx.triggered_id["tab"])
-        patched_children = Patch()
-        patched_children.append(make_filter_group(tab, Filter.DATE))
-        return patched_children
 
-    app.callback(
-        Output(match_filter_container, "children", allow_duplicate=True),
+def register_filter_callbacks(app):
+    app.clientside_callback(
+        UPDATE_FILTER_GROUPS_JS,
+        Output(match_filter_container, "children"),
         Input(match_add_filter, "n_clicks"),
-    )(add_filter)
+        Input(match_reset_filter, "n_clicks"),
+        Input(match_delete_filter, "n_clicks"),
+        State(Page.FILTER_TEMPLATES, "data"),
+        State(match_filter_container, "children"),
+    )
 
     # Callback to update filter options
-    def update_filter_options(filter_type):
+    def update_filter_options(filter_type, dataset_id):
         c = ctx.triggered_id
         if not c:
             return
@@ -179,7 +279,7 @@ def register_filter_callbacks(app):
         return (
             filter_type.operators,
             filter_type.default_operator,
-            make_filter_value_input(filter_type, tab, index),
+            make_filter_value_input(filter_type, tab, index, dataset_id),
         )
 
     app.callback(
@@ -199,28 +299,58 @@ def register_filter_callbacks(app):
             match_filter_type,
             "value",
         ),
+        State(Page.DATASET, "value"),
     )(update_filter_options)
 
-    # Callback to delete a filter group
-    def delete_filter(n_clicks, children):
-        if not any(n_clicks) or not ctx.triggered_id:
+    # Callback to update the options of author and channel filters as the user types,
+    # or when another filter changes
+    def update_filter_value_options(
+        search_values, values, filter_types, filter_operators, dataset_id
+    ):
+        if not ctx.triggered_id:
             raise PreventUpdate
 
-        # Find the filter group with same index and get its position in children
-        index = ctx.triggered_id["index"]
-        (filter_index,) = [
-            i
-            for i, child in enumerate(children)
-            if child["props"]["id"]["index"] == index
-        ]
-
-        # Delete the filter group from children
-        patched_children = Patch()
-        del patched_children[filter_index]
-        return patched_children
+        triggered_prop = ctx.triggered[0]["prop_id"].rsplit(".", 1)[1]
+        indexes = [output["id"]["index"] for output in ctx.outputs_list]
+        triggered_position = indexes.index(ctx.triggered_id["index"])
+
+        data = []
+        for position, (filter_type, search_value, selected) in enumerate(
+            zip(filter_types, search_values, values)
+        ):
+            filter = Filter(filter_type)
+            # Searching updates its own options, other changes update other filters
+            if triggered_prop == "searchValue":
+                needs_update = position == triggered_position
+            else:
+                needs_update = position != triggered_position
+
+            if (
+                not needs_update
+                or filter.select_kwargs.get("data") != FilterOption.FIELD_UNIQUE
+            ):
+                data.append(no_update)
+                continue
+
+            # Facet on every filter except this one
+            other_filters = FilterConfig.from_raw(
+                *(
+                    column[:position] + column[position + 1 :]
+                    for column in (filter_types, filter_operators, values)
+                )
+            )
+            data.append(
+                get_filter_options(
+                    filter, search_value, selected, other_filters, dataset_id
+                )
+            )
+        return data
 
     app.callback(
-        Output(match_filter_container, "children", allow_duplicate=True),
-        Input(match_delete_filter, "n_clicks"),
-        State(match_filter_container, "children"),
-    )(delete_filter)
+        Output(match_filter_value_inputs, "data"),
+        Input(match_filter_value_inputs, "searchValue"),
+        Input(match_filter_value_inputs, "value"),
+        State(match_filter_types, "value"),
+        State(match_filter_operators, "value"),
+        State(Page.DATASET, "value"),
+    )(update_filter_value_options)
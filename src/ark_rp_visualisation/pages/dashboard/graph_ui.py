@@ -1,21 +1,35 @@
+import json
+import time
+from typing import Any
+
+import plotly.graph_objects as go
 from dash import Input, Output, State, ctx
+from dash.exceptions import PreventUpdate
 
-from ark_rp_visualisation.core import PlotBuilder
-from ark_rp_visualisation.core.enums import PlotType, Tab
-from ark_rp_visualisation.core.models import AxisConfig, FigureConfig, FilterConfig
+from ark_rp_visualisation.core import DataLoader, PlotBuilder, executor
+from ark_rp_visualisation.core.admission import BuildRejected, client_address
+from ark_rp_visualisation.core.enums import Page, Tab
+from ark_rp_visualisation.core.figure_cache import figure_cache
+from ark_rp_visualisation.perf.slow_query import log_slow_query
+from ark_rp_visualisation.utils.graph_log import graph_log
 from ark_rp_visualisation.utils.logging_setup import get_logger
 from ark_rp_visualisation.utils.serialisation import encode_state
+from ark_rp_visualisation.utils.state_store import state_store
+from ark_rp_visualisation.utils.superseding import Superseded, Superseding
 
 from .patterns import (
     match_agg_dropdowns,
     match_axes,
+    match_downsampled_state,
     match_fields,
     match_filter_operators,
     match_filter_types,
     match_filter_value_inputs,
+    match_full_resolution,
     match_fullscreen_button,
     match_fullscreen_button_icon,
     match_graph,
+    match_graph_progress,
     match_mavg_7,
     match_mavg_30,
     match_sort_axis,
@@ -30,6 +44,27 @@ from .patterns import (
 
 logger = get_logger(__name__)
 
+# Builds of each page's tabs, so a build clicked again stops the one before it
+dashboard_builds = Superseding()
+
+
+def downsampled(fig: go.Figure | dict) -> bool:
+    """Return whether a figure was downsampled (see `PlotBuilder.downsample`)."""
+    meta = fig["layout"].get("meta") if isinstance(fig, dict) else fig.layout.meta
+    return isinstance(meta, dict) and "downsampled_from" in meta
+
+
+def zoomed_range(relayout_data: dict, axis: str) -> tuple[Any, Any] | None:
+    """Return the range an axis was zoomed to, from a graph's relayoutData."""
+    if f"{axis}axis.range[0]" in relayout_data:
+        return (
+            relayout_data[f"{axis}axis.range[0]"],
+            relayout_data[f"{axis}axis.range[1]"],
+        )
+    if f"{axis}axis.range" in relayout_data:
+        return tuple(relayout_data[f"{axis}axis.range"])
+    return None
+
 
 def register_graph_callbacks(app):
     def render_graph(
@@ -39,30 +74,22 @@ def register_graph_callbacks(app):
         selected_aggregations,
         filters,
         customisation,
+        dataset_id,
+        session_id,
     ):
         if n_clicks is None or not all(selected_fields) or not ctx.triggered_id:
             return dict(
                 fig={},
                 fullscreen_url="#",
                 fullscreen_disabled=True,
+                downsampled_state=None,
             )
 
         active_tab = Tab(ctx.triggered_id["tab"])
 
-        # Log graph creation
-        summary = f"""
-        User created a graph:
-            Tab: {active_tab.label}
-            {selected_axes[0]}: {selected_fields[0]}
-            {selected_axes[1]}: {selected_fields[1]}
-            Aggregations: {selected_aggregations}
-            Filters: {filters}
-            Customizations: {customisation}
-        """
-        logger.info(summary.strip())
-
         # 1. Create a fullscreen URL which renders this graph
         graph_state = {
+            "dataset": dataset_id,
             "tab": active_tab.value,
             "fields": selected_fields,
             "axes": selected_axes,
@@ -70,25 +97,72 @@ def register_graph_callbacks(app):
             "filters": filters,
             "custom": customisation,
         }
-        encoded_params = encode_state(graph_state)
-        fullscreen_url = f"/graph?state={encoded_params}"
-
-        # 2. Build the figure
-        fig = PlotBuilder(
-            plot_type=PlotType(active_tab.plot_type),
-            axis_config=AxisConfig.from_raw(
-                selected_fields=selected_fields,
-                selected_axes=selected_axes,
-                selected_aggregations=selected_aggregations,
-            ),
-            filter_config=FilterConfig.from_raw(*filters),
-            figure_config=FigureConfig.from_raw(**customisation),
-        ).build()
+        # Log graph creation as a single JSON line
+        logger.info(f"User created a graph: {json.dumps(graph_state, default=str)}")
+        # Count it for the cache warmer
+        if graph_log:
+            graph_log.record(graph_state)
+
+        try:
+            fullscreen_url = (
+                f"/graph/{state_store.save(graph_state)}"
+                if state_store
+                else f"/graph?state={encode_state(graph_state)}"
+            )
+        except ValueError as e:
+            # e.g. a negative reaction count filter, which still builds a graph
+            logger.warning(f"Graph state can't be linked: {e}")
+            fullscreen_url = None
+
+        # 2. Build the figure, unless it was warmed or built for a fullscreen link
+        # Read once, so a reload meanwhile doesn't change the data or its version
+        snapshot = DataLoader().get_state_snapshot(graph_state)
+        cached = figure_cache.peek(graph_state, snapshot)
+        if cached is not None:
+            fig = json.loads(cached.json)
+            return dict(
+                fig=fig,
+                fullscreen_url=fullscreen_url or "#",
+                fullscreen_disabled=fullscreen_url is None,
+                downsampled_state=graph_state if downsampled(fig) else None,
+            )
+
+        builder = PlotBuilder.from_state(graph_state, df=snapshot.df)
+        start = time.perf_counter()
+        try:
+            with dashboard_builds.start((session_id, active_tab)) as check:
+                # Checked after each stage, so a superseded build stops early
+                fig = executor.build(
+                    builder,
+                    lambda done: check(),
+                    client=client_address(ctx.headers, ctx.remote),
+                    degradable=True,
+                )
+        except Superseded:
+            raise PreventUpdate
+        except BuildRejected as e:
+            logger.warning(f"Graph build rejected: {e}")
+            return dict(
+                fig=go.Figure(layout=dict(title=str(e))),
+                fullscreen_url=fullscreen_url or "#",
+                fullscreen_disabled=fullscreen_url is None,
+                downsampled_state=None,
+            )
+        total_ms = (time.perf_counter() - start) * 1000
+        timings = dict(builder.timings)
+        queue_ms = timings.pop("queue", 0.0)
+        log_slow_query(
+            graph_state, snapshot.version, timings, total_ms - queue_ms, queue_ms
+        )
+        # Shared with fullscreen links, the API and the warmer, unless sampled
+        if not builder.sample_fraction:
+            figure_cache.put(graph_state, snapshot, fig)
 
         return dict(
             fig=fig,
-            fullscreen_url=fullscreen_url,
-            fullscreen_disabled=False,
+            fullscreen_url=fullscreen_url or "#",
+            fullscreen_disabled=fullscreen_url is None,
+            downsampled_state=graph_state if downsampled(fig) else None,
         )
 
     app.callback(
@@ -96,6 +170,7 @@ def register_graph_callbacks(app):
             fig=Output(match_graph, "figure"),
             fullscreen_url=Output(match_fullscreen_button, "href"),
             fullscreen_disabled=Output(match_fullscreen_button_icon, "disabled"),
+            downsampled_state=Output(match_downsampled_state, "data"),
         ),
         inputs=dict(
             n_clicks=Input(match_update_graph, "n_clicks"),
@@ -123,14 +198,63 @@ def register_graph_callbacks(app):
                 title=State(match_title_input, "value"),
                 x_label=State(match_x_label, "value"),
                 y_label=State(match_y_label, "value"),
+                # String keys, as in graph states read back from JSON, so that
+                # equal graphs have the same cache key wherever they come from
                 moving_averages={
-                    7: State(match_mavg_7, "checked"),
-                    30: State(match_mavg_30, "checked"),
+                    "7": State(match_mavg_7, "checked"),
+                    "30": State(match_mavg_30, "checked"),
                 },
                 sort_order=State(match_sort_order, "value"),
                 sort_axis=State(match_sort_axis, "value"),
                 x_log=State(match_x_log, "checked"),
                 y_log=State(match_y_log, "checked"),
             ),
+            dataset_id=State(Page.DATASET, "value"),
+            session_id=State(Page.SESSION_ID, "data"),
         ),
+        # Built in the worker on the bounded executor, rather than as a background
+        # callback: those fork a process per job from workers running threads,
+        # which copies the dataset into each job and any locks other threads hold.
+        # The button stays enabled, so clicking again supersedes a running build
+        running=[(Output(match_graph_progress, "display"), "block", "none")],
     )(render_graph)
+
+    def refetch_graph(relayout_data, full_resolution, graph_state):
+        """
+        Rebuild a downsampled line plot when zoomed in, so the points in view
+        are downsampled on their own (up to full resolution), and again when
+        zoomed back out. Also when full resolution is toggled while zoomed in.
+        """
+        if graph_state is None:
+            raise PreventUpdate
+
+        builder = PlotBuilder.from_state(graph_state)
+        relayout_data = relayout_data or {}
+        zoomed = zoomed_range(relayout_data, builder.time_axis)
+        if ctx.triggered_id["type"] == Page.GRAPH:
+            zoomed_out = relayout_data.get(f"{builder.time_axis}axis.autorange")
+            if not full_resolution or (zoomed is None and not zoomed_out):
+                raise PreventUpdate
+        elif zoomed is None:
+            # Toggled while zoomed out, which shows the same points either way
+            raise PreventUpdate
+
+        builder.time_range = zoomed if full_resolution else None
+        try:
+            fig = executor.build(
+                builder, client=client_address(ctx.headers, ctx.remote)
+            )
+        except BuildRejected as e:
+            # Keep showing the downsampled points
+            logger.warning(f"Graph refetch rejected: {e}")
+            raise PreventUpdate
+        if zoomed is not None and not full_resolution:
+            fig.update_layout({f"{builder.time_axis}axis": {"range": zoomed}})
+        return fig
+
+    app.callback(
+        Output(match_graph, "figure", allow_duplicate=True),
+        Input(match_graph, "relayoutData"),
+        Input(match_full_resolution, "checked"),
+        State(match_downsampled_state, "data"),
+    )(refetch_graph)
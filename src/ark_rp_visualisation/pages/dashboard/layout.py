@@ -1,28 +1,32 @@
+import uuid
+from functools import lru_cache
+
 import dash_mantine_components as dmc
-from dash import html
+from dash import dcc, html
 
-from ark_rp_visualisation.core.enums import Tab, Text
+from ark_rp_visualisation.core import DataLoader
+from ark_rp_visualisation.core.data_loader import DATASETS, DEFAULT_DATASET
+from ark_rp_visualisation.core.enums import Page, Tab, Text
 
-from .tabs import make_tab
+from .datasets import make_dataset_select
+from .filters import make_filter_templates_store
+from .tabs import DEFAULT_TAB, make_tab
 
-header = dmc.Stack(
-    [
-        dmc.Title(Text.TITLE),
-        dmc.Text(Text.EXPLAINER),
-    ],
-    mt=10,
-    mb=20,
-    gap=10,
-)
 
+def make_header(dataset_id: str):
+    return dmc.Stack(
+        [
+            dmc.Group(
+                [dmc.Title(Text.TITLE), make_dataset_select(dataset_id)],
+                justify="space-between",
+            ),
+            dmc.Text(Text.EXPLAINER),
+        ],
+        mt=10,
+        mb=20,
+        gap=10,
+    )
 
-tabs = dmc.Tabs(
-    [
-        dmc.TabsList([dmc.TabsTab(tab.label, value=tab) for tab in Tab]),
-    ]
-    + [dmc.TabsPanel(make_tab(tab), value=tab) for tab in Tab],
-    value=Tab.LINE,
-)
 
 footer = html.Footer(
     dmc.Stack(
@@ -58,11 +62,50 @@ footer = html.Footer(
     )
 )
 
-layout = dmc.Container(
-    [
-        header,
-        tabs,
-        footer,
-    ],
-    fluid=False,
-)
+
+def make_tabs(dataset_id: str):
+    # Only the default tab is rendered up front, the others are rendered when first opened
+    return dmc.Tabs(
+        [
+            dmc.TabsList([dmc.TabsTab(tab.label, value=tab) for tab in Tab]),
+        ]
+        + [
+            dmc.TabsPanel(
+                make_tab(tab, dataset_id) if tab == DEFAULT_TAB else None,
+                id={"type": Page.TAB_PANEL, "tab": tab},
+                value=tab,
+            )
+            for tab in Tab
+        ],
+        id=Page.TABS,
+        value=DEFAULT_TAB,
+    )
+
+
+@lru_cache(maxsize=len(DATASETS))
+def make_layout(dataset_id: str, version: str):
+    # Filter options and ranges depend on the dataset, so each version has its layout
+    return dmc.Container(
+        [
+            make_header(dataset_id),
+            make_tabs(dataset_id),
+            footer,
+            dcc.Store(  # pyright: ignore[reportPrivateImportUsage]
+                id=Page.RENDERED_TABS, data=[DEFAULT_TAB]
+            ),
+            make_filter_templates_store(dataset_id),
+        ],
+        fluid=False,
+    )
+
+
+def layout(dataset_id: str = DEFAULT_DATASET):
+    return html.Div(
+        [
+            make_layout(dataset_id, DataLoader().get_snapshot(dataset_id).version),
+            # Tells the builds of each page apart, as the rest of the layout is shared
+            dcc.Store(  # pyright: ignore[reportPrivateImportUsage]
+                id=Page.SESSION_ID, data=uuid.uuid4().hex
+            ),
+        ]
+    )
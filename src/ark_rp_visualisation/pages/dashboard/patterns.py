@@ -2,8 +2,14 @@ from dash import ALL, MATCH
 
 from ark_rp_visualisation.core.enums import Page
 
+# Tab patterns
+all_tab_panels = {"type": Page.TAB_PANEL, "tab": ALL}
+
 # Graph patterns
 match_graph = {"type": Page.GRAPH, "tab": MATCH}
+match_graph_progress = {"type": Page.GRAPH_PROGRESS, "tab": MATCH}
+match_downsampled_state = {"type": Page.DOWNSAMPLED_STATE, "tab": MATCH}
+match_full_resolution = {"type": Page.FULL_RESOLUTION_SWITCH, "tab": MATCH}
 match_update_graph = {"type": Page.UPDATE_GRAPH_BUTTON, "tab": MATCH}
 match_fullscreen_button = {"type": Page.FULLSCREEN_BUTTON, "tab": MATCH}
 match_fullscreen_button_icon = {"type": Page.FULLSCREEN_BUTTON_ICON, "tab": MATCH}
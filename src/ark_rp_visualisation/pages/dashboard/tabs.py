@@ -1,26 +1,37 @@
 import dash_mantine_components as dmc
-from dash import dcc
+from dash import Input, Output, State, ctx, dcc, no_update
+from dash.exceptions import PreventUpdate
 from dash_iconify import DashIconify
 
-from ark_rp_visualisation.core.enums import Page, Tab, Text
+from ark_rp_visualisation.core.data_loader import DEFAULT_DATASET
+from ark_rp_visualisation.core.enums import Page, PlotType, Tab, Text
+from ark_rp_visualisation.pages.dashboard.patterns import all_tab_panels
 
 from .customisation import make_customisation_controls
 from .fields import make_field_controls
 from .filters import make_filter_controls
 
+DEFAULT_TAB = Tab.LINE
 
-def make_tab(tab: Tab):
+
+def make_tab(tab: Tab, dataset_id: str = DEFAULT_DATASET):
     return dmc.Card(
         [
             make_field_controls(tab),
             dmc.Divider(mt=25, mb=15),
-            make_filter_controls(tab),
+            make_filter_controls(tab, dataset_id),
             dmc.Divider(mt=25, mb=15),
             make_customisation_controls(tab),
             dmc.Space(h=20),
             # --- ACTION ROW ---
             dmc.Group(
                 [
+                    # Only line plots are downsampled
+                    dmc.Switch(
+                        id={"type": Page.FULL_RESOLUTION_SWITCH, "tab": tab},
+                        label=Text.FULL_RESOLUTION,
+                        display="block" if tab.plot_type == PlotType.LINE else "none",
+                    ),
                     # Fullscreen button
                     dmc.Anchor(
                         dmc.ActionIcon(
@@ -46,6 +57,17 @@ def make_tab(tab: Tab):
                 gap="sm",
             ),
             dmc.Space(h=20),
+            # Shown while the graph is built
+            dmc.Progress(
+                id={"type": Page.GRAPH_PROGRESS, "tab": tab},
+                value=100,
+                size="sm",
+                striped=True,
+                animated=True,
+                display="none",
+            ),
+            # State of the graph if it was downsampled, to refetch it when zoomed in
+            dcc.Store(id={"type": Page.DOWNSAMPLED_STATE, "tab": tab}),
             dcc.Loading(  # pyright: ignore[reportPrivateImportUsage]
                 dcc.Graph(  # pyright: ignore[reportPrivateImportUsage]
                     id={"type": Page.GRAPH, "tab": tab},
@@ -56,3 +78,24 @@ def make_tab(tab: Tab):
         ],
         withBorder=True,
     )
+
+
+def register_tab_callbacks(app):
+    # Render a tab the first time it is opened
+    def render_tab(tab, rendered_tabs, dataset_id):
+        if tab in rendered_tabs:
+            raise PreventUpdate
+
+        panels = [
+            make_tab(Tab(tab), dataset_id) if output["id"]["tab"] == tab else no_update
+            for output in ctx.outputs_list[0]
+        ]
+        return panels, rendered_tabs + [tab]
+
+    app.callback(
+        Output(all_tab_panels, "children"),
+        Output(Page.RENDERED_TABS, "data"),
+        Input(Page.TABS, "value"),
+        State(Page.RENDERED_TABS, "data"),
+        State(Page.DATASET, "value"),
+    )(render_tab)
@@ -1,3 +1,4 @@
+from .callbacks import register_fullscreen_callbacks
 from .layout import layout
 
-__all__ = ["layout"]
+__all__ = ["register_fullscreen_callbacks", "layout"]
@@ -0,0 +1,29 @@
+from dash import Input, Output
+
+from ark_rp_visualisation.core.enums import Page
+
+
+def register_fullscreen_callbacks(app):
+    # Fetched by the browser, so unchanged figures are revalidated by ETag
+    app.clientside_callback(
+        """
+        async function (figureUrl) {
+            const failed = [{layout: {title: {text: "Couldn't load graph"}}}, false];
+            try {
+                // Also fails if the network is down or the response isn't JSON
+                const response = await fetch(figureUrl);
+                if (!response.ok) {
+                    return failed;
+                }
+                return [await response.json(), false];
+            } catch (error) {
+                return failed;
+            }
+        }
+        """,
+        Output(Page.FULLSCREEN_GRAPH, "figure"),
+        Output(Page.FULLSCREEN_LOADER, "visible"),
+        Input(Page.FULLSCREEN_FIGURE_URL, "data"),
+        # Callbacks don't run on page load by default (see `app`)
+        prevent_initial_call=False,
+    )
@@ -1,22 +1,11 @@
-from typing import Any
-
 import dash_mantine_components as dmc
 from dash import dcc
 
-from ark_rp_visualisation.core import PlotBuilder
-from ark_rp_visualisation.core.enums import PlotType, Tab, Text
-from ark_rp_visualisation.core.models import AxisConfig, FigureConfig, FilterConfig
-
+from ark_rp_visualisation.core.enums import Page, Text
 
-def layout(state: dict[str, Any]):
-    active_tab = Tab(state["tab"])
-    fig = PlotBuilder(
-        plot_type=PlotType(active_tab.plot_type),
-        axis_config=AxisConfig.from_raw(state["fields"], state["axes"], state["aggs"]),
-        filter_config=FilterConfig.from_raw(*state["filters"]),
-        figure_config=FigureConfig.from_raw(**state["custom"]),
-    ).build()
 
+def layout(figure_url: str):
+    # Returned before the figure is built, which is then fetched from `figure_url`
     return dmc.Container(
         [
             dmc.Anchor(
@@ -29,9 +18,16 @@ def layout(state: dict[str, Any]):
                     "color": "black",
                 },
             ),
-            dcc.Graph(  # pyright: ignore[reportPrivateImportUsage]
-                figure=fig,
-                style={"height": "95vh"},
+            dcc.Store(id=Page.FULLSCREEN_FIGURE_URL, data=figure_url),  # pyright: ignore[reportPrivateImportUsage]
+            dmc.Box(
+                [
+                    dmc.LoadingOverlay(id=Page.FULLSCREEN_LOADER, visible=True),
+                    dcc.Graph(  # pyright: ignore[reportPrivateImportUsage]
+                        id=Page.FULLSCREEN_GRAPH,
+                        style={"height": "95vh"},
+                    ),
+                ],
+                pos="relative",
             ),
         ],
         fluid=True,
@@ -0,0 +1,359 @@
+"""
+Benchmark suite for PlotBuilder.
+
+Enumerates every combination of fields and aggregations allowed by each Tab,
+plus every Filter operator, and records the wall time and peak memory of
+`PlotBuilder.build` on synthetic datasets of several sizes.
+
+Record a baseline with:
+    python -m ark_rp_visualisation.perf.benchmark --output benchmarks/baseline.json
+
+Compare against it with `pytest -m benchmark` or:
+    python -m ark_rp_visualisation.perf.benchmark --baseline benchmarks/baseline.json
+
+Compare building figures with plotly express and with `make_figure` with:
+    python -m ark_rp_visualisation.perf.benchmark --compare-express
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ark_rp_visualisation.core import DataLoader, PlotBuilder, synthetic
+from ark_rp_visualisation.core.data_loader import SENSITIVE_FIELDS
+from ark_rp_visualisation.core.enums import Field, Filter, Tab, Text
+
+BENCHMARK_SIZES = [
+    int(size)
+    for size in os.getenv("BENCHMARK_SIZES", "10000,1000000,10000000").split(",")
+]
+BENCHMARK_BASELINE_PATH = os.getenv(
+    "BENCHMARK_BASELINE_PATH", "benchmarks/baseline.json"
+)
+# Relative slowdown allowed before a case counts as a regression
+BENCHMARK_TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", 0.25))
+# Absolute slack, so that timer noise on very fast cases is ignored
+BENCHMARK_MIN_DELTA_MS = float(os.getenv("BENCHMARK_MIN_DELTA_MS", 5))
+BENCHMARK_MIN_DELTA_MB = float(os.getenv("BENCHMARK_MIN_DELTA_MB", 1))
+BENCHMARK_REPEAT = int(os.getenv("BENCHMARK_REPEAT", 3))
+BENCHMARK_SEED = 0
+INGEST_CASE_ID = "ingest"
+
+DEFAULT_CUSTOMISATION = {
+    "title": "",
+    "x_label": "",
+    "y_label": "",
+    # String keys, as in graph states read back from JSON and on the dashboard
+    "moving_averages": {"7": False, "30": False},
+    "sort_order": None,
+    "sort_axis": None,
+    "x_log": False,
+    "y_log": False,
+}
+
+
+@dataclass
+class BenchmarkCase:
+    id: str
+    state: dict[str, Any]
+
+
+def _is_valid_selection(fields: tuple[Field, ...]) -> bool:
+    """Apply the same rules as the field dropdowns: no duplicates, one temporal field."""
+    no_duplicates = len(set(fields)) == len(fields)
+    temporal_count = sum(field.temporal for field in fields)
+    return no_duplicates and temporal_count <= 1
+
+
+def _make_state(tab: Tab, fields, aggs, filters=([], [], [])) -> dict[str, Any]:
+    return {
+        "tab": tab.value,
+        "fields": [field.value for field in fields],
+        "axes": [Text.Y_AXIS.value, Text.X_AXIS.value],
+        "aggs": [agg.value for agg in aggs],
+        "filters": [list(group) for group in filters],
+        "custom": DEFAULT_CUSTOMISATION,
+    }
+
+
+def sample_filter_value(filter: Filter, df: pd.DataFrame) -> Any:
+    """Choose a representative value for a filter, in the form the UI sends it."""
+    if filter == Filter.DATE:
+        median = df[Field.DATETIME].sort_values().iloc[len(df) // 2]
+        return median.strftime("%Y-%m-%d")
+    if filter in {Filter.AUTHOR, Filter.CHANNEL_NAME}:
+        return sorted(df[filter].unique())[:2]
+    if filter == Filter.HOUR:
+        return "12"
+    if filter == Filter.REACTION_COUNT:
+        return 1
+    raise NotImplementedError(f"No sample value for {filter.name} filter.")
+
+
+def enumerate_axis_cases(tab: Tab) -> list[BenchmarkCase]:
+    """Enumerate every valid field and aggregation combination of a Tab."""
+    cases = []
+    for fields in itertools.product(*(slot["allowed"] for slot in tab.fields)):
+        if not _is_valid_selection(fields):
+            continue
+
+        # The last field is grouped by, the others are aggregated
+        *aggregated, _ = fields
+        for aggs in itertools.product(*(f.aggregations for f in aggregated)):
+            case_id = "/".join([tab.value, "-".join(fields), "-".join(aggs)])
+            cases.append(BenchmarkCase(case_id, _make_state(tab, fields, aggs)))
+    return cases
+
+
+def enumerate_cases(df: pd.DataFrame | None = None) -> list[BenchmarkCase]:
+    """
+    Enumerate every valid field and aggregation combination of every Tab,
+    then every Filter operator applied to the first combination of each Tab.
+    Filter values are sampled from `df`, or left empty without it (e.g. to only
+    list the cases' IDs).
+    """
+    cases = []
+    for tab in Tab:
+        axis_cases = enumerate_axis_cases(tab)
+        cases.extend(axis_cases)
+
+        # Exercise every filter operator on the first combination
+        reference = axis_cases[0]
+        for filter in Filter:
+            value = None if df is None else sample_filter_value(filter, df)
+            for operator in filter.operators:
+                state = {
+                    **reference.state,
+                    "filters": [[filter.value], [operator.value], [value]],
+                }
+                case_id = f"{reference.id}/{filter.value} {operator.value}"
+                cases.append(BenchmarkCase(case_id, state))
+    return cases
+
+
+@lru_cache(maxsize=1)
+def make_dataset(num_rows: int) -> pd.DataFrame:
+    """Generate a cleaned synthetic dataset. Only the latest size is kept in memory."""
+    df = synthetic.generate(num_rows, seed=BENCHMARK_SEED)
+    return df.drop(columns=SENSITIVE_FIELDS)
+
+
+def run_case(
+    case: BenchmarkCase, df: pd.DataFrame, repeat: int = BENCHMARK_REPEAT
+) -> dict[str, float]:
+    """
+    Return the fastest wall time of `repeat` builds,
+    and the peak memory of one separate traced build.
+    """
+    wall_ms = float("inf")
+    for _ in range(repeat):
+        builder = PlotBuilder.from_state(case.state, df=df)
+        start = time.perf_counter()
+        builder.build()
+        wall_ms = min(wall_ms, (time.perf_counter() - start) * 1000)
+
+    # Traced separately, as tracing slows down allocations
+    gc.collect()
+    tracemalloc.start()
+    try:
+        PlotBuilder.from_state(case.state, df=df).build()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"wall_ms": round(wall_ms, 3), "peak_mb": round(peak / 2**20, 3)}
+
+
+def compare_express(
+    case: BenchmarkCase, df: pd.DataFrame, repeat: int = BENCHMARK_REPEAT
+) -> dict[str, float]:
+    """
+    Return the fastest wall time of `repeat` builds with plotly express and with
+    the figure factory, and how many times faster the factory is.
+    """
+    result = {}
+    for method, express in (("express", True), ("factory", False)):
+        wall_ms = float("inf")
+        for _ in range(repeat):
+            builder = PlotBuilder.from_state(case.state, df=df)
+            builder.express = express
+            start = time.perf_counter()
+            builder.build()
+            wall_ms = min(wall_ms, (time.perf_counter() - start) * 1000)
+        result[f"{method}_ms"] = round(wall_ms, 3)
+    result["speedup"] = round(result["express_ms"] / result["factory_ms"], 2)
+    return result
+
+
+def run_comparison(sizes: list[int]) -> dict[str, dict[str, Any]]:
+    """Compare express and the figure factory on the field combinations of every Tab."""
+    results: dict[str, dict[str, Any]] = {}
+    for size in sizes:
+        df = make_dataset(size)
+        size_results = results[str(size)] = {}
+        for tab in Tab:
+            for case in enumerate_axis_cases(tab):
+                result = size_results[case.id] = compare_express(case, df)
+                print(
+                    f"{size:>9} {case.id:<60} {result['express_ms']:>10.1f} ms"
+                    f" {result['factory_ms']:>10.1f} ms {result['speedup']:>6.2f}x"
+                )
+
+        speedups = [result["speedup"] for result in size_results.values()]
+        print(f"{size:>9} median speedup {np.median(speedups):.2f}x")
+    return results
+
+
+def run_ingest(num_rows: int) -> dict[str, float]:
+    """Time reading synthetic DiscordChatExporter CSVs through the full ingest path."""
+    with tempfile.TemporaryDirectory() as directory:
+        df = synthetic.generate(num_rows, seed=BENCHMARK_SEED)
+        synthetic.write_csvs(df, directory, seed=BENCHMARK_SEED)
+        del df
+
+        start = time.perf_counter()
+        DataLoader.read_path(directory, clean=False)
+        wall_ms = (time.perf_counter() - start) * 1000
+    return {"wall_ms": round(wall_ms, 3)}
+
+
+def find_regression(
+    result: dict[str, float],
+    expected: dict[str, float],
+    tolerance: float = BENCHMARK_TOLERANCE,
+) -> str | None:
+    """Describe how a result regressed from its baseline, or return None."""
+    problems = []
+    for metric, min_delta in (
+        ("wall_ms", BENCHMARK_MIN_DELTA_MS),
+        ("peak_mb", BENCHMARK_MIN_DELTA_MB),
+    ):
+        new, old = result.get(metric), expected.get(metric)
+        if new is None or old is None:
+            continue
+        if new > old * (1 + tolerance) and new - old > min_delta:
+            problems.append(f"{metric} {old} -> {new} ({new / old - 1:+.0%})")
+    return ", ".join(problems) or None
+
+
+def environment_info() -> dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load_baseline(path: str = BENCHMARK_BASELINE_PATH) -> dict[str, Any]:
+    """Load a baseline, or return an empty one if it doesn't exist."""
+    if not os.path.exists(path):
+        return {"sizes": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_results(results: dict[str, dict[str, Any]], path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment_info(), "sizes": results}, f, indent=2)
+
+
+def run_suite(
+    sizes: list[int],
+    baseline: dict[str, Any],
+    tolerance: float = BENCHMARK_TOLERANCE,
+    include_ingest: bool = False,
+) -> tuple[dict[str, dict[str, Any]], list[str]]:
+    """Run every case on every dataset size. Return results and regressions."""
+    results: dict[str, dict[str, Any]] = {}
+    regressions = []
+
+    for size in sizes:
+        df = make_dataset(size)
+        expected_by_case = baseline["sizes"].get(str(size), {})
+        size_results = results[str(size)] = {}
+
+        runs = [
+            (case.id, lambda case=case, df=df: run_case(case, df))
+            for case in enumerate_cases(df)
+        ]
+        if include_ingest:
+            runs.insert(0, (INGEST_CASE_ID, lambda size=size: run_ingest(size)))
+
+        for case_id, run in runs:
+            result = size_results[case_id] = run()
+            expected = expected_by_case.get(case_id)
+            regression = expected and find_regression(result, expected, tolerance)
+            status = f"REGRESSED: {regression}" if regression else ""
+            peak = f"{result['peak_mb']:>8.1f} MB" if "peak_mb" in result else " " * 11
+            print(
+                f"{size:>9} {case_id:<60} {result['wall_ms']:>10.1f} ms {peak}  {status}"
+            )
+            if regression:
+                regressions.append(f"{size} {case_id}: {regression}")
+
+    return results, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PlotBuilder.build.")
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(size) for size in s.split(",")],
+        default=BENCHMARK_SIZES,
+        help="comma-separated dataset sizes",
+    )
+    parser.add_argument("--baseline", help="baseline to compare against")
+    parser.add_argument("--output", help="where to write the results")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE)
+    parser.add_argument(
+        "--ingest", action="store_true", help="also benchmark reading raw CSVs"
+    )
+    parser.add_argument(
+        "--compare-express",
+        action="store_true",
+        help="compare building figures with plotly express and the figure factory",
+    )
+    args = parser.parse_args()
+
+    if args.compare_express:
+        results = run_comparison(args.sizes)
+        if args.output:
+            write_results(results, args.output)
+            print(f"Results written to {args.output}")
+        return
+
+    baseline = load_baseline(args.baseline) if args.baseline else {"sizes": {}}
+    results, regressions = run_suite(
+        args.sizes, baseline, args.tolerance, include_ingest=args.ingest
+    )
+
+    if args.output:
+        write_results(results, args.output)
+        print(f"Results written to {args.output}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s):")
+        print("\n".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,616 @@
+"""
+Local HTTP load test against the Dash callback endpoint.
+
+Starts the app under gunicorn on localhost (or targets a running server with --url),
+then replays synthetic `/_dash-update-component` requests for the dashboard callbacks
+at a configurable concurrency. No browser or external network is needed.
+
+Compare worker and thread settings with:
+    python -m ark_rp_visualisation.perf.loadtest --configs 1x1,1x4,2x2 --duration 30
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+from urllib.parse import urlparse
+
+import numpy as np
+
+import ark_rp_visualisation
+from ark_rp_visualisation.core.enums import Filter, Page, Tab
+from ark_rp_visualisation.perf.benchmark import enumerate_axis_cases
+
+UPDATE_COMPONENT_PATH = "/_dash-update-component"
+WILDCARDS = {'["ALL"]', '["MATCH"]', '["ALLSMALLER"]'}
+
+# Relative frequency of each scenario, roughly following a user building one graph
+DEFAULT_MIX = {
+    "render_graph": 1,
+    "update_filter_options": 1,
+    "search_filter_options": 3,
+}
+
+# Each scenario is identified by the component type of its callback's first input
+SCENARIO_TRIGGERS = {
+    "render_graph": Page.UPDATE_GRAPH_BUTTON,
+    "update_filter_options": Page.FILTER_TYPE,
+    "search_filter_options": Page.FILTER_VALUE_INPUT,
+}
+
+
+def stringify_id(component_id: str | dict) -> str:
+    """Stringify a component ID the same way as the Dash renderer."""
+    if isinstance(component_id, dict):
+        return json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+    return component_id
+
+
+def split_output(output: str) -> tuple[bool, list[tuple[str, str]]]:
+    """Split a callback's output key into (is_multi, [(id, property), ...])."""
+    is_multi = output.startswith("..")
+    parts = output[2:-2].split("...") if is_multi else [output]
+    specs = []
+    for part in parts:
+        component_id, prop = part.rsplit(".", 1)
+        # Strip the allow_duplicate hash
+        specs.append((component_id, prop.split("@")[0]))
+    return is_multi, specs
+
+
+def walk_components(tree: Any) -> Iterator[dict]:
+    """Yield every component with an ID in a serialised layout."""
+    if isinstance(tree, list):
+        for child in tree:
+            yield from walk_components(child)
+    elif isinstance(tree, dict) and "props" in tree:
+        if "id" in tree["props"]:
+            yield tree
+        for value in tree["props"].values():
+            yield from walk_components(value)
+
+
+class PayloadFactory:
+    """Synthesise callback requests from the app's dependencies and layout."""
+
+    def __init__(self, dependencies: list[dict], layout: Any):
+        # Only dictionary IDs can be matched by patterns
+        components = [
+            component
+            for component in walk_components(layout)
+            if isinstance(component["props"]["id"], dict)
+        ]
+        self.components = [component["props"] for component in components]
+        self.named_components = {
+            component["props"]["id"]: component["props"]
+            for component in walk_components(layout)
+            if isinstance(component["props"]["id"], str)
+        }
+        self.multi_selects = {
+            stringify_id(component["props"]["id"])
+            for component in components
+            if component["type"] == "MultiSelect"
+        }
+        self.dependencies = {}
+        for dependency in dependencies:
+            if dependency.get("clientside_function") or not dependency["inputs"]:
+                continue
+            trigger = dependency["inputs"][0]["id"]
+            # Dashboard callbacks all have pattern-matching IDs
+            if trigger.startswith("{"):
+                self.dependencies[json.loads(trigger)["type"]] = dependency
+
+    def available(self, scenario: str) -> bool:
+        return SCENARIO_TRIGGERS[scenario] in self.dependencies
+
+    def find(self, pattern: str, match: dict[str, Any]) -> list[dict]:
+        """Find the components matching a (possibly wildcard) ID pattern."""
+        pattern_id = json.loads(pattern)
+        found = []
+        for props in self.components:
+            component_id = props["id"]
+            if set(component_id) != set(pattern_id):
+                continue
+            if all(
+                component_id[key] == match[key]
+                if json.dumps(value) in WILDCARDS
+                else component_id[key] == value
+                for key, value in pattern_id.items()
+                if json.dumps(value) != '["ALL"]'
+            ):
+                found.append(props)
+        return found
+
+    def _resolve(self, pattern: str, prop: str, match: dict, values: dict, with_value):
+        if not pattern.startswith("{"):
+            item: dict[str, Any] = {"id": pattern, "property": prop}
+            if with_value:
+                item["value"] = self.named_components[pattern].get(prop)
+            return item
+
+        is_all = '["ALL"]' in pattern
+        items = []
+        for props in self.find(pattern, match):
+            item: dict[str, Any] = {"id": props["id"], "property": prop}
+            if with_value:
+                key = (props["id"]["type"], prop)
+                item["value"] = values.get(key, {}).get(
+                    stringify_id(props["id"]), props.get(prop)
+                )
+            items.append(item)
+        return items if is_all else items[0]
+
+    def make(
+        self,
+        scenario: str,
+        match: dict[str, Any],
+        values: dict | None = None,
+        changed: dict | None = None,
+    ) -> dict[str, Any]:
+        """
+        Build a request body for a scenario.
+
+        Parameters:
+        - match: Values of the MATCH wildcards (e.g. the tab).
+        - values: Overrides of input and state values, keyed by (type, property) then ID.
+        - changed: The ID of the component which triggered the callback.
+        """
+        values = values or {}
+        dependency = self.dependencies[SCENARIO_TRIGGERS[scenario]]
+        is_multi, output_specs = split_output(dependency["output"])
+        outputs = [
+            self._resolve(pattern, prop, match, values, with_value=False)
+            for pattern, prop in output_specs
+        ]
+
+        trigger = dependency["inputs"][0]
+        changed_id = changed or self.find(trigger["id"], match)[0]["id"]
+        return {
+            "output": dependency["output"],
+            "outputs": outputs if is_multi else outputs[0],
+            "inputs": [
+                self._resolve(i["id"], i["property"], match, values, with_value=True)
+                for i in dependency["inputs"]
+            ],
+            "state": [
+                self._resolve(s["id"], s["property"], match, values, with_value=True)
+                for s in dependency["state"]
+            ],
+            "changedPropIds": [f"{stringify_id(changed_id)}.{trigger['property']}"],
+        }
+
+
+class Scenarios:
+    """Random, realistic requests for each dashboard callback."""
+
+    def __init__(self, factory: PayloadFactory, rng: random.Random):
+        self.factory = factory
+        self.rng = rng
+        self.axis_cases = {tab: enumerate_axis_cases(tab) for tab in Tab}
+
+    def _values(self, type: str, prop: str, values_by_component: dict) -> dict:
+        return {(type, prop): {stringify_id(k): v for k, v in values_by_component}}
+
+    def _ids(self, type: str, tab: Tab) -> list[dict]:
+        return [
+            props["id"]
+            for props in self.factory.components
+            if props["id"].get("type") == type and props["id"].get("tab") == tab
+        ]
+
+    def _field_values(self, tab: Tab) -> tuple[dict, dict]:
+        state = self.rng.choice(self.axis_cases[tab]).state
+        fields = self._ids(Page.FIELD_DROPDOWN, tab)
+        aggs = self._ids(Page.FIELD_AGG_DROPDOWN, tab)
+        values = {
+            **self._values(Page.FIELD_DROPDOWN, "value", zip(fields, state["fields"])),
+            **self._values(Page.FIELD_AGG_DROPDOWN, "value", zip(aggs, state["aggs"])),
+        }
+        return values, state
+
+    def _filter_values(self, tab: Tab) -> dict:
+        """Select a few random options in some multi-select filters."""
+        selected = []
+        for props in self.factory.components:
+            component_id = props["id"]
+            options = props.get("data")
+            if (
+                component_id.get("type") == Page.FILTER_VALUE_INPUT
+                and component_id.get("tab") == tab
+                and stringify_id(component_id) in self.factory.multi_selects
+                and options
+                and self.rng.random() < 0.3
+            ):
+                values = [o["value"] if isinstance(o, dict) else o for o in options]
+                count = self.rng.randint(1, min(3, len(values)))
+                selected.append((component_id, self.rng.sample(values, count)))
+        return self._values(Page.FILTER_VALUE_INPUT, "value", selected)
+
+    def make(self, scenario: str) -> dict[str, Any]:
+        tab = self.rng.choice(list(Tab))
+        match: dict[str, Any] = {"tab": tab}
+
+        if scenario == "render_graph":
+            values, _ = self._field_values(tab)
+            values |= self._filter_values(tab)
+            values |= self._values(
+                Page.UPDATE_GRAPH_BUTTON,
+                "n_clicks",
+                [({"type": Page.UPDATE_GRAPH_BUTTON, "tab": tab}, 1)],
+            )
+            return self.factory.make(scenario, match, values)
+
+        if scenario == "update_filter_options":
+            changed = self.rng.choice(self._ids(Page.FILTER_TYPE, tab))
+            match["index"] = changed["index"]
+            values = self._values(
+                Page.FILTER_TYPE, "value", [(changed, self.rng.choice(list(Filter)))]
+            )
+            return self.factory.make(scenario, match, values, changed)
+
+        if scenario == "search_filter_options":
+            # Type the start of a random option into an author or channel filter
+            props = self.rng.choice(
+                [
+                    props
+                    for props in self.factory.components
+                    if props["id"].get("tab") == tab
+                    and stringify_id(props["id"]) in self.factory.multi_selects
+                ]
+            )
+            option = self.rng.choice(props["data"])["value"]
+            search_value = option[: self.rng.randint(1, len(option))]
+            values = self._values(
+                Page.FILTER_VALUE_INPUT, "searchValue", [(props["id"], search_value)]
+            )
+            return self.factory.make(scenario, match, values, props["id"])
+
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+
+@dataclass
+class Results:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    elapsed: float = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, scenario: str, latency_ms: float, ok: bool):
+        with self.lock:
+            self.latencies[scenario].append(latency_ms)
+            if not ok:
+                self.errors[scenario] += 1
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        scenarios = sorted(self.latencies)
+        rows = {}
+        for name in scenarios + ["total"]:
+            latencies = (
+                sum((self.latencies[s] for s in scenarios), [])
+                if name == "total"
+                else self.latencies[name]
+            )
+            errors = sum(self.errors.values()) if name == "total" else self.errors[name]
+            if not latencies:
+                continue
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            rows[name] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / self.elapsed, 2),
+                "p50_ms": round(p50, 1),
+                "p95_ms": round(p95, 1),
+                "p99_ms": round(p99, 1),
+                "error_rate": round(errors / len(latencies), 4),
+            }
+        return rows
+
+
+class Connection:
+    """A keep-alive HTTP connection for one load-test thread."""
+
+    def __init__(self, url: str, timeout: float = 120):
+        parsed = urlparse(url)
+        self.host, self.port = parsed.hostname or "127.0.0.1", parsed.port or 80
+        self.timeout = timeout
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def request(self, method: str, path: str, body: Any = None) -> tuple[int, bytes]:
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data else {}
+        try:
+            self.conn.request(method, path, body=data, headers=headers)
+            response = self.conn.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            # Reconnect on the next request
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+            raise
+
+
+Request = Callable[[str, str, Any], tuple[int, bytes]]
+
+
+def load_factory(url: str, request: Request | None = None) -> PayloadFactory:
+    """
+    Fetch the callback dependencies and the dashboard layout from a running app.
+    `request(method, path, body)` defaults to a new connection to `url`.
+    """
+    request = request or Connection(url).request
+    status, body = request("GET", "/_dash-dependencies", None)
+    if status != 200:
+        raise RuntimeError(f"Could not fetch dependencies: HTTP {status}")
+    dependencies = json.loads(body)
+
+    # The dashboard is rendered by the router callback
+    router = next(d for d in dependencies if d["inputs"][0]["id"] == Page.URL)
+    component_id, prop = split_output(router["output"])[1][0]
+    status, body = request(
+        "POST",
+        UPDATE_COMPONENT_PATH,
+        {
+            "output": router["output"],
+            "outputs": {"id": component_id, "property": prop},
+            "inputs": [{"id": Page.URL, "property": "href", "value": f"{url}/"}],
+            "state": [],
+            "changedPropIds": [f"{Page.URL}.href"],
+        },
+    )
+    if status != 200:
+        raise RuntimeError(f"Could not render the dashboard: HTTP {status}")
+    layout = json.loads(body)["response"][component_id][prop]
+    tabs = render_tabs(request, dependencies, layout)
+    return PayloadFactory(dependencies, [layout, *tabs])
+
+
+def render_tabs(request: Request, dependencies: list[dict], layout: Any) -> list[Any]:
+    """Render the tabs which are not in the initial layout."""
+    dependency = next(d for d in dependencies if d["inputs"][0]["id"] == Page.TABS)
+    props = {
+        component["props"]["id"]: component["props"]
+        for component in walk_components(layout)
+        if isinstance(component["props"]["id"], str)
+    }
+    initial_tabs = props[Page.RENDERED_TABS]["data"]
+    panels = [{"type": Page.TAB_PANEL, "tab": tab} for tab in Tab]
+    rendered = []
+    for tab in [tab for tab in Tab if tab not in initial_tabs]:
+        status, body = request(
+            "POST",
+            UPDATE_COMPONENT_PATH,
+            {
+                "output": dependency["output"],
+                "outputs": [
+                    [{"id": panel, "property": "children"} for panel in panels],
+                    {"id": Page.RENDERED_TABS, "property": "data"},
+                ],
+                "inputs": [{"id": Page.TABS, "property": "value", "value": tab}],
+                "state": [
+                    {"id": Page.RENDERED_TABS, "property": "data", "value": []},
+                    {
+                        "id": Page.DATASET,
+                        "property": "value",
+                        "value": props[Page.DATASET]["value"],
+                    },
+                ],
+                "changedPropIds": [f"{Page.TABS}.value"],
+            },
+        )
+        if status != 200:
+            raise RuntimeError(f"Could not render the {tab} tab: HTTP {status}")
+        panel_id = stringify_id({"type": Page.TAB_PANEL, "tab": tab})
+        rendered.append(json.loads(body)["response"][panel_id]["children"])
+    return rendered
+
+
+def run_load(
+    url: str,
+    mix: dict[str, float],
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+) -> Results:
+    """Send requests from `concurrency` threads for `duration` seconds."""
+    factory = load_factory(url)
+    scenarios = [name for name in mix if factory.available(name)]
+    skipped = set(mix) - set(scenarios)
+    if skipped:
+        print(
+            f"Skipping scenarios with no server callback: {', '.join(sorted(skipped))}"
+        )
+    weights = [mix[name] for name in scenarios]
+
+    results = Results()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_seed: int):
+        rng = random.Random(worker_seed)
+        scenario_factory = Scenarios(factory, rng)
+        conn = Connection(url)
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(scenarios, weights)[0]
+            payload = scenario_factory.make(scenario)
+            start = time.perf_counter()
+            try:
+                status, _ = conn.request("POST", UPDATE_COMPONENT_PATH, payload)
+                ok = 200 <= status < 300
+            except (http.client.HTTPException, OSError):
+                ok = False
+            results.record(scenario, (time.perf_counter() - start) * 1000, ok)
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=worker, args=(seed + i,), daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.elapsed = time.perf_counter() - start
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 120):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            status, _ = Connection(url, timeout=5).request("GET", "/_dash-layout")
+            if status == 200:
+                return
+        except (http.client.HTTPException, OSError):
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server at {url} did not start within {timeout}s")
+
+
+def start_server(
+    workers: int,
+    threads: int,
+    quiet: bool = True,
+    env: dict[str, str] | None = None,
+    cwd: str | None = None,
+) -> tuple[str, subprocess.Popen]:
+    """
+    Start the app under gunicorn on a free local port.
+    `env` overrides environment variables, and `cwd` is where data is loaded from.
+    """
+    port = _free_port()
+    src_path = os.path.dirname(os.path.dirname(ark_rp_visualisation.__file__))
+    env = {
+        **os.environ,
+        # Every simulated user shares one address, so mustn't share its build limit
+        "CLIENT_BUILD_LIMIT": "0",
+        **(env or {}),
+        "PYTHONPATH": os.pathsep.join([src_path, os.getenv("PYTHONPATH", "")]),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "ark_rp_visualisation.app:server",
+            f"--bind=127.0.0.1:{port}",
+            f"--workers={workers}",
+            f"--threads={threads}",
+            "--timeout=300",
+            "--log-level=warning",
+        ],
+        env=env,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL if quiet else None,
+        stderr=subprocess.DEVNULL if quiet else None,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(url, process)
+    except Exception:
+        process.terminate()
+        raise
+    return url, process
+
+
+def print_summary(label: str, summary: dict[str, dict[str, float]]):
+    print(f"\n{label}")
+    print(
+        f"{'scenario':<22} {'requests':>8} {'req/s':>8} {'p50 ms':>8}"
+        f" {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    for name, row in summary.items():
+        print(
+            f"{name:<22} {row['requests']:>8} {row['throughput_rps']:>8.1f}"
+            f" {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+            f" {row['error_rate']:>7.1%}"
+        )
+
+
+def _parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for item in text.split(","):
+        name, weight = item.split("=")
+        if name not in SCENARIO_TRIGGERS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def _parse_configs(text: str) -> list[tuple[int, int]]:
+    return [tuple(map(int, config.split("x"))) for config in text.split(",")]  # type: ignore[misc]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Dash callbacks.")
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument(
+        "--configs",
+        type=_parse_configs,
+        default=[(1, 1)],
+        help="comma-separated gunicorn WORKERSxTHREADS settings, e.g. 1x1,1x4,2x2",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds per run")
+    parser.add_argument(
+        "--mix",
+        type=_parse_mix,
+        default=DEFAULT_MIX,
+        help="scenario weights, e.g. render_graph=1,update_filter_options=2",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--server-logs", action="store_true", help="show the server's output"
+    )
+    parser.add_argument("--json", help="write the summaries to this JSON file")
+    args = parser.parse_args()
+
+    runs: list[tuple[str, Callable[[], tuple[str, subprocess.Popen | None]]]]
+    if args.url:
+        runs = [(args.url, lambda: (args.url, None))]
+    else:
+        runs = [
+            (
+                f"gunicorn {w} worker(s) x {t} thread(s)",
+                lambda w=w, t=t: start_server(w, t, quiet=not args.server_logs),
+            )
+            for w, t in args.configs
+        ]
+
+    summaries = {}
+    for label, start in runs:
+        url, process = start()
+        try:
+            results = run_load(
+                url, args.mix, args.concurrency, args.duration, seed=args.seed
+            )
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+        summaries[label] = results.summary()
+        print_summary(f"{label}, concurrency {args.concurrency}", summaries[label])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
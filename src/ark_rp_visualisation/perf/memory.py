@@ -0,0 +1,153 @@
+"""
+Memory accounting for loading the dataset and building graphs.
+
+Reports the peak RSS, tracemalloc peak and top allocators of each DataLoader and
+PlotBuilder.build stage, and the memory used by each column of the loaded DataFrame.
+The report is written as JSON, so it can be tracked alongside the benchmarks.
+
+Profile a synthetic dataset with:
+    python -m ark_rp_visualisation.perf.memory --rows 1000000 --output .cache/memory.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+from typing import Any
+
+import pandas as pd
+
+from ark_rp_visualisation.core import DataLoader, PlotBuilder, synthetic
+from ark_rp_visualisation.core.data_loader import DATA_PATH
+from ark_rp_visualisation.core.enums import Tab
+from ark_rp_visualisation.perf.benchmark import (
+    BENCHMARK_SEED,
+    environment_info,
+    enumerate_axis_cases,
+)
+from ark_rp_visualisation.utils.profiling import peak_rss_mb, profile_memory, stage
+
+MEMORY_REPORT_PATH = os.getenv("MEMORY_REPORT_PATH", ".cache/memory_report.json")
+
+
+def column_memory(df: pd.DataFrame) -> dict[str, Any]:
+    """Return the deep memory usage of each column, in megabytes."""
+    usage = df.memory_usage(deep=True, index=False)
+    return {
+        "rows": len(df),
+        "total_mb": round(usage.sum() / 2**20, 3),
+        "columns": {
+            column: {"dtype": str(df[column].dtype), "mb": round(size / 2**20, 3)}
+            for column, size in usage.items()
+        },
+    }
+
+
+def profile_load(data_path: str, top: int) -> tuple[pd.DataFrame, dict[str, Any]]:
+    """Read and clean the CSVs in `data_path` with memory accounting enabled."""
+    # Read without loading, so the datasets served by this process are unchanged
+    with profile_memory(top=top) as profiler:
+        df = DataLoader.read_path(data_path, clean=False)
+        raw = column_memory(df)
+        df = DataLoader.remove_sensitive_fields(df)
+    return df, {"stages": profiler.stages, "raw_dataset": raw}
+
+
+def profile_builds(
+    df: pd.DataFrame, states: dict[str, dict[str, Any]], top: int
+) -> dict[str, Any]:
+    """Build each graph state with memory accounting enabled."""
+    results = {}
+    for case_id, state in states.items():
+        gc.collect()
+        with profile_memory(top=top) as profiler:
+            with stage("init"):
+                builder = PlotBuilder.from_state(state, df=df)
+            builder.build()
+        results[case_id] = {"timings_ms": builder.timings, "stages": profiler.stages}
+    return results
+
+
+def run_report(
+    data_path: str | None = None,
+    num_rows: int | None = None,
+    all_cases: bool = False,
+    top: int = 10,
+) -> dict[str, Any]:
+    """
+    Profile loading the CSVs in `data_path`,
+    or synthetic CSVs of `num_rows` messages, then profile graph builds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if num_rows is not None:
+            synthetic.write_csvs(
+                synthetic.generate(num_rows, seed=BENCHMARK_SEED),
+                directory,
+                seed=BENCHMARK_SEED,
+            )
+            data_path = directory
+        df, load = profile_load(data_path or DATA_PATH, top)
+
+    states = {}
+    for tab in Tab:
+        cases = enumerate_axis_cases(tab)
+        for case in cases if all_cases else cases[:1]:
+            states[case.id] = case.state
+
+    return {
+        "environment": environment_info(),
+        "dataset": column_memory(df),
+        "load": load,
+        "builds": profile_builds(df, states, top),
+        "process_peak_rss_mb": round(peak_rss_mb(), 3),
+    }
+
+
+def print_report(report: dict[str, Any]):
+    def print_stages(stages: dict[str, dict[str, Any]]):
+        for name, record in stages.items():
+            rss, traced = record["peak_rss_mb"], record["peak_traced_mb"]
+            growth = record["rss_growth_mb"]
+            growth = "-" if growth is None else f"{growth:.1f}"
+            print(f"  {name:<16} {rss:>10.1f} {growth:>10} {traced:>10.1f}")
+
+    dataset = report["dataset"]
+    print(f"Dataset: {dataset['rows']} rows, {dataset['total_mb']:.1f} MB")
+    for column, usage in dataset["columns"].items():
+        print(f"  {column:<16} {usage['dtype']:<40} {usage['mb']:>10.1f} MB")
+
+    print(f"\nLoad stages      {'RSS MB':>10} {'+RSS MB':>10} {'traced MB':>10}")
+    print_stages(report["load"]["stages"])
+    for case_id, build in report["builds"].items():
+        print(f"\n{case_id:<16} {'RSS MB':>10} {'+RSS MB':>10} {'traced MB':>10}")
+        print_stages(build["stages"])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report memory usage of loading data and building graphs."
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--data-path", help="directory of Discord CSV exports")
+    source.add_argument("--rows", type=int, help="profile synthetic data instead")
+    parser.add_argument(
+        "--all", action="store_true", help="profile every field combination"
+    )
+    parser.add_argument("--top", type=int, default=10, help="allocators per stage")
+    parser.add_argument("--output", default=MEMORY_REPORT_PATH)
+    args = parser.parse_args()
+
+    report = run_report(args.data_path, args.rows, all_cases=args.all, top=args.top)
+    print_report(report)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Structured slow-query log for graph builds.
+
+Every build slower than SLOW_QUERY_THRESHOLD_MS is appended to SLOW_QUERY_LOG_PATH
+as one JSON line containing the graph state, the version of the dataset it was built
+from, its build and queue times and per-stage timings. Time spent queued for a build
+slot doesn't count towards the threshold.
+
+Replay a log against the current code with:
+    python -m ark_rp_visualisation.perf.slow_query [path]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+from ark_rp_visualisation.core import DataLoader, PlotBuilder
+from ark_rp_visualisation.utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 1000))
+SLOW_QUERY_LOG_PATH = os.getenv("SLOW_QUERY_LOG_PATH", ".cache/slow_queries.jsonl")
+
+_lock = threading.Lock()
+
+
+def log_slow_query(
+    state: dict[str, Any],
+    dataset_version: str,
+    timings: dict[str, float],
+    build_ms: float,
+    queue_ms: float = 0.0,
+    path: str = SLOW_QUERY_LOG_PATH,
+    threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+) -> bool:
+    """
+    Append a graph build of a dataset version to the slow-query log if the build
+    exceeded the threshold. Return True if an entry was written.
+    """
+    if build_ms < threshold_ms:
+        return False
+
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "dataset_version": dataset_version,
+        "build_ms": round(build_ms, 3),
+        "queue_ms": round(queue_ms, 3),
+        "timings": {name: round(ms, 3) for name, ms in timings.items()},
+        "state": state,
+    }
+    line = json.dumps(entry, default=str)
+
+    with _lock:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    logger.warning(f"Slow graph build ({build_ms:.0f} ms) logged to {path}")
+    return True
+
+
+def read_slow_queries(path: str = SLOW_QUERY_LOG_PATH) -> Iterator[dict[str, Any]]:
+    """Yield each entry of a slow-query log, skipping malformed lines."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed line {line_number} in {path}")
+
+
+def time_build(
+    state: dict[str, Any], repeat: int = 1
+) -> tuple[float, dict[str, float]]:
+    """
+    Build a graph state `repeat` times.
+    Return the fastest total time and its per-stage timings, in milliseconds.
+    """
+    best_ms, best_timings = float("inf"), {}
+    for _ in range(repeat):
+        builder = PlotBuilder.from_state(state)
+        start = time.perf_counter()
+        builder.build()
+        total_ms = (time.perf_counter() - start) * 1000
+        if total_ms < best_ms:
+            best_ms, best_timings = total_ms, builder.timings
+    return best_ms, best_timings
+
+
+def replay(
+    path: str, repeat: int = 1, limit: int | None = None
+) -> list[dict[str, Any]]:
+    """Replay every entry of a slow-query log and return before/after latencies."""
+    results = []
+
+    for i, entry in enumerate(read_slow_queries(path)):
+        if limit is not None and i >= limit:
+            break
+
+        try:
+            after_ms, timings = time_build(entry["state"], repeat=repeat)
+        except Exception as e:
+            logger.exception("Replay failed")
+            results.append({**entry, "error": repr(e)})
+            continue
+
+        results.append(
+            {
+                **entry,
+                "after_ms": round(after_ms, 3),
+                "after_timings": {name: round(ms, 3) for name, ms in timings.items()},
+                "same_dataset": entry.get("dataset_version")
+                == DataLoader().get_state_snapshot(entry["state"]).version,
+            }
+        )
+    return results
+
+
+def print_report(results: list[dict[str, Any]]):
+    print(
+        f"{'#':>3}  {'tab':<9} {'before ms':>10} {'after ms':>10} {'change':>8}  note"
+    )
+    for i, result in enumerate(results):
+        tab = result["state"].get("tab", "?")
+        # Logs from before queue time was separated have only the total
+        before = result.get("build_ms", result.get("total_ms"))
+        if "error" in result:
+            print(
+                f"{i:>3}  {tab:<9} {before:>10.1f} {'-':>10} {'-':>8}  {result['error']}"
+            )
+            continue
+
+        after = result["after_ms"]
+        change = (after - before) / before if before else 0
+        note = "" if result["same_dataset"] else "different dataset version"
+        print(
+            f"{i:>3}  {tab:<9} {before:>10.1f} {after:>10.1f} {change:>+8.0%}  {note}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a slow-query log against the current code."
+    )
+    parser.add_argument("path", nargs="?", default=SLOW_QUERY_LOG_PATH)
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="builds per entry, fastest is reported"
+    )
+    parser.add_argument("--limit", type=int, help="maximum number of entries to replay")
+    parser.add_argument(
+        "--json", action="store_true", help="print results as JSON lines"
+    )
+    args = parser.parse_args()
+
+    results = replay(args.path, repeat=args.repeat, limit=args.limit)
+    if args.json:
+        for result in results:
+            print(json.dumps(result, default=str))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
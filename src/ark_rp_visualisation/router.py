@@ -1,23 +1,51 @@
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qs, urlencode, urlparse
 
 from dash import Input, Output
 
+from ark_rp_visualisation.api import FIGURE_PATH
+from ark_rp_visualisation.core.data_loader import DATASETS, DEFAULT_DATASET
 from ark_rp_visualisation.core.enums import Page
+from ark_rp_visualisation.core.graph_state import validate_state
 from ark_rp_visualisation.pages.dashboard import layout as dashboard_layout
 from ark_rp_visualisation.pages.fullscreen import layout as fullscreen_layout
 from ark_rp_visualisation.pages.error import layout as error_layout
 from ark_rp_visualisation.utils.serialisation import decode_state
+from ark_rp_visualisation.utils.state_store import state_store
+
+GRAPH_PATH = "/graph"
+
+
+def graph_layout(state, figure_url):
+    # States from the store were saved by a callback, which anyone can call
+    try:
+        validate_state(state)
+    except ValueError:
+        return error_layout("Invalid graph URL")
+
+    if state.get("dataset", DEFAULT_DATASET) not in DATASETS:
+        return error_layout("Unknown dataset")
+
+    return fullscreen_layout(figure_url)
 
 
 def register_router_callbacks(app):
     def display_page(href):
         if not href:
-            return dashboard_layout
+            return dashboard_layout()
 
         parsed_url = urlparse(href)
 
-        # /graph: Fullscreen graph
-        if parsed_url.path == "/graph":
+        # /graph/<id>: Fullscreen graph of a stored state
+        if parsed_url.path.startswith(f"{GRAPH_PATH}/"):
+            state_id = parsed_url.path.removeprefix(f"{GRAPH_PATH}/")
+            state = state_store.load(state_id) if state_store else None
+            if not state:
+                return error_layout("Graph not found")
+
+            return graph_layout(state, f"{FIGURE_PATH}/{state_id}")
+
+        # /graph?state=: Fullscreen graph of an encoded state
+        if parsed_url.path == GRAPH_PATH:
             params = parse_qs(parsed_url.query)
             state_str = params.get("state", [None])[0]
             if not state_str:
@@ -27,11 +55,18 @@ def register_router_callbacks(app):
             if not state:
                 return error_layout("Invalid graph URL")
 
-            return fullscreen_layout(state)
+            return graph_layout(
+                state, f"{FIGURE_PATH}?{urlencode({'state': state_str})}"
+            )
 
         # /: Graph dashboard
         if parsed_url.path == "/":
-            return dashboard_layout
+            params = parse_qs(parsed_url.query)
+            dataset_id = params.get("dataset", [DEFAULT_DATASET])[0]
+            if dataset_id not in DATASETS:
+                return error_layout("Unknown dataset")
+
+            return dashboard_layout(dataset_id)
 
         return error_layout("404 Not Found")
 
@@ -0,0 +1,60 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Iterator
+
+from ark_rp_visualisation.utils.serialisation import state_key
+
+# If empty, created graphs aren't counted, so the warmer only warms defaults
+GRAPH_LOG_PATH = os.getenv("GRAPH_LOG_PATH", ".cache/created_graphs.sqlite3")
+
+
+class GraphLog:
+    """
+    How often each graph state was created on the dashboard, for the warmer.
+    Counts are incremented in SQLite, so every process adds to them safely,
+    whereas the S3 log is rewritten whole by each process and loses lines.
+    """
+
+    def __init__(self, path: str = GRAPH_LOG_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections can't be shared between threads, or with forked
+        # processes (e.g. gunicorn workers of a preloaded app)
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS graphs"
+                " (key TEXT PRIMARY KEY, state TEXT, count INTEGER)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def record(self, state: dict[str, Any]):
+        """Count a graph state created."""
+        with self._connection as connection:
+            connection.execute(
+                "INSERT INTO graphs VALUES (?, ?, 1)"
+                " ON CONFLICT (key) DO UPDATE SET count = count + 1",
+                (state_key(state), json.dumps(state, default=str)),
+            )
+
+    def most_created(self) -> Iterator[dict[str, Any]]:
+        """Yield the graph states created, most often created first."""
+        rows = self._connection.execute(
+            "SELECT state FROM graphs ORDER BY count DESC, key"
+        )
+        for (state,) in rows:
+            yield json.loads(state)
+
+
+graph_log = GraphLog() if GRAPH_LOG_PATH else None
@@ -0,0 +1,176 @@
+import linecache
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# Linux exposes a resettable peak RSS, elsewhere only the lifetime peak is available
+PROC_STATUS_PATH = "/proc/self/status"
+PROC_CLEAR_REFS_PATH = "/proc/self/clear_refs"
+TOP_ALLOCATORS = 10
+
+
+def _read_proc_status(key: str) -> float | None:
+    """Read a memory field of /proc/self/status, in megabytes."""
+    try:
+        with open(PROC_STATUS_PATH) as f:
+            for line in f:
+                if line.startswith(f"{key}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_mb() -> float | None:
+    """Return the current resident set size, if supported."""
+    return _read_proc_status("VmRSS")
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size, since the last reset if supported."""
+    peak = _read_proc_status("VmHWM")
+    if peak is not None:
+        return peak
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and kilobytes on Linux
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 1024
+
+
+def _reset_peak_rss():
+    try:
+        with open(PROC_CLEAR_REFS_PATH, "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+class MemoryProfiler:
+    """
+    Record the peak RSS, tracemalloc peak and top allocators of each stage.
+    Stages which run more than once (e.g. per CSV) are merged, keeping the worst peaks.
+
+    RSS includes the overhead of tracing itself, so `rss_growth_mb` (the peak RSS
+    above the RSS at the start of the stage) is the more useful figure to compare.
+    """
+
+    def __init__(self, top: int = TOP_ALLOCATORS):
+        self.top = top
+        self.stages: dict[str, dict[str, Any]] = {}
+        # The peaks of the stages nested in each running stage, as (traced, RSS)
+        self._nested_peaks: list[tuple[int, float]] = []
+
+    def _top_allocators(
+        self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+    ) -> list[dict[str, Any]]:
+        """Return the source lines which retained the most memory during a stage."""
+        allocators = []
+        for diff in after.compare_to(before, "lineno")[: self.top]:
+            if diff.size_diff <= 0:
+                break
+            frame = diff.traceback[0]
+            allocators.append(
+                {
+                    "location": f"{frame.filename}:{frame.lineno}",
+                    "code": linecache.getline(frame.filename, frame.lineno).strip(),
+                    "size_mb": round(diff.size_diff / 2**20, 3),
+                    "count": diff.count_diff,
+                }
+            )
+        return allocators
+
+    @contextmanager
+    def measure(self, name: str):
+        before = tracemalloc.take_snapshot()
+        # Resetting the peaks clears those of the enclosing stage, which are
+        # restored from here when this stage ends
+        _, outer_peak = tracemalloc.get_traced_memory()
+        outer_peak_rss = peak_rss_mb()
+        _reset_peak_rss()
+        start_rss = rss_mb()
+        tracemalloc.reset_peak()
+        self._nested_peaks.append((0, 0.0))
+        try:
+            yield
+        finally:
+            nested_peak, nested_peak_rss = self._nested_peaks.pop()
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, nested_peak)
+            peak_rss = max(peak_rss_mb(), nested_peak_rss)
+            if self._nested_peaks:
+                enclosing_peak, enclosing_peak_rss = self._nested_peaks[-1]
+                self._nested_peaks[-1] = (
+                    max(enclosing_peak, outer_peak, peak),
+                    max(enclosing_peak_rss, outer_peak_rss, peak_rss),
+                )
+            record = {
+                "calls": 1,
+                "peak_rss_mb": round(peak_rss, 3),
+                "rss_growth_mb": (
+                    round(peak_rss - start_rss, 3) if start_rss is not None else None
+                ),
+                "peak_traced_mb": round(peak / 2**20, 3),
+                "top_allocators": self._top_allocators(
+                    before, tracemalloc.take_snapshot()
+                ),
+            }
+            self._merge(name, record)
+
+    def _merge(self, name: str, record: dict[str, Any]):
+        previous = self.stages.get(name)
+        if previous is None:
+            self.stages[name] = record
+            return
+
+        record["calls"] += previous["calls"]
+        for metric in ("peak_rss_mb", "rss_growth_mb", "peak_traced_mb"):
+            if record[metric] is not None and previous[metric] is not None:
+                record[metric] = max(record[metric], previous[metric])
+        # Keep the allocators of the call with the highest peak
+        if record["peak_traced_mb"] == previous["peak_traced_mb"]:
+            record["top_allocators"] = previous["top_allocators"]
+        self.stages[name] = record
+
+
+_profiler: MemoryProfiler | None = None
+
+
+@contextmanager
+def profile_memory(top: int = TOP_ALLOCATORS) -> Iterator[MemoryProfiler]:
+    """
+    Enable memory accounting for every stage run inside this context.
+    Tracing slows down allocations, so this is only meant for offline reports.
+    """
+    global _profiler
+    if _profiler is not None:
+        raise RuntimeError("Memory profiling is already active")
+
+    tracemalloc.start()
+    _profiler = MemoryProfiler(top=top)
+    try:
+        yield _profiler
+    finally:
+        _profiler = None
+        tracemalloc.stop()
+
+
+@contextmanager
+def stage(name: str, timings: dict[str, float] | None = None):
+    """
+    Time a named stage of work.
+    If a timings dictionary is given, the elapsed milliseconds are stored under `name`.
+    Inside `profile_memory()`, the stage's memory usage is also recorded.
+    """
+    profiler = _profiler
+    start = time.perf_counter()
+    try:
+        if profiler is None:
+            yield
+        else:
+            with profiler.measure(name):
+                yield
+    finally:
+        if timings is not None:
+            timings[name] = (time.perf_counter() - start) * 1000
@@ -1,28 +1,71 @@
 import base64
+import hashlib
 import json
 import zlib
 from typing import Any
 
-from ark_rp_visualisation. utils.logging_setup import get_logger
+from ark_rp_visualisation.core.graph_state import (
+    FORMAT_VERSION,
+    FORMAT_VERSIONS,
+    pack_state,
+    unpack_state,
+    validate_state,
+)
+from ark_rp_visualisation.utils.logging_setup import get_logger
 
 logger = get_logger(__name__)
 
+# Flag in the first byte of an encoded state, after the format version
+COMPRESSED = 1
+# First byte of states encoded as compressed JSON
+ZLIB_HEADER = b"\x78"
+
 
 def encode_state(state: dict[str, Any]) -> str:
-    """Compress and encode a dictionary into a URL-safe string."""
-    json_str = json.dumps(state)
-    compressed = zlib.compress(json_str.encode("utf-8"))
-    base64_bytes = base64.urlsafe_b64encode(compressed)
-    return base64_bytes.decode("ascii")
+    """
+    Pack a graph state into a URL-safe string (see `pack_state`),
+    raising a ValueError if the state is invalid.
+    """
+    packed = pack_state(state)
+    # Only compressed when it helps, which it rarely does for short states
+    compressed = zlib.compress(packed, 9, wbits=-15)
+    flags = COMPRESSED if len(compressed) < len(packed) else 0
+    payload = bytes([FORMAT_VERSION << 1 | flags])
+    payload += compressed if flags else packed
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def _decode_json_state(data: bytes) -> dict[str, Any]:
+    """Decode a state encoded as compressed JSON, by links from before `pack_state`."""
+    state = json.loads(zlib.decompress(data).decode("utf-8"))
+    validate_state(state)
+    return state
 
 
 def decode_state(encoded_str: str) -> dict[str, Any]:
-    """Decode and decompress a string back into a dictionary."""
+    """Decode a string from `encode_state` back into a valid graph state, or {}."""
     try:
-        base64_bytes = encoded_str.encode("ascii")
-        compressed = base64.urlsafe_b64decode(base64_bytes)
-        json_str = zlib.decompress(compressed).decode("utf-8")
-        return json.loads(json_str)
+        padding = "=" * (-len(encoded_str) % 4)
+        data = base64.urlsafe_b64decode(f"{encoded_str}{padding}".encode("ascii"))
+        if data[:1] == ZLIB_HEADER:
+            return _decode_json_state(data)
+
+        version, flags = data[0] >> 1, data[0] & COMPRESSED
+        if version not in FORMAT_VERSIONS:
+            raise ValueError(f"Unknown graph state format: {version}")
+        packed = zlib.decompress(data[1:], wbits=-15) if flags else data[1:]
+        return unpack_state(packed, version)
     except Exception:
         logger.exception("Decoding error")
         return {}
+
+
+def state_key(state: dict[str, Any], *extra: Any) -> str:
+    """
+    Return a hash of a state (and any extra values),
+    which is the same for equal states whatever their key order.
+    """
+    canonical = json.dumps(
+        [state, *extra], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import ExitStack
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+# Results written by another worker within this many seconds are shared
+FILE_RESULT_TTL = 10
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls with the same key into one.
+    The first caller runs the function, and callers arriving before it finishes
+    wait for and share its result (or exception). Nothing is cached afterwards.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class FileSingleFlight(SingleFlight[T]):
+    """
+    Coalesce concurrent calls across processes (e.g. gunicorn workers) sharing
+    `directory`, using a file lock per key. Calls are first coalesced within the
+    process, then the leader of each process takes the lock. The first to get it
+    runs the function and writes the serialised result, which the others read.
+    Results are kept for `ttl` seconds, then swept by later calls, as are locks
+    no longer held.
+    Only available where `fcntl` is (i.e. not on Windows).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        serialise: Callable[[T], str],
+        deserialise: Callable[[str], T],
+        ttl: float = FILE_RESULT_TTL,
+    ):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.serialise = serialise
+        self.deserialise = deserialise
+        self.ttl = ttl
+
+    def _read_recent(self, path: str) -> T | None:
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, encoding="utf-8") as f:
+                return self.deserialise(f.read())
+        except OSError:
+            return None
+
+    def _sweep(self):
+        """
+        Remove the results of calls which finished over `ttl` seconds ago, and
+        their locks unless another process holds them (e.g. for a slow call).
+        """
+        import fcntl
+
+        cutoff = time.time() - self.ttl
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime >= cutoff:
+                        continue
+                    if not entry.name.endswith(".lock"):
+                        os.remove(entry.path)
+                        continue
+                    with open(entry.path, "a") as lock:
+                        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        os.remove(entry.path)
+                except OSError:
+                    # Including BlockingIOError, when the lock is held
+                    pass
+
+    def _acquire(self, path: str):
+        """
+        Open and lock the lock file at `path`, blocking while another process
+        holds it. Retried if the file was swept while waiting, as the lock of a
+        removed file no longer excludes processes opening the path afresh.
+        """
+        import fcntl
+
+        while True:
+            # Closed unless returned, including if locking raises
+            with ExitStack() as stack:
+                lock = stack.enter_context(open(path, "a"))
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    if os.stat(path).st_ino == os.fstat(lock.fileno()).st_ino:
+                        stack.pop_all()
+                        return lock
+                except FileNotFoundError:
+                    pass
+
+    def _do_locked(self, key: str, fn: Callable[[], T]) -> T:
+        path = os.path.join(self.directory, key)
+        # Blocks while another process computes the same key. Closing the file
+        # releases the lock
+        with self._acquire(f"{path}.lock"):
+            result = self._read_recent(path)
+            if result is not None:
+                return result
+
+            result = fn()
+            # Written then renamed, so readers never see a partial result
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(self.serialise(result))
+            os.replace(f"{path}.tmp", path)
+            self._sweep()
+            return result
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        return super().do(key, lambda: self._do_locked(key, fn))
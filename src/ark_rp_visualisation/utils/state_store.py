@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Any
+
+from ark_rp_visualisation.core.graph_state import validate_state
+from ark_rp_visualisation.utils.serialisation import state_key
+
+# If empty, states are encoded into graph URLs instead of stored.
+# Must be on persistent storage, or stored graph links break on every restart
+STATE_STORE_PATH = os.getenv("STATE_STORE_PATH", "")
+# Number of resolved states kept in memory
+STATE_CACHE_SIZE = 1024
+# Hex digits of the state hash used as its ID
+STATE_ID_LENGTH = 16
+
+
+class StateStore:
+    """
+    Content-addressed store of graph states, so graph URLs only carry a short ID.
+    Equal states have the same ID, so saving a state again stores nothing new.
+    IDs are extended in the rare case that a different state already has one.
+    """
+
+    def __init__(self, path: str = STATE_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._cached_load = lru_cache(maxsize=STATE_CACHE_SIZE)(self._load)
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections can't be shared between threads, or with forked
+        # processes (e.g. gunicorn workers of a preloaded app)
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS states (id TEXT PRIMARY KEY, state TEXT)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def save(self, state: dict[str, Any]) -> str:
+        """Store a state, and return its ID. Raises `ValueError` if it's invalid."""
+        validate_state(state)
+        key = state_key(state)
+        payload = json.dumps(state, default=str)
+        with self._connection as connection:
+            for length in range(STATE_ID_LENGTH, len(key) + 1, STATE_ID_LENGTH):
+                state_id = key[:length]
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO states VALUES (?, ?)", (state_id, payload)
+                )
+                if cursor.rowcount:
+                    return state_id
+
+                (stored,) = connection.execute(
+                    "SELECT state FROM states WHERE id = ?", (state_id,)
+                ).fetchone()
+                if json.loads(stored) == json.loads(payload):
+                    return state_id
+        raise ValueError(f"State ID {key} is taken by a different state")
+
+    def _load(self, state_id: str) -> str:
+        row = self._connection.execute(
+            "SELECT state FROM states WHERE id = ?", (state_id,)
+        ).fetchone()
+        if row is None:
+            # Raised rather than returned, so that misses aren't cached
+            raise KeyError(state_id)
+        return row[0]
+
+    def load(self, state_id: str) -> dict[str, Any] | None:
+        """Return the state with an ID, or None if there is none."""
+        try:
+            stored = self._cached_load(state_id)
+        except KeyError:
+            return None
+        # Parsed on each call, so callers can't modify the cached state
+        return json.loads(stored)
+
+
+state_store = StateStore() if STATE_STORE_PATH else None
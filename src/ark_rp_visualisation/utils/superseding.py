@@ -0,0 +1,42 @@
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Hashable, Iterator
+
+
+class Superseded(Exception):
+    """Raised in work which newer work with the same key has replaced."""
+
+
+class Superseding:
+    """
+    Track the latest work started with each key (e.g. a user's dashboard tab),
+    so older work with the key can stop at its next check rather than finish
+    a result nobody will see. Only work in this process is tracked.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: dict[Hashable, int] = {}
+        self._tokens = itertools.count()
+
+    @contextmanager
+    def start(self, key: Hashable) -> Iterator[Callable[[], None]]:
+        """
+        Start work with a key, superseding any work with the key already running.
+        Yields a check, which raises `Superseded` once newer work has started.
+        """
+        token = next(self._tokens)
+        with self._lock:
+            self._latest[key] = token
+
+        def check():
+            if self._latest.get(key) != token:
+                raise Superseded(key)
+
+        try:
+            yield check
+        finally:
+            with self._lock:
+                if self._latest.get(key) == token:
+                    del self._latest[key]
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Iterable
+
+from flask import Flask, g
+
+from ark_rp_visualisation.core import executor
+from ark_rp_visualisation.core.admission import BuildRejected
+from ark_rp_visualisation.core.data_loader import DATASETS, DEFAULT_DATASET
+from ark_rp_visualisation.core.enums import Tab
+from ark_rp_visualisation.core.figure_cache import figure_cache
+from ark_rp_visualisation.core.graph_state import default_state, validate_state
+from ark_rp_visualisation.utils.graph_log import graph_log
+from ark_rp_visualisation.utils.logging_setup import get_logger
+from ark_rp_visualisation.utils.serialisation import state_key
+
+# Seconds of CPU time a warming run may use, 0 disables warming
+WARM_CPU_BUDGET_S = float(os.getenv("WARM_CPU_BUDGET_S", 0))
+# Number of the most frequently created graphs warmed, after each Tab's default
+WARM_TOP_N = int(os.getenv("WARM_TOP_N", 20))
+# Seconds between warming runs, 0 to only warm at startup
+WARM_INTERVAL = float(os.getenv("WARM_INTERVAL", 3600))
+# Seconds without requests before a run starts, or resumes after a request
+WARM_IDLE_S = float(os.getenv("WARM_IDLE_S", 2))
+
+logger = get_logger(__name__)
+
+
+def popular_states(
+    states: Iterable[dict[str, Any]], top_n: int
+) -> list[dict[str, Any]]:
+    """
+    Return the first `top_n` of graph states, most often created first (see
+    `GraphLog.most_created`), skipping any invalid now or of a removed dataset.
+    """
+    popular = []
+    for state in states:
+        if len(popular) == top_n:
+            break
+        try:
+            validate_state(state)
+        except ValueError:
+            continue
+        if state.get("dataset", DEFAULT_DATASET) in DATASETS:
+            popular.append(state)
+    return popular
+
+
+class Warmer:
+    """
+    Build figures into the figure cache ahead of requests, so the first users
+    after a deploy or cold start don't get the slowest graphs.
+
+    A run warms the default graph of each Tab, then the graphs most often created
+    according to the graph log, until they're all cached or it has used `cpu_budget_s`
+    seconds of CPU time. It stops as soon as a request arrives, and resumes with
+    the rest of its budget once there have been no requests for `idle_s` seconds.
+    """
+
+    def __init__(
+        self,
+        cpu_budget_s: float = WARM_CPU_BUDGET_S,
+        top_n: int = WARM_TOP_N,
+        interval: float = WARM_INTERVAL,
+        idle_s: float = WARM_IDLE_S,
+    ):
+        self.cpu_budget_s = cpu_budget_s
+        self.top_n = top_n
+        self.interval = interval
+        self.idle_s = idle_s
+        self._lock = threading.Lock()
+        self._active_requests = 0
+        self._last_request = 0.0
+        # Report of the last run, see `run`
+        self.last_report: dict[str, Any] | None = None
+
+    def attach(self, server: Flask):
+        """Track the requests of a server, so runs give way to them."""
+
+        @server.before_request
+        def request_started():
+            g.warmer_tracked = True
+            with self._lock:
+                self._active_requests += 1
+                self._last_request = time.monotonic()
+
+        @server.teardown_request
+        def request_finished(_):
+            # Not counted if an earlier hook stopped the request
+            if g.pop("warmer_tracked", False):
+                with self._lock:
+                    self._active_requests -= 1
+                    self._last_request = time.monotonic()
+
+    def _idle_for(self) -> float:
+        with self._lock:
+            if self._active_requests:
+                return 0.0
+            return time.monotonic() - self._last_request
+
+    def targets(self) -> list[tuple[str, dict[str, Any]]]:
+        """Return the graph states to warm, and where each came from."""
+        targets = [("default", default_state(tab, DEFAULT_DATASET)) for tab in Tab]
+        if self.top_n and graph_log:
+            popular = popular_states(graph_log.most_created(), self.top_n)
+            targets += [("popular", state) for state in popular]
+
+        unique = {}
+        for source, state in targets:
+            unique.setdefault(state_key(state), (source, state))
+        return list(unique.values())
+
+    def run(self, cpu_budget_s: float | None = None) -> dict[str, Any]:
+        """
+        Warm the figure cache, and return and log a report of the graphs warmed,
+        the time taken and why the run stopped (done, budget, request or rejected).
+        """
+        if cpu_budget_s is None:
+            cpu_budget_s = self.cpu_budget_s
+        start, cpu_start = time.monotonic(), executor.thread_time()
+        warmed = []
+        stopped = "done"
+
+        for source, state in self.targets():
+            if executor.thread_time() - cpu_start >= cpu_budget_s:
+                stopped = "budget"
+                break
+            if self._idle_for() < time.monotonic() - start:
+                stopped = "request"
+                break
+
+            build_start = time.perf_counter()
+            try:
+                cached = figure_cache.peek(state) is not None
+                if not cached:
+                    figure_cache.get(state)
+            except BuildRejected:
+                # Other processes are busy building, so leave the queue to them
+                stopped = "rejected"
+                break
+            except Exception:
+                logger.exception(f"Failed to warm graph: {json.dumps(state)}")
+                continue
+            warmed.append(
+                {
+                    "source": source,
+                    "tab": state["tab"],
+                    "fields": state["fields"],
+                    "cached": cached,
+                    "ms": round((time.perf_counter() - build_start) * 1000, 1),
+                }
+            )
+
+        report = {
+            "stopped": stopped,
+            "warmed": warmed,
+            "wall_s": round(time.monotonic() - start, 3),
+            "cpu_s": round(executor.thread_time() - cpu_start, 3),
+        }
+        logger.info(
+            f"Warmed {sum(not w['cached'] for w in warmed)} graphs"
+            f" ({len(warmed)} checked) in {report['wall_s']} s"
+            f" using {report['cpu_s']} s CPU, stopped: {stopped}"
+        )
+        self.last_report = report
+        return report
+
+    def _wait_until_idle(self):
+        while (idle_for := self._idle_for()) < self.idle_s:
+            time.sleep(max(self.idle_s - idle_for, 0.1))
+
+    def _schedule(self):
+        while True:
+            budget = self.cpu_budget_s
+            # Runs stopped by requests resume with what's left of the budget
+            while True:
+                self._wait_until_idle()
+                report = self.run(budget)
+                budget -= report["cpu_s"]
+                if report["stopped"] != "request" or budget <= 0:
+                    break
+
+            if not self.interval:
+                return
+            time.sleep(self.interval)
+
+    def start(self) -> threading.Thread:
+        """Warm the figure cache now and every `interval` seconds, in a thread."""
+        thread = threading.Thread(target=self._schedule, name="warmer", daemon=True)
+        thread.start()
+        return thread
+
+
+warmer = Warmer()
@@ -0,0 +1,141 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from ark_rp_visualisation.core import PlotBuilder, synthetic
+from ark_rp_visualisation.core.admission import (
+    BuildQueue,
+    BuildRejected,
+    client_address,
+)
+from ark_rp_visualisation.core.enums import Text
+
+from .slow_query_test import STATE
+
+df = synthetic.generate(5000, seed=6)
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    def make_queue(**kwargs):
+        return BuildQueue(str(tmp_path / "queue.sqlite3"), **kwargs)
+
+    return make_queue
+
+
+def hold(queue: BuildQueue, client=None) -> threading.Event:
+    """Hold a slot in another thread until the returned event is set."""
+    admitted, release = threading.Event(), threading.Event()
+
+    def run():
+        with queue.admit(client):
+            admitted.set()
+            release.wait(timeout=5)
+
+    threading.Thread(target=run, daemon=True).start()
+    assert admitted.wait(timeout=5)
+    return release
+
+
+def test_builds_wait_for_slot(make_queue):
+    queue = make_queue(slots=1)
+    release = hold(queue)
+    threading.Timer(0.2, release.set).start()
+
+    with queue.admit() as ticket:
+        assert ticket.queue_ms >= 150
+        assert ticket.sample_fraction is None
+
+    metrics = queue.metrics()
+    assert metrics["admitted"] == 2
+    assert metrics["queue_max_ms"] >= 150
+    assert metrics["running"] == metrics["waiting"] == 0
+
+
+def test_full_queue_rejected(make_queue):
+    queue = make_queue(slots=1, limit=1)
+    release = hold(queue)
+    with pytest.raises(BuildRejected, match=Text.QUEUE_FULL):
+        with queue.admit():
+            pass
+    release.set()
+    assert queue.metrics()["rejected"] == 1
+
+
+def test_client_limit(make_queue):
+    queue = make_queue(client_limit=1)
+    release = hold(queue, client="1.2.3.4")
+    with pytest.raises(BuildRejected, match=Text.CLIENT_QUEUE_FULL):
+        with queue.admit("1.2.3.4"):
+            pass
+    # Other clients, and builds without one, are still admitted
+    with queue.admit("5.6.7.8"), queue.admit():
+        pass
+    release.set()
+
+
+def test_dead_process_pruned(make_queue):
+    queue = make_queue(slots=1)
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    # As if the process were killed while holding a slot
+    queue._connection.execute(
+        "INSERT INTO tickets (client, pid, queued_at, started_at) VALUES (?, ?, ?, ?)",
+        (None, process.pid, time.time(), time.time()),
+    )
+    with queue.admit() as ticket:
+        assert ticket.queue_ms < 1000
+
+
+def test_restarted_process_pruned(make_queue):
+    queue = make_queue(slots=1)
+    # As if left by an earlier process which had this one's PID, e.g. the server
+    # before its container restarted
+    for _ in range(2):
+        queue._connection.execute(
+            "INSERT INTO tickets (client, pid, pid_started_at, queued_at, started_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (None, os.getpid(), 0.0, time.time(), time.time()),
+        )
+    queue.clear_stale()
+    assert queue.metrics()["running"] == 0
+
+    # Tickets of running processes are kept
+    release = hold(queue)
+    queue.clear_stale()
+    assert queue.metrics()["running"] == 1
+    release.set()
+
+
+def test_degraded_when_queue_long(make_queue):
+    queue = make_queue(slots=2, degrade_length=1, sample_fraction=0.5)
+    release = hold(queue)
+    with queue.admit(degradable=True) as ticket:
+        assert ticket.sample_fraction == 0.5
+    with queue.admit() as ticket:
+        assert ticket.sample_fraction is None
+    release.set()
+    assert queue.metrics()["degraded"] == 1
+
+
+def test_sampled_build_approximate():
+    exact = PlotBuilder.from_state(STATE, df=df).build()
+    builder = PlotBuilder.from_state(STATE, df=df)
+    builder.sample_fraction = 0.5
+    approximate = builder.build()
+
+    assert approximate.layout.title.text == f"{exact.layout.title.text} (approximate)"
+    assert "sample" in builder.timings
+    # Totals are scaled up to roughly those of every row
+    assert sum(approximate.data[0].y) == pytest.approx(sum(exact.data[0].y), rel=0.1)
+
+
+def test_client_address():
+    assert client_address({}, "10.0.0.1") == "10.0.0.1"
+    # The address appended by the proxy, not the one claimed by the client
+    headers = {"X-Forwarded-For": "1.1.1.1, 2.2.2.2"}
+    assert client_address(headers, "10.0.0.1") == "2.2.2.2"
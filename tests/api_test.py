@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from ark_rp_visualisation.api import BUILD_METRICS_PATH, EMBED_PATH, FIGURE_PATH
+from ark_rp_visualisation.app import app
+from ark_rp_visualisation.core.admission import BuildQueue
+from ark_rp_visualisation.core.data_loader import DataLoader
+from ark_rp_visualisation.core.figure_cache import FigureCache
+from ark_rp_visualisation.utils.serialisation import encode_state
+from ark_rp_visualisation.utils.state_store import StateStore
+
+from .slow_query_test import STATE
+from .state_store_test import route
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    store = StateStore(str(tmp_path / "states.sqlite3"))
+    monkeypatch.setattr("ark_rp_visualisation.api.state_store", store)
+    monkeypatch.setattr("ark_rp_visualisation.api.figure_cache", FigureCache())
+    client = app.server.test_client()
+    client.store = store
+    client.state_id = store.save(STATE)
+    return client
+
+
+def test_figure_json(client):
+    response = client.get(f"{FIGURE_PATH}/{client.state_id}")
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert json.loads(response.data)["data"]
+    assert response.headers["ETag"]
+    assert "max-age" in response.headers["Cache-Control"]
+
+    # Encoded states give the same figure
+    encoded = client.get(FIGURE_PATH, query_string={"state": encode_state(STATE)})
+    assert encoded.headers["ETag"] == response.headers["ETag"]
+
+
+def test_not_modified(client, monkeypatch):
+    etag = client.get(f"{FIGURE_PATH}/{client.state_id}").headers["ETag"]
+
+    def fail(self, state):
+        raise AssertionError("Figure rebuilt")
+
+    monkeypatch.setattr(FigureCache, "get", fail)
+    response = client.get(
+        f"{FIGURE_PATH}/{client.state_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_modified_by_reload(client):
+    etag = client.get(f"{FIGURE_PATH}/{client.state_id}").headers["ETag"]
+    loader = DataLoader()
+    previous = loader._snapshots.copy()
+    loader._publish(loader.df.iloc[1:])
+    try:
+        response = client.get(
+            f"{FIGURE_PATH}/{client.state_id}", headers={"If-None-Match": etag}
+        )
+    finally:
+        loader._snapshots = previous
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_embed(client):
+    response = client.get(f"{EMBED_PATH}/{client.state_id}")
+    assert response.status_code == 200
+    assert response.mimetype == "text/html"
+    assert b"Plotly.newPlot" in response.data
+    figure_etag = client.get(f"{FIGURE_PATH}/{client.state_id}").headers["ETag"]
+    assert response.headers["ETag"] != figure_etag
+
+
+def test_missing_and_invalid_states(client):
+    assert client.get(f"{FIGURE_PATH}/missing").status_code == 404
+    assert client.get(FIGURE_PATH).status_code == 404
+    assert client.get(FIGURE_PATH, query_string={"state": "bad"}).status_code == 404
+
+
+def test_rejected_build_unavailable(client, monkeypatch, tmp_path):
+    queue = BuildQueue(str(tmp_path / "queue.sqlite3"), limit=0)
+    monkeypatch.setattr("ark_rp_visualisation.core.executor.build_queue", queue)
+    monkeypatch.setattr("ark_rp_visualisation.api.build_queue", queue)
+
+    response = client.get(f"{FIGURE_PATH}/{client.state_id}")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+    metrics = client.get(BUILD_METRICS_PATH).get_json()
+    assert metrics["rejected"] == 1
+
+
+def test_figures_cached():
+    cache = FigureCache(size=1)
+    first = cache.get(STATE)
+    assert cache.get(STATE) == first
+    other = cache.get({**STATE, "aggs": ["mean"]})
+    assert other.etag != first.etag
+    assert len(cache._figures) == 1
+
+
+def test_fullscreen_page_deferred(monkeypatch, client):
+    monkeypatch.setattr("ark_rp_visualisation.router.state_store", client.store)
+
+    def fail(self, state):
+        raise AssertionError("Figure built before the page was returned")
+
+    monkeypatch.setattr(FigureCache, "get", fail)
+    page = route(f"http://localhost/graph/{client.state_id}")
+    assert f"{FIGURE_PATH}/{client.state_id}" in page
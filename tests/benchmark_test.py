@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from ark_rp_visualisation.core.enums import Tab
+from ark_rp_visualisation.perf.benchmark import (
+    BENCHMARK_BASELINE_PATH,
+    BENCHMARK_SIZES,
+    compare_express,
+    enumerate_axis_cases,
+    enumerate_cases,
+    find_regression,
+    load_baseline,
+    make_dataset,
+    run_case,
+    write_results,
+)
+
+BENCHMARK_RESULTS_PATH = os.getenv(
+    "BENCHMARK_RESULTS_PATH", ".cache/benchmark_results.json"
+)
+
+# Listed without data, so collecting tests doesn't generate any
+CASE_IDS = [case.id for case in enumerate_cases()]
+UPDATE_BASELINE = bool(os.getenv("BENCHMARK_UPDATE_BASELINE"))
+
+
+@pytest.fixture(scope="session")
+def cases():
+    # Cases don't depend on the dataset size, so enumerate them on the smallest one
+    df = make_dataset(min(BENCHMARK_SIZES))
+    return {case.id: case for case in enumerate_cases(df)}
+
+
+@pytest.fixture(scope="session")
+def baseline():
+    if not UPDATE_BASELINE and not os.path.exists(BENCHMARK_BASELINE_PATH):
+        pytest.fail(
+            f"No baseline at {BENCHMARK_BASELINE_PATH}, so regressions can't be"
+            " detected. Record one with BENCHMARK_UPDATE_BASELINE=1"
+        )
+    return load_baseline(BENCHMARK_BASELINE_PATH)
+
+
+@pytest.fixture(scope="session")
+def results():
+    """Collect results, then write them (and optionally the baseline) at the end."""
+    results = {}
+    yield results
+    write_results(results, BENCHMARK_RESULTS_PATH)
+    if UPDATE_BASELINE:
+        write_results(results, BENCHMARK_BASELINE_PATH)
+
+
+@pytest.fixture(scope="module", params=BENCHMARK_SIZES, ids=lambda size: f"{size}rows")
+def size(request):
+    return request.param
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("case_id", CASE_IDS)
+def test_build_performance(size, case_id, cases, baseline, results):
+    """
+    Test that building a graph is no slower, and uses no more memory,
+    than the baseline allows.
+    """
+    case = cases[case_id]
+    result = run_case(case, make_dataset(size))
+    results.setdefault(str(size), {})[case.id] = result
+    if UPDATE_BASELINE:
+        return
+
+    expected = baseline["sizes"].get(str(size), {}).get(case.id)
+    # Failed rather than skipped, so a gate that can't fire is noticed
+    assert expected is not None, (
+        f"No baseline for {case.id} at {size} rows, record one with"
+        " BENCHMARK_UPDATE_BASELINE=1"
+    )
+
+    regression = find_regression(result, expected)
+    assert regression is None, f"{case.id} regressed at {size} rows: {regression}"
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("tab", list(Tab))
+def test_figure_factory_faster_than_express(size, tab):
+    """Test that building a graph with the figure factory beats plotly express."""
+    result = compare_express(enumerate_axis_cases(tab)[0], make_dataset(size))
+    assert result["factory_ms"] < result["express_ms"], result
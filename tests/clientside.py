@@ -0,0 +1,53 @@
+import json
+import shutil
+import subprocess
+from typing import Any
+
+import pytest
+
+NODE = shutil.which("node")
+requires_node = pytest.mark.skipif(NODE is None, reason="requires node")
+
+# Stubs the parts of window.dash_clientside used by the callbacks
+RUNNER = """
+const calls = JSON.parse(require("fs").readFileSync(0, "utf-8"));
+class Patch {
+    constructor() { this.operations = []; }
+    append(location, value) {
+        this.operations.push({operation: "Append", location, params: {value}});
+        return this;
+    }
+    delete(location) {
+        this.operations.push({operation: "Delete", location, params: {}});
+        return this;
+    }
+    build() {
+        return {__dash_patch_update: "__dash_patch_update", operations: this.operations};
+    }
+}
+const noUpdate = {};
+const window = {dash_clientside: {no_update: noUpdate, Patch, callback_context: {}}};
+const callback = (%s);
+const results = calls.map(({args, triggered, triggered_id}) => {
+    window.dash_clientside.callback_context = {triggered, triggered_id};
+    return callback(...args);
+});
+console.log(JSON.stringify(results, (key, value) => (value === noUpdate ? "NO_UPDATE" : value)));
+"""
+
+
+def run_clientside(function: str, calls: list[dict[str, Any]]) -> list[Any]:
+    """
+    Call a clientside callback under node, once per call.
+    Each call has the callback's `args` and the `triggered` and `triggered_id`
+    of its callback context. no_update is returned as "NO_UPDATE".
+    """
+    assert NODE is not None
+    process = subprocess.run(
+        [NODE, "-e", RUNNER % function],
+        input=json.dumps(calls),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(process.stdout)
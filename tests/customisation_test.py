@@ -0,0 +1,13 @@
+from ark_rp_visualisation.pages.dashboard.customisation import RESET_CUSTOMISATION_JS
+
+from .clientside import requires_node, run_clientside
+
+
+@requires_node
+def test_clientside_reset_customisation():
+    calls = [{"args": [n_clicks]} for n_clicks in (None, 0, 1)]
+    assert run_clientside(RESET_CUSTOMISATION_JS, calls) == [
+        "NO_UPDATE",
+        "NO_UPDATE",
+        ["", "", "", False, False, None, None, False, False],
+    ]
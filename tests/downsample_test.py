@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from ark_rp_visualisation.core import PlotBuilder, synthetic
+from ark_rp_visualisation.core.data_loader import DEFAULT_DATASET
+from ark_rp_visualisation.core.downsample import downsample_indices, lttb_indices
+from ark_rp_visualisation.core.enums import Tab
+from ark_rp_visualisation.core.graph_state import default_state
+from ark_rp_visualisation.pages.dashboard.graph_ui import downsampled, zoomed_range
+
+df = synthetic.generate(5000, seed=7)
+
+STATE = default_state(Tab.LINE, DEFAULT_DATASET)
+STATE["custom"]["moving_averages"] = {"7": True, "30": None}
+
+
+def test_lttb_keeps_ends_and_peaks():
+    rng = np.random.default_rng(0)
+    x = np.arange(10_000, dtype=float)
+    y = rng.normal(size=len(x))
+    y[1234], y[8765] = 100, -100
+
+    indices = lttb_indices(x, y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert {1234, 8765} <= set(indices)
+
+
+def test_short_lines_unchanged():
+    x = np.arange(10, dtype=float)
+    assert np.array_equal(lttb_indices(x, x, 20), np.arange(10))
+
+
+def test_time_range_keeps_neighbours():
+    times = np.arange(100, dtype=float)
+    indices = downsample_indices(times, times, 1000, (10.5, 20.5))
+    assert indices[0] == 10 and indices[-1] == 21
+
+
+def test_unsorted_times_keep_order():
+    times = np.array([3, 1, 2, 0], dtype=float)
+    indices = downsample_indices(times, times, 1000)
+    assert np.array_equal(indices, np.arange(4))
+
+
+def test_line_downsampled_with_aligned_moving_average():
+    full = PlotBuilder.from_state(STATE, df=df).build()
+    builder = PlotBuilder.from_state(STATE, df=df)
+    builder.point_budget = 10
+    fig = builder.build()
+
+    line, moving_average = fig.data
+    assert len(line.x) == 10
+    assert np.array_equal(line.x, moving_average.x)
+    assert downsampled(fig)
+    assert not downsampled(full)
+
+    # Moving averages are of every point, not just those kept
+    full_averages = pd.Series(full.data[1].y, index=full.data[1].x)
+    assert np.allclose(
+        moving_average.y, full_averages[moving_average.x], equal_nan=True
+    )
+
+
+def test_zoomed_in_line():
+    dates = PlotBuilder.from_state(STATE, df=df).build().data[0].x
+    builder = PlotBuilder.from_state(STATE, df=df)
+    builder.time_range = (str(dates[10]), str(dates[15]))
+    fig = builder.build()
+
+    # The points in view, and either side
+    assert list(fig.data[0].x) == list(dates[9:17])
+    assert fig.layout.xaxis.range == builder.time_range
+    assert not downsampled(fig)
+
+
+def test_zoomed_range():
+    assert zoomed_range({"xaxis.range[0]": "a", "xaxis.range[1]": "b"}, "x") == (
+        "a",
+        "b",
+    )
+    assert zoomed_range({"yaxis.range": ["a", "b"]}, "y") == ("a", "b")
+    assert zoomed_range({"xaxis.autorange": True}, "x") is None
+
+
+def test_many_points_drawn_with_webgl(monkeypatch):
+    assert PlotBuilder.from_state(STATE, df=df).build().data[0].type == "scatter"
+
+    monkeypatch.setattr(
+        "ark_rp_visualisation.core.plot_builder.WEBGL_POINT_THRESHOLD", 5
+    )
+    fig = PlotBuilder.from_state(STATE, df=df).build()
+    assert [trace.type for trace in fig.data] == ["scattergl", "scattergl"]
+    # Sent as typed arrays rather than lists of numbers
+    assert "bdata" in fig.to_plotly_json()["data"][1]["y"]
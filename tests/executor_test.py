@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ark_rp_visualisation.core import PlotBuilder, executor, synthetic
+from ark_rp_visualisation.core.enums import Tab
+from ark_rp_visualisation.perf.benchmark import enumerate_axis_cases
+
+from .slow_query_test import STATE
+
+df = synthetic.generate(5000, seed=5)
+
+
+def test_build_leaves_shared_dataset_unchanged():
+    columns = df.columns.tolist()
+    before = df.copy()
+    for case in enumerate_axis_cases(Tab.LINE)[:5]:
+        PlotBuilder.from_state(case.state, df=df).build()
+
+    assert df.columns.tolist() == columns
+    assert df.equals(before)
+
+
+def test_concurrent_builds_match_sequential():
+    expected = PlotBuilder.from_state(STATE, df=df).build().to_json()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        figures = list(
+            pool.map(
+                lambda _: executor.build(PlotBuilder.from_state(STATE, df=df)),
+                range(16),
+            )
+        )
+    assert all(fig.to_json() == expected for fig in figures)
+
+
+class BlockingBuilder:
+    """Stands in for a PlotBuilder, counting the builds running until released."""
+
+    def __init__(self, result=None, error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.release = threading.Event()
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def build(self, progress=None):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            self.release.wait(timeout=10)
+            if self.error is not None:
+                raise self.error
+            return self.result
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def two_build_threads(monkeypatch):
+    monkeypatch.setattr(executor, "BUILD_THREADS", 2)
+    executor._reset_executor()
+    yield
+    executor._reset_executor()
+
+
+def test_builds_bounded(two_build_threads):
+    builder = BlockingBuilder(result="figure")
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(executor.build, builder) for _ in range(6)]
+        # The other builds wait for a build thread
+        time.sleep(0.2)
+        assert builder.running == 2
+        builder.release.set()
+        results = [future.result(timeout=10) for future in futures]
+
+    assert builder.peak == 2
+    assert results == ["figure"] * 6
+
+
+def test_build_errors_raised_to_caller(two_build_threads):
+    builder = BlockingBuilder(error=ValueError("bad state"))
+    builder.release.set()
+    with pytest.raises(ValueError, match="bad state"):
+        executor.build(builder)
+    # The build thread is still usable
+    builder.error = None
+    builder.result = "figure"
+    assert executor.build(builder) == "figure"
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from ark_rp_visualisation.core import synthetic
+from ark_rp_visualisation.core.enums import Field
+from ark_rp_visualisation.core.facets import FacetIndex
+from ark_rp_visualisation.core.models import FilterConfig
+
+df = synthetic.generate(5000, num_authors=30, num_channels=6, seed=1)
+channels = sorted(df[Field.CHANNEL_NAME].unique())
+median_date = str(df[Field.DATETIME].sort_values().iloc[len(df) // 2].date())
+
+
+def expected_counts(field: Field, filter_config: FilterConfig) -> pd.Series:
+    """Count messages by filtering the whole dataset."""
+    filtered = filter_config.apply(filter_config.prepare_dataframe(df.copy()))
+    counts = filtered[field].value_counts()
+    return counts[counts > 0]
+
+
+def test_counts_match_filtered_dataset():
+    index = FacetIndex(df)
+    for filter_config in [
+        FilterConfig([]),
+        FilterConfig.from_raw(["channel_name"], ["in"], [channels[:2]]),
+        FilterConfig.from_raw(
+            ["date", "hour", "reaction_count"],
+            ["after", ">=", "<"],
+            [median_date, "12", 1],
+        ),
+    ]:
+        counts = index.get_counts(Field.AUTHOR, filter_config)
+        expected = expected_counts(Field.AUTHOR, filter_config)
+        assert counts.to_dict() == expected.to_dict()
+
+
+def test_counts_cached_by_filter_state():
+    index = FacetIndex(df)
+    first = FilterConfig.from_raw(
+        ["channel_name", "hour"], ["in", ">"], [channels[:2], "3"]
+    )
+    # Same filters, in a different order
+    second = FilterConfig.from_raw(
+        ["hour", "channel_name"], [">", "in"], ["3", channels[:2]]
+    )
+    index.get_counts(Field.AUTHOR, first)
+    index.get_counts(Field.AUTHOR, second)
+    assert index.counts.cache_info().hits == 1
+
+
+def test_rollup_by_categorical_fields_only():
+    index = FacetIndex(df)
+    assert set(index.rollup.columns) == {Field.AUTHOR, Field.CHANNEL_NAME, Field.COUNT}
+    assert len(index.rollup) <= 30 * 6
+    assert index.rollup[Field.COUNT].sum() == len(df)
@@ -0,0 +1,79 @@
+import itertools
+import json
+
+import pytest
+
+from ark_rp_visualisation.core.enums import Field, Tab
+from ark_rp_visualisation.pages.dashboard.fields import (
+    FIELD_SPAN,
+    SMALL_FIELD_SPAN,
+    SWAP_AXES_JS,
+    UPDATE_DROPDOWN_JS,
+    get_aggregation_info,
+)
+
+from .clientside import requires_node, run_clientside
+
+
+def expected_outputs(tab: Tab, selected: list[Field], triggered: int) -> list[list]:
+    """The dropdown rules, computed directly from the Field metadata."""
+    has_selected_temporal = any(field.temporal for field in selected)
+    options = [
+        [
+            {
+                "value": option,
+                "disabled": (option in selected and option != selected_field)
+                or (
+                    option.temporal
+                    and has_selected_temporal
+                    and not selected_field.temporal
+                ),
+            }
+            for option in slot["allowed"]
+        ]
+        for slot, selected_field in zip(tab.fields, selected)
+    ]
+
+    num_aggs = len(selected) - 1
+    aggregates = [["NO_UPDATE"] * num_aggs for _ in range(4)]
+    if triggered < num_aggs:
+        info = get_aggregation_info(selected[triggered])
+        for output, key in zip(aggregates, ["display", "display", "data", "value"]):
+            output[triggered] = info[key]
+
+    spans = ["NO_UPDATE"] * len(selected)
+    if len(selected) == 3:
+        has_aggs = any(
+            get_aggregation_info(field)["display"] == "block" for field in selected[:2]
+        )
+        spans = [SMALL_FIELD_SPAN if has_aggs else FIELD_SPAN] * 3
+
+    return json.loads(json.dumps([options, *aggregates, spans, spans]))
+
+
+@requires_node
+@pytest.mark.parametrize("tab", list(Tab))
+def test_clientside_dropdown_rules(tab):
+    """Test that the clientside rules match the Field metadata for every selection."""
+    cases, calls = [], []
+    for selected in itertools.product(*(slot["allowed"] for slot in tab.fields)):
+        for triggered in range(len(selected)):
+            options = [[{"value": f} for f in slot["allowed"]] for slot in tab.fields]
+            cases.append(([Field(field) for field in selected], triggered))
+            calls.append(
+                {"args": [selected, options], "triggered_id": {"index": triggered}}
+            )
+
+    results = run_clientside(UPDATE_DROPDOWN_JS, calls)
+    for (selected, triggered), result in zip(cases, results, strict=True):
+        assert result == expected_outputs(tab, selected, triggered), (
+            selected,
+            triggered,
+        )
+
+
+@requires_node
+def test_clientside_swap_axes():
+    axes = ["x", "y"]
+    calls = [{"args": [n_clicks, axes]} for n_clicks in (None, 1)]
+    assert run_clientside(SWAP_AXES_JS, calls) == ["NO_UPDATE", ["y", "x"]]
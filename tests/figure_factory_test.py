@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from ark_rp_visualisation.core import PlotBuilder, synthetic
+from ark_rp_visualisation.core.enums import Tab
+from ark_rp_visualisation.perf.benchmark import enumerate_axis_cases
+
+df = synthetic.generate(2000, seed=3)
+
+# A spread of the field and aggregation combinations of each Tab
+CASES = [case for tab in Tab for case in enumerate_axis_cases(tab)[::25]]
+
+
+def build(state, express: bool, **attributes) -> dict:
+    builder = PlotBuilder.from_state(state, df=df)
+    builder.express = express
+    for name, value in attributes.items():
+        setattr(builder, name, value)
+    return json.loads(builder.build().to_json())
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case.id for case in CASES])
+def test_same_figure_as_express(case):
+    assert build(case.state, express=False) == build(case.state, express=True)
+
+
+@pytest.mark.parametrize("tab", list(Tab))
+def test_same_customised_figure_as_express(tab, monkeypatch):
+    monkeypatch.setattr(
+        "ark_rp_visualisation.core.plot_builder.WEBGL_POINT_THRESHOLD", 5
+    )
+    state = enumerate_axis_cases(tab)[0].state
+    state = {
+        **state,
+        "custom": {
+            **state["custom"],
+            "title": "Custom title",
+            "x_label": "Custom label",
+            "moving_averages": {7: True, 30: True},
+            "x_log": True,
+            "y_log": True,
+        },
+    }
+    assert build(state, express=False, point_budget=10) == build(
+        state, express=True, point_budget=10
+    )
@@ -0,0 +1,85 @@
+from ark_rp_visualisation.core.enums import Filter, Page, Tab
+from ark_rp_visualisation.pages.dashboard.filters import (
+    NEW_FILTER,
+    UPDATE_FILTER_GROUPS_JS,
+    make_default_filters,
+    make_filter_templates,
+)
+
+from .clientside import requires_node, run_clientside
+
+# Templates are made for the line tab, so check they are copied to another tab
+TAB = Tab.BAR
+
+
+def get_ids(tree) -> list[dict]:
+    """Return every component ID in a serialised layout."""
+    if isinstance(tree, list):
+        return [id for child in tree for id in get_ids(child)]
+    if isinstance(tree, dict) and "props" in tree:
+        ids = [tree["props"]["id"]] if "id" in tree["props"] else []
+        return ids + [id for value in tree["props"].values() for id in get_ids(value)]
+    return []
+
+
+def call(type: Page, index=None, clicks=1, children=None):
+    """Arguments of the filter group callback when a button is clicked."""
+    triggered_id = {"type": type, "tab": TAB}
+    if index is not None:
+        triggered_id["index"] = index
+    return {
+        "args": [None, None, [], make_filter_templates(), children or []],
+        "triggered": [{"prop_id": "", "value": clicks}],
+        "triggered_id": triggered_id,
+    }
+
+
+def assert_reindexed(group, template):
+    """Test that a group is a copy of a template with a new index."""
+    (index,) = {id["index"] for id in get_ids(group)}
+    assert {id["tab"] for id in get_ids(group)} == {TAB}
+    assert index != template["props"]["id"]["index"]
+    assert len(get_ids(group)) == len(get_ids(template))
+
+
+@requires_node
+def test_add_filter():
+    templates = make_filter_templates()
+    (patch,) = run_clientside(UPDATE_FILTER_GROUPS_JS, [call(Page.ADD_FILTER_BUTTON)])
+
+    (operation,) = patch["operations"]
+    assert operation["operation"] == "Append"
+    assert_reindexed(operation["params"]["value"], templates[NEW_FILTER])
+
+
+@requires_node
+def test_reset_filters():
+    templates = make_filter_templates()
+    (groups,) = run_clientside(
+        UPDATE_FILTER_GROUPS_JS, [call(Page.RESET_FILTER_BUTTON)]
+    )
+
+    assert len(groups) == len(Filter)
+    for group, filter in zip(groups, Filter):
+        assert_reindexed(group, templates[filter])
+    assert len({group["props"]["id"]["index"] for group in groups}) == len(Filter)
+
+
+@requires_node
+def test_delete_filter():
+    children = [group.to_plotly_json() for group in make_default_filters(TAB)]
+    children = [{**child, "props": {"id": child["props"]["id"]}} for child in children]
+    index = children[2]["props"]["id"]["index"]
+
+    deleted, not_clicked = run_clientside(
+        UPDATE_FILTER_GROUPS_JS,
+        [
+            call(Page.DELETE_FILTER_BUTTON, index, children=children),
+            # New delete buttons trigger the callback without any clicks
+            call(Page.DELETE_FILTER_BUTTON, index, clicks=None, children=children),
+        ],
+    )
+    assert deleted["operations"] == [
+        {"operation": "Delete", "location": [2], "params": {}}
+    ]
+    assert not_clicked == "NO_UPDATE"
@@ -0,0 +1,130 @@
+import base64
+import json
+import zlib
+
+import pytest
+
+from ark_rp_visualisation.core.data_loader import DEFAULT_DATASET
+from ark_rp_visualisation.core.enums import Tab
+from ark_rp_visualisation.core.graph_state import (
+    default_state,
+    pack_state,
+    unpack_state,
+    validate_state,
+)
+from ark_rp_visualisation.utils.serialisation import (
+    decode_state,
+    encode_state,
+    state_key,
+)
+
+from .slow_query_test import STATE
+
+FILTERED_STATE = {
+    **STATE,
+    "dataset": "16-2-2025",
+    "tab": "scatter2",
+    "fields": ["word_count", "reaction_count", "channel_name"],
+    "axes": ["X-Axis", "Y-Axis"],
+    "aggs": ["mean", None],
+    "filters": [
+        ["date", "author", "channel_name", "hour", "reaction_count", None],
+        ["after", "not in", "in", ">=", "<", None],
+        ["2024-06-01", ["Alice", "Bob"], ["general", "Alice"], "18", 3, None],
+    ],
+    "custom": {
+        **STATE["custom"],
+        "title": "Words by channel",
+        "moving_averages": {"7": True, "30": False},
+        "sort_order": "descending",
+        "sort_axis": "X-Axis",
+        "y_log": True,
+    },
+}
+
+
+def encode_json_state(state):
+    """Encode a state as links did before states were packed."""
+    compressed = zlib.compress(json.dumps(state).encode("utf-8"))
+    return base64.urlsafe_b64encode(compressed).decode("ascii")
+
+
+# As the dashboard sends it before any checkbox is checked
+UNSET_STATE = default_state(Tab.LINE, DEFAULT_DATASET)
+
+
+@pytest.mark.parametrize("state", [STATE, FILTERED_STATE, UNSET_STATE])
+def test_round_trip(state):
+    decoded = decode_state(encode_state(state))
+    assert decoded == json.loads(json.dumps(state))
+    # So figures and stored states are found under the same key
+    assert state_key(decoded) == state_key(state)
+
+
+def test_version_1_states_still_decode():
+    # Packed checkboxes as bits, so unset ones decode as unchecked
+    version_1 = "A2PkNDTTNdI1MjAyZWRgYGZgZGZlZGNg4mRg5mRgYWFgZWGAACY-GwA"
+    custom = {
+        **UNSET_STATE["custom"],
+        "x_log": False,
+        "y_log": False,
+        "moving_averages": {"7": False, "30": False},
+    }
+    assert decode_state(version_1) == {**UNSET_STATE, "custom": custom}
+
+
+@pytest.mark.parametrize("state", [STATE, FILTERED_STATE])
+def test_shorter_than_json(state):
+    assert len(encode_state(state)) * 3 < len(encode_json_state(state))
+
+
+def test_json_states_still_decode():
+    assert decode_state(encode_json_state(FILTERED_STATE)) == FILTERED_STATE
+    assert decode_state(encode_json_state({**STATE, "tab": "pie"})) == {}
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"tab": "pie"},
+        {"fields": ["count"]},
+        {"fields": ["count", "content"]},
+        {"axes": ["X-Axis", "X-Axis"]},
+        {"aggs": ["median"]},
+        {"filters": [["author"], ["in"]]},
+        {"filters": [["author"], [">="], [["Alice"]]]},
+        {"filters": [["date"], ["after"], ["yesterday"]]},
+        {"filters": [["hour"], [">="], ["25"]]},
+        {"filters": [["reaction_count"], [">="], [-1]]},
+        {"custom": {**STATE["custom"], "sort_axis": "Z-Axis"}},
+        {"custom": {**STATE["custom"], "x_log": "yes"}},
+        {"extra": True},
+    ],
+)
+def test_invalid_states_rejected(change):
+    state = {**STATE, **change}
+    with pytest.raises(ValueError):
+        encode_state(state)
+    assert decode_state(encode_json_state(state)) == {}
+
+
+def test_malformed_packed_states_rejected():
+    packed = pack_state(FILTERED_STATE)
+    for data in [packed[:-1], packed + b"\x00", b"\x00\x7f", b"\x01\xff"]:
+        with pytest.raises(ValueError):
+            unpack_state(data)
+    assert decode_state("AAAA") == {}
+    assert decode_state("not base64!") == {}
+
+
+def test_corrupted_packed_states_invalid_or_valid():
+    """Test that unpacking any corruption of a state raises or gives a valid state."""
+    packed = pack_state(FILTERED_STATE)
+    for position in range(len(packed)):
+        for byte in (0, 1, 2, 0x7F, 0x80, 0xFF):
+            data = packed[:position] + bytes([byte]) + packed[position + 1 :]
+            try:
+                state = unpack_state(data)
+            except ValueError:
+                continue
+            validate_state(state)
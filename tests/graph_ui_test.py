@@ -0,0 +1,104 @@
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+import pytest
+
+from ark_rp_visualisation.app import app
+from ark_rp_visualisation.core import PlotBuilder
+from ark_rp_visualisation.core.enums import Page
+from ark_rp_visualisation.core.figure_cache import FigureCache
+from ark_rp_visualisation.pages.dashboard import graph_ui
+from ark_rp_visualisation.perf.loadtest import (
+    UPDATE_COMPONENT_PATH,
+    Scenarios,
+    load_factory,
+)
+
+
+@pytest.fixture(scope="module")
+def request_app():
+    client = app.server.test_client()
+
+    def request(method, path, body):
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.data
+
+    return request
+
+
+@pytest.fixture
+def payload(request_app, monkeypatch):
+    monkeypatch.setattr(graph_ui, "figure_cache", FigureCache())
+    factory = load_factory("http://localhost", request=request_app)
+    payload = Scenarios(factory, random.Random(0)).make("render_graph")
+    # A unique title, so the figure isn't already cached
+    for state in payload["state"]:
+        component_id = state["id"] if isinstance(state, dict) else None
+        if isinstance(component_id, dict) and component_id["type"] == Page.TITLE_INPUT:
+            state["value"] = str(uuid.uuid4())
+    return payload
+
+
+def test_render_graph_cached(request_app, payload):
+    status, body = request_app("POST", UPDATE_COMPONENT_PATH, payload)
+    assert status == 200
+    (figure,) = [
+        output["figure"]
+        for output in json.loads(body)["response"].values()
+        if "figure" in output
+    ]
+    assert figure["data"]
+
+    # Built in the worker, so the figure is shared with fullscreen links
+    assert len(graph_ui.figure_cache._figures) == 1
+
+
+def test_invalid_state_not_linked(request_app, payload):
+    columns = {
+        column[0]["id"]["type"]: column
+        for column in payload["state"]
+        if isinstance(column, list) and column
+    }
+    # A negative reaction count still filters, but isn't a valid graph state
+    for filter_type, value in zip(
+        columns[Page.FILTER_TYPE], columns[Page.FILTER_VALUE_INPUT]
+    ):
+        if filter_type["value"] == "reaction_count":
+            value["value"] = -1
+
+    status, body = request_app("POST", UPDATE_COMPONENT_PATH, payload)
+    assert status == 200
+    outputs = json.loads(body)["response"].values()
+    assert any(output.get("figure", {}).get("data") for output in outputs)
+    assert {"href": "#"} in outputs
+    assert {"disabled": True} in outputs
+
+
+def test_superseded_build_stopped(monkeypatch, request_app, payload):
+    started = []
+    release = threading.Event()
+
+    def build(self, progress=None):
+        started.append(self)
+        release.wait(timeout=10)
+        progress(1.0)
+        return go.Figure()
+
+    monkeypatch.setattr(PlotBuilder, "build", build)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(request_app, "POST", UPDATE_COMPONENT_PATH, payload)
+        while not started:
+            time.sleep(0.01)
+        # Clicked again while the first build runs
+        second = pool.submit(request_app, "POST", UPDATE_COMPONENT_PATH, payload)
+        while len(started) < 2:
+            time.sleep(0.01)
+        release.set()
+
+        assert first.result()[0] == 204
+        assert second.result()[0] == 200
@@ -0,0 +1,41 @@
+import json
+import random
+
+import pytest
+
+from ark_rp_visualisation.app import app
+from ark_rp_visualisation.perf.loadtest import (
+    DEFAULT_MIX,
+    UPDATE_COMPONENT_PATH,
+    Scenarios,
+    load_factory,
+)
+
+
+@pytest.fixture(scope="module")
+def request_app():
+    client = app.server.test_client()
+
+    def request(method, path, body):
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.data
+
+    return request
+
+
+@pytest.fixture(scope="module")
+def scenarios(request_app):
+    factory = load_factory("http://localhost", request=request_app)
+    return Scenarios(factory, random.Random(0))
+
+
+@pytest.mark.parametrize("scenario", DEFAULT_MIX)
+def test_scenario_payloads_accepted(request_app, scenarios, scenario):
+    """Test that every synthesised request is accepted by the real callbacks."""
+    assert scenarios.factory.available(scenario)
+    for _ in range(5):
+        payload = scenarios.make(scenario)
+        status, body = request_app("POST", UPDATE_COMPONENT_PATH, payload)
+        assert 200 <= status < 300, body[:500]
+        if status == 200:
+            assert "response" in json.loads(body)
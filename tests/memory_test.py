@@ -0,0 +1,60 @@
+from ark_rp_visualisation.core import PlotBuilder, synthetic
+from ark_rp_visualisation.core.data_loader import DataLoader
+from ark_rp_visualisation.perf.memory import column_memory, profile_load
+from ark_rp_visualisation.utils.profiling import profile_memory, stage
+
+from .slow_query_test import STATE
+
+
+def test_build_stages_profiled():
+    builder = PlotBuilder.from_state(STATE)
+    with profile_memory(top=3) as profiler:
+        builder.build()
+
+    assert set(profiler.stages) == set(builder.timings)
+    for record in profiler.stages.values():
+        assert record["calls"] == 1
+        assert record["peak_rss_mb"] > 0
+        assert len(record["top_allocators"]) <= 3
+
+
+def test_load_stages_merged_across_csvs(tmp_path):
+    df = synthetic.generate(1000, num_channels=3, seed=1)
+    synthetic.write_csvs(df, str(tmp_path), seed=1)
+    with profile_memory() as profiler:
+        DataLoader._read_csvs(data_path=str(tmp_path))
+
+    assert profiler.stages["read"]["calls"] == 3
+    assert profiler.stages["concat"]["calls"] == 1
+
+
+def test_nested_stage_keeps_enclosing_peak():
+    with profile_memory() as profiler:
+        with stage("outer"):
+            block = bytearray(8 * 2**20)
+            del block
+            with stage("inner"):
+                pass
+
+    assert profiler.stages["outer"]["peak_traced_mb"] >= 8
+    assert profiler.stages["inner"]["peak_traced_mb"] < 8
+
+
+def test_profile_load_leaves_datasets_unchanged(tmp_path):
+    df = synthetic.generate(1000, num_channels=2, seed=1)
+    synthetic.write_csvs(df, str(tmp_path), seed=1)
+    loader = DataLoader()
+    version = loader.version
+
+    profiled, report = profile_load(str(tmp_path), top=3)
+    assert len(profiled) == 1000
+    assert report["raw_dataset"]["rows"] == 1000
+    assert loader.version == version
+
+
+def test_column_memory():
+    df = synthetic.generate(1000, seed=1)
+    report = column_memory(df)
+    assert report["rows"] == 1000
+    assert set(report["columns"]) == set(df.columns)
+    assert report["total_mb"] > 0
@@ -0,0 +1,49 @@
+import pytest
+
+from ark_rp_visualisation.core import DataLoader, synthetic
+from ark_rp_visualisation.core.enums import Field, Filter
+from ark_rp_visualisation.core.metadata import DatasetMetadata
+from ark_rp_visualisation.core.snapshot import DatasetSnapshot
+
+df = synthetic.generate(2000, num_authors=20, num_channels=5, seed=2)
+
+
+@pytest.fixture
+def data_loader():
+    """Swap the dataset of the DataLoader, restoring it afterwards."""
+    loader = DataLoader()
+    previous = loader._snapshots.copy()
+    yield loader
+    loader._snapshots = previous
+
+
+def test_options_and_ranges():
+    metadata = DatasetMetadata(df, "test")
+    for filter in [Filter.AUTHOR, Filter.CHANNEL_NAME]:
+        assert metadata.option_indexes[filter].values == sorted(df[filter].unique())
+
+    dates = df[Field.DATETIME].dt.date
+    assert metadata.get_range(Filter.DATE) == (dates.min(), dates.max())
+    assert metadata.get_range(Filter.REACTION_COUNT) == (
+        df[Field.REACTION_COUNT].min(),
+        df[Field.REACTION_COUNT].max(),
+    )
+    assert metadata.get_range(Filter.AUTHOR) is None
+
+
+def test_warmed_snapshot_has_metadata():
+    snapshot = DatasetSnapshot(df).warm()
+    assert "metadata" in vars(snapshot)
+    assert snapshot.metadata.version == snapshot.version
+
+
+def test_invalidated_on_reload(data_loader: DataLoader):
+    data_loader._publish(df)
+    metadata = data_loader.metadata
+    assert data_loader.metadata is metadata
+
+    removed_author = df.at[0, Field.AUTHOR]
+    data_loader._publish(df[df[Field.AUTHOR] != removed_author])
+    reloaded = data_loader.metadata
+    assert reloaded.version != metadata.version
+    assert removed_author not in reloaded.option_indexes[Filter.AUTHOR].values
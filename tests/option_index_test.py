@@ -0,0 +1,35 @@
+from ark_rp_visualisation.core.option_index import OptionIndex
+
+VALUES = ["Alice", "alfred", "Bob Alison", "Carol", "malice", "Dave"]
+
+
+def test_empty_query_returns_first_values():
+    index = OptionIndex(VALUES)
+    assert index.search("", limit=2) == ["Alice", "Bob Alison"]
+    assert index.search(None, limit=10) == sorted(VALUES)
+
+
+def test_matches_ranked_by_position():
+    """Test that prefix matches rank before word matches, then other matches."""
+    index = OptionIndex(VALUES)
+    assert index.search("ali", limit=10) == ["Alice", "Bob Alison", "malice"]
+    assert index.search("AL", limit=10) == ["Alice", "alfred", "Bob Alison", "malice"]
+    assert index.search("alice", limit=10) == ["Alice", "malice"]
+    assert index.search("ali", limit=1) == ["Alice"]
+    assert index.search("zzz", limit=10) == []
+
+
+def test_trigram_search_matches_scan():
+    """Test that the trigram index finds the same values as a linear scan."""
+    values = [f"user{i} {chr(97 + i % 26)}{i * 7 % 1000}" for i in range(2000)]
+    index = OptionIndex(values)
+    for query in ["user1", "er12", "a70", "user199", "9 d", "D1"]:
+        expected = {v for v in values if query.casefold() in v.casefold()}
+        assert set(index.search(query, limit=len(values))) == expected
+
+
+def test_predicate_applied_before_limit():
+    index = OptionIndex(VALUES)
+    allowed = {"Bob Alison", "malice", "Dave"}.__contains__
+    assert index.search("ali", limit=1, predicate=allowed) == ["Bob Alison"]
+    assert index.search("", limit=2, predicate=allowed) == ["Bob Alison", "Dave"]
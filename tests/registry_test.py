@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ark_rp_visualisation.core import DataLoader, data_loader, synthetic
+from ark_rp_visualisation.core.data_loader import Dataset
+from ark_rp_visualisation.core.enums import Field
+from ark_rp_visualisation.core.snapshot import DatasetSnapshot
+
+DATASET_SIZES = {"small": 500, "medium": 1000, "large": 2000}
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """A DataLoader serving synthetic datasets, counting how often each is read."""
+    monkeypatch.setattr(
+        data_loader,
+        "DATASETS",
+        {dataset_id: Dataset.from_id(dataset_id) for dataset_id in DATASET_SIZES},
+    )
+    reads = {dataset_id: 0 for dataset_id in DATASET_SIZES}
+
+    def read(self, dataset_id, force=False):
+        reads[dataset_id] += 1
+        return synthetic.generate(DATASET_SIZES[dataset_id], seed=0)
+
+    monkeypatch.setattr(DataLoader, "_read", read)
+    monkeypatch.setattr(DataLoader, "_source_signature", staticmethod(lambda _: None))
+
+    loader = DataLoader()
+    previous = loader._snapshots.copy(), loader._sources.copy()
+    loader._snapshots.clear()
+    loader.reads = reads
+    yield loader
+    loader._snapshots, loader._sources = previous
+    del loader.reads
+
+
+def test_datasets_loaded_lazily(loader):
+    assert not loader._snapshots
+    snapshot = loader.get_snapshot("medium")
+    assert len(snapshot.df) == DATASET_SIZES["medium"]
+    assert Field.CONTENT not in snapshot.df.columns
+
+    assert loader.get_snapshot("medium") is snapshot
+    assert loader.reads == {"small": 0, "medium": 1, "large": 0}
+
+
+def test_unknown_dataset(loader):
+    with pytest.raises(ValueError):
+        loader.get_snapshot("missing")
+
+
+def test_least_recently_used_evicted(loader, monkeypatch):
+    small = loader.get_snapshot("small")
+    loader.get_snapshot("medium")
+    large = DatasetSnapshot(
+        DataLoader.remove_sensitive_fields(
+            synthetic.generate(DATASET_SIZES["large"], seed=0)
+        )
+    )
+    # Room for the small and large datasets, but not the medium one as well
+    budget = small.nbytes + large.nbytes
+    monkeypatch.setattr(data_loader, "MEMORY_BUDGET_MB", budget / 2**20)
+
+    loader.get_snapshot("small")
+    loader.get_snapshot("large")
+    assert list(loader._snapshots) == ["small", "large"]
+
+    loader.get_snapshot("medium")
+    assert loader.reads["medium"] == 2
+
+
+def test_metadata_counted_towards_budget(loader):
+    snapshot = loader.get_snapshot("small")
+    assert snapshot.nbytes == (
+        snapshot.df.memory_usage(deep=True).sum() + snapshot.metadata.nbytes
+    )
+    assert snapshot.metadata.nbytes > 0
+
+
+def test_reloaded_dataset_most_recently_used(loader, monkeypatch):
+    loader.get_snapshot("small")
+    loader.get_snapshot("medium")
+    monkeypatch.setattr(
+        DataLoader,
+        "_source_signature",
+        staticmethod(lambda dataset_id: "changed" if dataset_id == "small" else None),
+    )
+    monkeypatch.setattr(
+        DataLoader,
+        "_read",
+        lambda self, dataset_id, force=False: synthetic.generate(
+            DATASET_SIZES[dataset_id], seed=1
+        ),
+    )
+
+    assert loader.reload()
+    assert list(loader._snapshots) == ["medium", "small"]
+
+
+def test_concurrent_first_use_loads_once(loader):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        snapshots = list(pool.map(lambda _: loader.get_snapshot("small"), range(8)))
+    assert loader.reads["small"] == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
@@ -0,0 +1,71 @@
+import pytest
+
+from ark_rp_visualisation.core import DataLoader, synthetic
+from ark_rp_visualisation.core.data_loader import DEFAULT_DATASET, SENSITIVE_FIELDS
+from ark_rp_visualisation.core.enums import Field
+
+old_df = synthetic.generate(500, seed=3)
+new_df = synthetic.generate(600, seed=4)
+
+
+@pytest.fixture
+def data_loader(monkeypatch):
+    """
+    Serve `old_df` from a DataLoader whose source is `source["df"]`,
+    changing whenever `source["signature"]` does.
+    """
+    loader = DataLoader()
+    previous = loader._snapshots.copy(), loader._sources.copy()
+    source = {"df": old_df, "signature": "old"}
+    monkeypatch.setattr(
+        DataLoader,
+        "_source_signature",
+        staticmethod(lambda dataset_id: source["signature"]),
+    )
+    monkeypatch.setattr(
+        DataLoader, "_read", lambda self, dataset_id: source["df"].copy()
+    )
+
+    loader._snapshots.clear()
+    loader._publish(loader.remove_sensitive_fields(old_df))
+    loader._sources[DEFAULT_DATASET] = "old"
+    yield loader, source
+    loader._snapshots, loader._sources = previous
+
+
+def test_reload_swaps_snapshot(data_loader):
+    loader, source = data_loader
+    snapshot = loader.snapshot
+    assert not loader.reload()
+
+    source.update(df=new_df, signature="new")
+    assert loader.reload()
+    assert len(loader.df) == len(new_df)
+    assert not set(SENSITIVE_FIELDS) & set(loader.df.columns)
+    # Readers of the old snapshot are unaffected
+    assert len(snapshot.df) == len(old_df)
+    assert loader.version != snapshot.version
+
+
+def test_reload_identical_data_keeps_snapshot(data_loader):
+    loader, source = data_loader
+    snapshot = loader.snapshot
+    metadata = snapshot.metadata
+
+    source["signature"] = "touched"
+    assert not loader.reload()
+    assert loader.snapshot is snapshot
+    assert loader.metadata is metadata
+    # The new signature is remembered, so the data isn't read again
+    source["df"] = None
+    assert not loader.reload()
+
+
+def test_failed_reload_keeps_snapshot(data_loader):
+    loader, source = data_loader
+    snapshot = loader.snapshot
+
+    source.update(df=new_df.drop(columns=Field.CONTENT), signature="broken")
+    with pytest.raises(KeyError):
+        loader.reload()
+    assert loader.snapshot is snapshot
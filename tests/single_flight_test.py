@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ark_rp_visualisation.utils.serialisation import state_key
+from ark_rp_visualisation.utils.single_flight import FileSingleFlight, SingleFlight
+
+CALLERS = 8
+
+
+def run_concurrently(flights: list[SingleFlight], fn) -> list:
+    """
+    Call `fn` through each SingleFlight from many threads at once,
+    holding the first call until every thread has started.
+    """
+    started = threading.Barrier(CALLERS + 1)
+    release = threading.Event()
+
+    def slow():
+        release.wait(timeout=5)
+        return fn()
+
+    def call(i):
+        started.wait()
+        return flights[i % len(flights)].do("key", slow)
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        futures = [pool.submit(call, i) for i in range(CALLERS)]
+        started.wait()
+        # Give every caller time to join the first call
+        time.sleep(0.2)
+        release.set()
+        return [future.result() for future in futures]
+
+
+def counted(result):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return result
+
+    return fn, calls
+
+
+def test_concurrent_calls_share_result():
+    fn, calls = counted({"figure": 1})
+    results = run_concurrently([SingleFlight()], fn)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_sequential_calls_not_cached():
+    flight = SingleFlight()
+    fn, calls = counted(1)
+    flight.do("key", fn)
+    flight.do("key", fn)
+    assert len(calls) == 2
+
+
+def test_exception_shared():
+    def fail():
+        raise ValueError("build failed")
+
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        run_concurrently([flight], fail)
+    # The failed call isn't remembered
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_file_variant_coalesces_across_instances(tmp_path):
+    # Each instance stands in for a gunicorn worker
+    flights = [
+        FileSingleFlight(str(tmp_path), json.dumps, json.loads) for _ in range(2)
+    ]
+    fn, calls = counted({"figure": 1})
+    results = run_concurrently(flights, fn)
+    assert len(calls) == 1
+    assert all(result == {"figure": 1} for result in results)
+
+
+def test_state_key_ignores_key_order():
+    assert state_key({"a": 1, "b": [1, 2]}) == state_key({"b": [1, 2], "a": 1})
+    assert state_key({"a": 1}, "v1") != state_key({"a": 1}, "v2")
+
+
+def test_file_variant_coalesces_calls_outliving_ttl(tmp_path):
+    flights = [
+        FileSingleFlight(str(tmp_path), json.dumps, json.loads, ttl=0.05)
+        for _ in range(2)
+    ]
+    fn, calls = counted({"figure": 1})
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(timeout=5)
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights[0].do, "key", slow)
+        started.wait(timeout=5)
+        time.sleep(0.1)
+        # Another call finishing sweeps while the slow call still holds its lock
+        flights[1].do("other", lambda: 1)
+        assert (tmp_path / "key.lock").exists()
+
+        follower = pool.submit(flights[1].do, "key", slow)
+        time.sleep(0.1)
+        release.set()
+        assert leader.result() == follower.result() == {"figure": 1}
+    assert len(calls) == 1
+
+
+def test_file_variant_sweeps_unheld_locks(tmp_path):
+    flight = FileSingleFlight(str(tmp_path), json.dumps, json.loads, ttl=0.05)
+    flight.do("old", lambda: 1)
+    time.sleep(0.1)
+    flight.do("new", lambda: 2)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["new", "new.lock"]
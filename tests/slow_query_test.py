@@ -0,0 +1,60 @@
+import json
+
+from ark_rp_visualisation.core import DataLoader
+from ark_rp_visualisation.core.enums import Text
+from ark_rp_visualisation.perf.slow_query import (
+    log_slow_query,
+    read_slow_queries,
+    replay,
+)
+
+STATE = {
+    "tab": "bar",
+    "fields": ["count", "author"],
+    "axes": [Text.Y_AXIS, Text.X_AXIS],
+    "aggs": ["sum"],
+    "filters": [["author"], ["in"], [None]],
+    "custom": {
+        "title": "",
+        "x_label": "",
+        "y_label": "",
+        "moving_averages": {"7": False, "30": False},
+        "sort_order": None,
+        "sort_axis": None,
+        "x_log": False,
+        "y_log": False,
+    },
+}
+
+
+def test_fast_query_not_logged(tmp_path):
+    path = tmp_path / "slow.jsonl"
+    assert not log_slow_query(
+        STATE, DataLoader().version, {}, 10, path=str(path), threshold_ms=100
+    )
+    # Time queued for a build slot isn't the build's
+    assert not log_slow_query(
+        STATE, DataLoader().version, {}, 10, 500, path=str(path), threshold_ms=100
+    )
+    assert not path.exists()
+
+
+def test_slow_query_logged_and_replayed(tmp_path):
+    path = tmp_path / "slow.jsonl"
+    timings = {"groupby": 150.0, "make_figure": 50.0}
+    version = DataLoader().version
+    assert log_slow_query(
+        STATE, version, timings, 200, 500, path=str(path), threshold_ms=100
+    )
+
+    (entry,) = read_slow_queries(str(path))
+    assert entry["state"] == json.loads(json.dumps(STATE))
+    assert entry["dataset_version"] == version
+    assert entry["timings"] == timings
+
+    (result,) = replay(str(path))
+    assert result["build_ms"] == 200
+    assert result["queue_ms"] == 500
+    assert result["after_ms"] > 0
+    assert result["same_dataset"]
+    assert set(result["after_timings"]) >= {"filter", "groupby", "make_figure"}
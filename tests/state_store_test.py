@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from ark_rp_visualisation.api import FIGURE_PATH
+from ark_rp_visualisation.app import app
+from ark_rp_visualisation.core.enums import Page
+from ark_rp_visualisation.utils.serialisation import encode_state
+from ark_rp_visualisation.utils.state_store import STATE_ID_LENGTH, StateStore
+
+from .slow_query_test import STATE
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StateStore(str(tmp_path / "states.sqlite3"))
+
+
+def test_round_trip(store):
+    state_id = store.save(STATE)
+    assert len(state_id) == STATE_ID_LENGTH
+    assert store.load(state_id) == STATE
+
+
+def test_content_addressed(store):
+    reordered = dict(reversed(STATE.items()))
+    assert store.save(STATE) == store.save(reordered)
+    assert store.save({**STATE, "aggs": ["mean"]}) != store.save(STATE)
+
+
+def test_missing_state_not_cached(store):
+    state_id = store.save(STATE)
+    other = StateStore(store.path)
+    assert other.load("0" * STATE_ID_LENGTH) is None
+    assert other.load(state_id) == STATE
+    assert other.load(state_id) == STATE
+    assert other._cached_load.cache_info().hits == 1
+
+
+def test_colliding_ids_extended(store, monkeypatch):
+    first = store.save(STATE)
+    # Give every state a hash starting with the ID of the first
+    monkeypatch.setattr(
+        "ark_rp_visualisation.utils.state_store.state_key",
+        lambda state: first + "1" * (64 - STATE_ID_LENGTH),
+    )
+
+    other = {**STATE, "aggs": ["mean"]}
+    second = store.save(other)
+    assert second != first
+    assert len(second) == 2 * STATE_ID_LENGTH
+    assert store.save(other) == second
+    assert store.load(first) == STATE
+    assert store.load(second) == other
+
+
+def test_invalid_state_not_stored(store):
+    with pytest.raises(ValueError):
+        store.save({**STATE, "tab": "missing"})
+    assert store._connection.execute("SELECT COUNT(*) FROM states").fetchone() == (0,)
+
+
+def test_loaded_states_not_shared(store):
+    state_id = store.save(STATE)
+    store.load(state_id)["tab"] = "changed"
+    assert store.load(state_id) == STATE
+
+
+def route(href: str) -> str:
+    response = app.server.test_client().post(
+        "/_dash-update-component",
+        json={
+            "output": f"{Page.CONTENT}.children",
+            "outputs": {"id": Page.CONTENT, "property": "children"},
+            "inputs": [{"id": Page.URL, "property": "href", "value": href}],
+            "state": [],
+            "changedPropIds": [f"{Page.URL}.href"],
+        },
+    )
+    assert response.status_code == 200
+    return json.dumps(response.json)
+
+
+def test_graph_links(monkeypatch, store):
+    monkeypatch.setattr("ark_rp_visualisation.router.state_store", store)
+
+    state_id = store.save(STATE)
+    stored = route(f"http://localhost/graph/{state_id}")
+    assert f"{FIGURE_PATH}/{state_id}" in stored
+    # Links from before states were stored still work
+    encoded = route(f"http://localhost/graph?state={encode_state(STATE)}")
+    assert f"{FIGURE_PATH}?state=" in encoded
+    assert "Graph not found" in route("http://localhost/graph/missing")
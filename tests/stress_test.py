@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from ark_rp_visualisation.core import synthetic
+from ark_rp_visualisation.perf.loadtest import run_load, start_server
+
+STRESS_ROWS = int(os.getenv("STRESS_ROWS", "1000000"))
+STRESS_DURATION = float(os.getenv("STRESS_DURATION", "20"))
+STRESS_CONCURRENCY = 4
+STRESS_DATASET = "stress"
+
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory):
+    """A directory with a cached synthetic dataset, for servers started in it."""
+    directory = tmp_path_factory.mktemp("stress")
+    os.makedirs(directory / ".cache")
+    df = synthetic.generate(STRESS_ROWS, num_authors=500, seed=0)
+    df.to_parquet(directory / ".cache" / f"{STRESS_DATASET}.parquet")
+    return str(directory)
+
+
+def graph_throughput(data_dir: str, threads: int) -> float:
+    url, process = start_server(
+        1, threads, env={"DATASETS": STRESS_DATASET, "ENV": "development"}, cwd=data_dir
+    )
+    try:
+        results = run_load(
+            url, {"render_graph": 1}, STRESS_CONCURRENCY, STRESS_DURATION
+        )
+    finally:
+        process.terminate()
+        process.wait()
+
+    summary = results.summary()["total"]
+    assert summary["error_rate"] == 0
+    return summary["throughput_rps"]
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(
+    (os.cpu_count() or 1) < 2, reason="threads only overlap on several cores"
+)
+def test_threads_increase_graph_throughput(data_dir):
+    """Test that one worker with several threads builds more graphs per second."""
+    single = graph_throughput(data_dir, threads=1)
+    threaded = graph_throughput(data_dir, threads=STRESS_CONCURRENCY)
+    print(f"\n1x1: {single} req/s, 1x{STRESS_CONCURRENCY}: {threaded} req/s")
+    assert threaded > single
@@ -0,0 +1,28 @@
+import pytest
+
+from ark_rp_visualisation.utils.superseding import Superseded, Superseding
+
+
+def test_newer_work_supersedes_older():
+    superseding = Superseding()
+    with superseding.start("tab") as first:
+        first()
+        with superseding.start("tab") as second:
+            with pytest.raises(Superseded):
+                first()
+            second()
+            # Other keys are unaffected
+            with superseding.start("other") as other:
+                other()
+                second()
+    assert not superseding._latest
+
+
+def test_finished_work_forgotten():
+    superseding = Superseding()
+    with superseding.start("tab") as first:
+        pass
+    with superseding.start("tab") as second:
+        second()
+    with pytest.raises(Superseded):
+        first()
@@ -0,0 +1,20 @@
+import json
+
+from plotly.io.json import to_json_plotly
+
+from ark_rp_visualisation.core.enums import Page, Tab
+from ark_rp_visualisation.pages.dashboard import layout
+from ark_rp_visualisation.pages.dashboard.tabs import DEFAULT_TAB
+from ark_rp_visualisation.perf.loadtest import walk_components
+
+
+def test_only_default_tab_in_initial_layout():
+    components = walk_components(json.loads(to_json_plotly(layout())))
+    graph_tabs = [
+        component["props"]["id"]["tab"]
+        for component in components
+        if isinstance(component["props"]["id"], dict)
+        and component["props"]["id"]["type"] == Page.GRAPH
+    ]
+    assert graph_tabs == [DEFAULT_TAB]
+    assert len(Tab) > 1
@@ -0,0 +1,96 @@
+import pytest
+from flask import Flask
+
+from ark_rp_visualisation.core.data_loader import DEFAULT_DATASET
+from ark_rp_visualisation.core.enums import Tab
+from ark_rp_visualisation.core.figure_cache import FigureCache
+from ark_rp_visualisation.core.graph_state import default_state, validate_state
+from ark_rp_visualisation.utils.graph_log import GraphLog
+from ark_rp_visualisation.warmer import Warmer, popular_states
+
+from .slow_query_test import STATE
+
+POPULAR = {**STATE, "dataset": DEFAULT_DATASET}
+RARE = {**POPULAR, "aggs": ["mean"]}
+
+
+@pytest.fixture
+def graph_log(tmp_path, monkeypatch):
+    graph_log = GraphLog(str(tmp_path / "created_graphs.sqlite3"))
+    monkeypatch.setattr("ark_rp_visualisation.warmer.graph_log", graph_log)
+    return graph_log
+
+
+@pytest.fixture
+def cache(graph_log, monkeypatch):
+    cache = FigureCache()
+    monkeypatch.setattr("ark_rp_visualisation.warmer.figure_cache", cache)
+    for state in [RARE] + [POPULAR] * 3:
+        graph_log.record(state)
+    return cache
+
+
+def test_default_states_valid():
+    for tab in Tab:
+        validate_state(default_state(tab, DEFAULT_DATASET))
+
+
+def test_graph_log_counts_across_instances(graph_log):
+    # e.g. gunicorn workers, each with their own connection
+    other = GraphLog(graph_log.path)
+    graph_log.record(RARE)
+    other.record(POPULAR)
+    other.record(RARE)
+    graph_log.record({**POPULAR})
+    graph_log.record(RARE)
+    assert list(graph_log.most_created()) == [RARE, POPULAR]
+
+
+def test_popular_states():
+    states = [
+        {**POPULAR, "tab": "pie"},
+        POPULAR,
+        {**POPULAR, "dataset": "missing"},
+        RARE,
+    ]
+    assert popular_states(states, 5) == [POPULAR, RARE]
+    assert popular_states(states, 1) == [POPULAR]
+
+
+def test_run_warms_defaults_and_popular(cache):
+    report = Warmer(cpu_budget_s=60, top_n=1).run()
+    assert report["stopped"] == "done"
+    assert [w["source"] for w in report["warmed"]] == ["default"] * len(Tab) + [
+        "popular"
+    ]
+    assert cache.peek(POPULAR) is not None
+    assert cache.peek(RARE) is None
+    # Builds on the executor count towards the budget
+    assert report["cpu_s"] > 0
+
+    # Already cached, so nothing is built again
+    report = Warmer(cpu_budget_s=60, top_n=1).run()
+    assert all(w["cached"] for w in report["warmed"])
+
+
+def test_run_within_budget(cache):
+    report = Warmer(cpu_budget_s=0).run()
+    assert report["stopped"] == "budget"
+    assert report["warmed"] == []
+
+
+def test_run_stops_on_request(cache, monkeypatch):
+    warmer = Warmer(cpu_budget_s=60)
+    server = Flask(__name__)
+    warmer.attach(server)
+    get = cache.get
+
+    def get_during_request(state):
+        # A request arrives while the first graph is built
+        server.test_client().get("/")
+        return get(state)
+
+    monkeypatch.setattr(cache, "get", get_during_request)
+    report = warmer.run()
+    assert report["stopped"] == "request"
+    assert len(report["warmed"]) == 1